@@ -0,0 +1,48 @@
+# benchmarks/compare.py
+
+"""Compares two benchmarks.stages result files.
+
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 0.1]
+
+Exits with status 1 if any stage got slower than the threshold allows.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_results(path: str) -> dict:
+    with open(path) as file:
+        data = json.load(file)
+    return {(r["rows"], r["stage"], r["rule"]): r for r in data["results"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two stage benchmark result files.")
+    parser.add_argument("baseline", help="Results of the reference run.")
+    parser.add_argument("candidate", help="Results of the run to check.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative slowdown (0.1 = 10%%).")
+    args = parser.parse_args()
+
+    baseline, candidate = load_results(args.baseline), load_results(args.candidate)
+    regressions = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        rows, stage, rule = key
+        before, after = baseline[key]["wall_s"], candidate[key]["wall_s"]
+        change = (after - before) / before if before > 0 else 0.0
+        marker = "✗" if change > args.threshold else " "
+        print(f"{marker} {rows:>10,}  {before * 1000:10.1f} ms -> {after * 1000:10.1f} ms  {change:+7.1%}  {f'{stage} {rule}'.strip()}")
+        if change > args.threshold:
+            regressions.append(key)
+
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"  {key[0]:>10,}  only in {'baseline' if key in baseline else 'candidate'}: {f'{key[1]} {key[2]}'.strip()}")
+
+    if regressions:
+        print(f"{len(regressions)} stages slower than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
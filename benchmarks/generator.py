@@ -0,0 +1,244 @@
+# benchmarks/generator.py
+
+"""Deterministic generator of synthetic plaso (psort CSV) timelines.
+
+Rows are drawn from a parser mix (WEBHIST, syslog, auth, cron, apache access).
+Each bundled rule is hit at a configurable rate, and a share of rows repeat an
+earlier message or carry multi-line messages. The same parameters and seed
+always produce the same file.
+
+    python -m benchmarks.generator -o timeline.csv --rows 100000 --seed 1
+"""
+
+import argparse
+import csv
+import random
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+
+CSV_HEADER = ["datetime", "timestamp_desc", "source", "source_long", "message", "parser", "display_name", "tag"]
+
+# source, source_long, parser, display_name and timestamp_desc of each parser kind
+PARSERS: Dict[str, Tuple[str, str, str, str, str]] = {
+    "firefox": ("WEBHIST", "Firefox History", "sqlite/firefox_history",
+                "OS:/home/user/.mozilla/firefox/abcd.default/places.sqlite", "Last Visited Time"),
+    "chrome": ("WEBHIST", "Chrome History", "sqlite/chrome_27_history",
+               "OS:/home/user/.config/chromium/Default/History", "Last Visited Time"),
+    "syslog": ("LOG", "Log File", "syslog", "OS:/var/log/syslog", "Content Modification Time"),
+    "auth": ("LOG", "Log File", "syslog", "OS:/var/log/auth.log", "Content Modification Time"),
+    "cron": ("LOG", "Log File", "syslog/cron", "OS:/var/log/syslog", "Content Modification Time"),
+    "apache": ("LOG", "Apache Access", "apache_access", "OS:/var/log/apache2/access.log", "Content Modification Time"),
+}
+
+DEFAULT_MIX = {"firefox": 0.15, "chrome": 0.15, "syslog": 0.3, "auth": 0.2, "cron": 0.1, "apache": 0.1}
+
+# Bundled rule (file name without extension) -> (parser kinds that carry it, default hit rate)
+RULE_HITS: Dict[str, Tuple[Tuple[str, ...], float]] = {
+    "google_search": (("firefox", "chrome"), 0.01),
+    "bing_search": (("firefox", "chrome"), 0.005),
+    "web_visit": (("firefox", "chrome"), 0.05),
+    "youtube_watch": (("firefox", "chrome"), 0.005),
+    "lnx_user_add": (("auth",), 0.001),
+    "lnx_user_mod": (("auth",), 0.001),
+    "lnx_auth_failure": (("auth",), 0.01),
+    "lnx_session_opened": (("auth",), 0.02),
+    "lnx_web_shell_detection": (("apache",), 0.001),
+    "lnx_syslog_security_tools_disabling_syslog": (("syslog",), 0.0005),
+    "lnx_syslog_susp_named": (("syslog",), 0.0005),
+    "lnx_cron_crontab_file_modification": (("cron",), 0.002),
+    "lnx_vsftpd_susp_error_messages": (("syslog",), 0.0005),
+    "lnx_shell_susp_log_entries": (("syslog",), 0.0005),
+}
+
+USERS = ["alice", "bob", "carol", "dave", "mallory", "root", "www-data", "backup"]
+TERMS = ["forensic+timeline", "sigma+rules", "plaso+csv", "linux+audit", "incident+response", "python+yaml"]
+DOMAINS = ["example.org", "wikipedia.org", "github.com", "stackoverflow.com", "python.org", "kernel.org"]
+COMMANDS = ["whoami", "ls", "cat+/etc/passwd", "uname+-a", "netstat+-an", "wget+http://x/y", "ps+aux"]
+
+
+@dataclass
+class GeneratorConfig:
+    """Parameters of a synthetic timeline"""
+
+    rows: int = 10000
+    seed: int = 1
+    mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    hit_rates: Dict[str, float] = field(default_factory=lambda: {r: h for r, (_, h) in RULE_HITS.items()})
+    duplicate_ratio: float = 0.3
+    multiline_ratio: float = 0.01
+    start: str = "2024-01-01T00:00:00"
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class TimelineGenerator:
+    """Generates plaso CSV rows for a GeneratorConfig"""
+
+    def __init__(self, config: GeneratorConfig):
+        unknown = set(config.mix) - set(PARSERS)
+        if unknown:
+            raise ValueError(f"Unknown parser kinds in mix: {', '.join(sorted(unknown))}")
+        unknown = set(config.hit_rates) - set(RULE_HITS)
+        if unknown:
+            raise ValueError(f"Unknown rules in hit rates: {', '.join(sorted(unknown))}")
+        if sum(config.hit_rates.values()) >= 1:
+            raise ValueError("The hit rates must add up to less than 1")
+
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.kinds = list(config.mix)
+        self.weights = [config.mix[k] for k in self.kinds]
+        self.hits: List[Tuple[float, str]] = []
+        cumulative = 0.0
+        for rule, rate in config.hit_rates.items():
+            cumulative += rate
+            self.hits.append((cumulative, rule))
+        self.recent: List[Tuple[str, str]] = []  # pool of (kind, message) for duplicates
+        self.hit_counts: Dict[str, int] = {rule: 0 for rule in config.hit_rates}
+
+    def rows(self):
+        """Yields the CSV header followed by the generated rows"""
+        yield CSV_HEADER
+        timestamp = datetime.fromisoformat(self.config.start).replace(tzinfo=timezone.utc)
+        for _ in range(self.config.rows):
+            timestamp += timedelta(microseconds=self.random.randrange(0, 2_000_000))
+            kind, message = self._message()
+            source, source_long, parser, display_name, timestamp_desc = PARSERS[kind]
+            yield [
+                timestamp.isoformat(timespec="microseconds"),
+                timestamp_desc,
+                source,
+                source_long,
+                message,
+                parser,
+                display_name,
+                "-",
+            ]
+
+    def write(self, path: str) -> Dict[str, int]:
+        """Writes the timeline to a CSV file and returns the injected hits per rule"""
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            for row in self.rows():
+                writer.writerow(row)
+        return dict(self.hit_counts)
+
+    def _message(self) -> Tuple[str, str]:
+        rnd = self.random
+        if self.recent and rnd.random() < self.config.duplicate_ratio:
+            return rnd.choice(self.recent)
+
+        draw = rnd.random()
+        for cumulative, rule in self.hits:
+            if draw < cumulative:
+                kind = rnd.choice(RULE_HITS[rule][0])
+                message = self._hit_message(rule)
+                self.hit_counts[rule] += 1
+                break
+        else:
+            kind = rnd.choices(self.kinds, self.weights)[0]
+            message = self._benign_message(kind)
+
+        if rnd.random() < self.config.multiline_ratio:
+            message += f"\n  continued: detail {rnd.randrange(1000)}\n  end of record"
+
+        if len(self.recent) < 1000:
+            self.recent.append((kind, message))
+        else:
+            self.recent[rnd.randrange(1000)] = (kind, message)
+        return kind, message
+
+    def _hit_message(self, rule: str) -> str:
+        rnd = self.random
+        user, pid = rnd.choice(USERS), rnd.randrange(100, 65000)
+        ip = f"10.{rnd.randrange(256)}.{rnd.randrange(256)}.{rnd.randrange(1, 255)}"
+        term = rnd.choice(TERMS)
+        if rule == "google_search":
+            return f"https://www.google.com/search?q={term} ({term.replace('+', ' ')} - Google Search) [count: 1]"
+        if rule == "bing_search":
+            return f"https://www.bing.com/search?q={term} ({term.replace('+', ' ')} - Search) [count: 1]"
+        if rule == "web_visit":
+            return f"https://www.{rnd.choice(DOMAINS)}/page/{rnd.randrange(500)} (Page title) [count: 1]"
+        if rule == "youtube_watch":
+            return f"https://www.youtube.com/watch?v=v{rnd.randrange(10**6)} (Video {rnd.randrange(100)} - YouTube) [count: 1]"
+        if rule == "lnx_user_add":
+            uid = rnd.randrange(1000, 2000)
+            return f"[useradd, pid: {pid}] new user: name={user}, UID={uid}, GID={uid}, home=/home/{user}, shell=/bin/bash"
+        if rule == "lnx_user_mod":
+            return f"[usermod, pid: {pid}] add '{user}' to group 'sudo'"
+        if rule == "lnx_auth_failure":
+            return f"[sshd, pid: {pid}] Failed password for invalid user {user} from {ip} port {rnd.randrange(1024, 65535)} ssh2"
+        if rule == "lnx_session_opened":
+            return f"[sudo, pid: {pid}] pam_unix(sudo:session): session opened for user root(uid=0) by {user}(uid=1000)"
+        if rule == "lnx_web_shell_detection":
+            return (f"http_request: GET /uploads/shell.php?cmd={rnd.choice(COMMANDS)} from: {ip} "
+                    f"code: 200 referer: - user_agent: curl/7.68.0")
+        if rule == "lnx_syslog_security_tools_disabling_syslog":
+            return f"[systemd, pid: 1] Stopping {rnd.choice(['iptables', 'firewalld', 'falcon-sensor'])}..."
+        if rule == "lnx_syslog_susp_named":
+            return f"[named, pid: {pid}] client {ip}#53: denied AXFR from {ip}"
+        if rule == "lnx_cron_crontab_file_modification":
+            return f"[crontab, pid: {pid}] ({user}) REPLACE ({user})"
+        if rule == "lnx_vsftpd_susp_error_messages":
+            return f"[vsftpd, pid: {pid}] Connection refused: too many sessions for this address."
+        if rule == "lnx_shell_susp_log_entries":
+            return "[kernel] device eth0 entered promiscuous mode"
+        raise ValueError(f"No hit template for rule {rule}")
+
+    def _benign_message(self, kind: str) -> str:
+        rnd = self.random
+        user, pid = rnd.choice(USERS), rnd.randrange(100, 65000)
+        if kind in ("firefox", "chrome"):
+            return f"https://docs.{rnd.choice(DOMAINS)}/article/{rnd.randrange(10**5)} (Article) [count: 1]"
+        if kind == "syslog":
+            return f"[systemd, pid: 1] Started Session {rnd.randrange(10**4)} of user {user}."
+        if kind == "auth":
+            return f"[sshd, pid: {pid}] Accepted publickey for {user} from 192.168.{rnd.randrange(256)}.{rnd.randrange(256)} port {rnd.randrange(1024, 65535)} ssh2"
+        if kind == "cron":
+            return f"[CRON, pid: {pid}] ({user}) CMD (run-parts /etc/cron.hourly)"
+        if kind == "apache":
+            return (f"http_request: GET /static/img{rnd.randrange(1000)}.png from: 192.168.1.{rnd.randrange(1, 255)} "
+                    f"code: 200 referer: - user_agent: Mozilla/5.0")
+        raise ValueError(f"Unknown parser kind {kind}")
+
+
+def parse_ratios(text: str) -> Dict[str, float]:
+    """Parses 'name=value,name=value' into a dictionary"""
+    ratios = {}
+    for item in text.split(","):
+        if item.strip():
+            name, value = item.split("=", 1)
+            ratios[name.strip()] = float(value)
+    return ratios
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic plaso CSV timeline.")
+    parser.add_argument("-o", "--output_path", required=True, help="CSV file to write.")
+    parser.add_argument("--rows", type=int, default=10000, help="Number of rows, excluding the header.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed.")
+    parser.add_argument("--mix", type=parse_ratios, help="Parser mix, e.g. firefox=0.2,syslog=0.5,auth=0.3.")
+    parser.add_argument("--hit-rates", type=parse_ratios,
+                        help="Per-rule hit rates overriding the defaults, e.g. lnx_auth_failure=0.05.")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3, help="Share of rows repeating an earlier message.")
+    parser.add_argument("--multiline-ratio", type=float, default=0.01, help="Share of rows with multi-line messages.")
+    args = parser.parse_args()
+
+    config = GeneratorConfig(rows=args.rows, seed=args.seed, duplicate_ratio=args.duplicate_ratio,
+                             multiline_ratio=args.multiline_ratio)
+    if args.mix:
+        config.mix = args.mix
+    if args.hit_rates:
+        config.hit_rates.update(args.hit_rates)
+
+    hits = TimelineGenerator(config).write(args.output_path)
+    print(f"Wrote {config.rows:,} rows to {args.output_path}")
+    for rule, count in hits.items():
+        print(f"  {count:>8,}  {rule}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# benchmarks/stages.py
+
+"""Stage benchmarks of the sigmadft pipeline on synthetic timelines.
+
+Generates a timeline per size with benchmarks.generator and times each stage
+as main() runs it: CSVReader, LowLevelTimeline.create_timeline, every rule
+through ReadFromYamlAnalyzer.Run, MergeHighLevelTimeline.merge and
+JSONWriter.write. Results are written as JSON so runs of different releases
+can be compared with benchmarks.compare.
+
+    python -m benchmarks.stages --sizes 10000,100000 --output results.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.generator import GeneratorConfig, TimelineGenerator
+
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "sigmadft-bench")
+
+
+def parse_size(text: str) -> int:
+    """Parses a row count such as 10000, 100k or 10M"""
+    text = text.strip().lower()
+    factor = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if factor > 1 else text) * factor)
+
+
+def timeline_path(config: GeneratorConfig, data_dir: str) -> str:
+    """Returns the path of the generated timeline, generating it on first use"""
+    key = hashlib.sha256(json.dumps(config.to_dict(), sort_keys=True).encode()).hexdigest()[:16]
+    path = os.path.join(data_dir, f"timeline-{config.rows}-{key}.csv")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"Generating {config.rows:,} rows: {path}")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        TimelineGenerator(config).write(tmp_path)
+        os.replace(tmp_path, path)
+    return path
+
+
+def timed(func: Callable):
+    """Runs func and returns (result, wall seconds, CPU seconds)"""
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = func()
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def load_rules(selector: str):
+    """Selects and compiles the rules once, outside of the timed stages"""
+    from sigmadft.reader.RuleIndex import RuleIndex
+    from sigmadft.reader.YAMLReader import YAMLReader
+
+    rule_index = RuleIndex(persist=False)
+    return rule_index, [(entry.relative_path, YAMLReader(entry.path).read()) for entry in rule_index.select(selector)]
+
+
+def run_once(csv_path: str, rule_index, rules, output_path: str, routing: bool, match_cache_size: int) -> List[Tuple[str, str, float, float, int]]:
+    """Runs the pipeline once and returns (stage, rule, wall, cpu, count) per stage"""
+    import sigmadft.analyzers.ReadFromYamlAnalyzer as ReadFromYamlAnalyzer
+    from sigmadft.output.JSONWriter import JSONWriter
+    from sigmadft.reader.CSVReader import CSVReader
+    from sigmadft.reader.RuleIndex import LOGSOURCE_MAPPING_PATH
+    from sigmadft.rules.LogSource import LogSourceMapping
+    from sigmadft.timelines.HighLevelTimeline import MergeHighLevelTimeline
+    from sigmadft.timelines.LowLevelTimeline import LowLevelTimeline
+
+    samples = []
+    reader = CSVReader(csv_path)
+    rows, wall, cpu = timed(lambda: sum(1 for _ in reader.read_csv()) - 1)
+    samples.append(("csv_read", "", wall, cpu, rows))
+
+    low_timeline = LowLevelTimeline(match_cache_size=match_cache_size)
+    _, wall, cpu = timed(lambda: low_timeline.create_timeline(reader))
+    samples.append(("create_timeline", "", wall, cpu, len(low_timeline.events)))
+    if routing:
+        low_timeline.logsource_mapping = LogSourceMapping(rule_index.load_config(LOGSOURCE_MAPPING_PATH))
+
+    high_timelines = []
+    for name, rule in rules:
+        high_timeline, wall, cpu = timed(lambda: ReadFromYamlAnalyzer.Run(low_timeline, rule))
+        samples.append(("rule", name, wall, cpu, low_timeline.count_events_for_rule(rule)))
+        if high_timeline.events:
+            high_timelines.append(high_timeline)
+
+    merged, wall, cpu = timed(lambda: MergeHighLevelTimeline(high_timelines).merge())
+    samples.append(("merge", "", wall, cpu, len(merged.events)))
+
+    _, wall, cpu = timed(lambda: JSONWriter(merged, output_path).write())
+    samples.append(("json_write", "", wall, cpu, len(merged.events)))
+    return samples
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sigmadft pipeline stages.")
+    parser.add_argument("--sizes", default="10k,100k", help="Comma-separated row counts, e.g. 10k,100k,1M,10M.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the median is reported.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the generated timelines.")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3, help="Share of rows repeating an earlier message.")
+    parser.add_argument("--multiline-ratio", type=float, default=0.01, help="Share of rows with multi-line messages.")
+    parser.add_argument("-t", "--type", default="all", help="Rule set name or selector to benchmark.")
+    parser.add_argument("--no-logsource-routing", action="store_true", help="Scan every event with every rule.")
+    parser.add_argument("--match-cache-size", type=int, default=100000, help="Match cache size (0 disables it).")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Directory of the generated timelines.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    import sigmadft
+
+    rule_index, rules = load_rules(args.type)
+    print(f"Benchmarking {len(rules)} rules, {args.repeat} runs per size")
+
+    results = []
+    for size in [parse_size(s) for s in args.sizes.split(",") if s.strip()]:
+        config = GeneratorConfig(rows=size, seed=args.seed, duplicate_ratio=args.duplicate_ratio,
+                                 multiline_ratio=args.multiline_ratio)
+        csv_path = timeline_path(config, args.data_dir)
+        runs: Dict[Tuple[str, str], List[Tuple[float, float, int]]] = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for _ in range(args.repeat):
+                samples = run_once(csv_path, rule_index, rules, os.path.join(tmp_dir, "output.json"),
+                                   not args.no_logsource_routing, args.match_cache_size)
+                for stage, rule, wall, cpu, count in samples:
+                    runs.setdefault((stage, rule), []).append((wall, cpu, count))
+
+        print(f"{size:,} rows")
+        for (stage, rule), measurements in runs.items():
+            wall = statistics.median(m[0] for m in measurements)
+            cpu = statistics.median(m[1] for m in measurements)
+            count = measurements[-1][2]
+            rate = size / wall if wall > 0 else 0.0
+            results.append({
+                "rows": size, "stage": stage, "rule": rule, "wall_s": wall, "cpu_s": cpu,
+                "count": count, "rows_per_s": rate, "wall_runs_s": [m[0] for m in measurements],
+            })
+            label = f"{stage} {rule}".strip()
+            print(f"  {wall * 1000:10.1f} ms  {cpu * 1000:10.1f} ms CPU  {rate:12,.0f} rows/s  {label}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(
+                {
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "sigmadft_version": sigmadft.__version__,
+                    "git_revision": git_revision(),
+                    "python": sys.version,
+                    "platform": platform.platform(),
+                    "repeat": args.repeat,
+                    "rule_selector": args.type,
+                    "logsource_routing": not args.no_logsource_routing,
+                    "match_cache_size": args.match_cache_size,
+                    "generator": GeneratorConfig(seed=args.seed, duplicate_ratio=args.duplicate_ratio,
+                                                 multiline_ratio=args.multiline_ratio).to_dict(),
+                    "results": results,
+                },
+                file,
+                indent=4,
+            )
+
+
+if __name__ == "__main__":
+    main()
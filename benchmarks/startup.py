@@ -0,0 +1,133 @@
+# benchmarks/startup.py
+
+"""Startup benchmark for the sigmadft CLI.
+
+Measures the cumulative `python -X importtime` cost of `import sigmadft.main`
+and the wall time of `sigmadft -h`, checks that stage modules stay out of the
+startup path, and compares the results with startup_budget.json.
+
+    python -m benchmarks.startup [--runs N] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Parses `-X importtime` output into module -> (self us, cumulative us)"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_import(runs: int) -> Tuple[List[int], Dict[str, Tuple[int, int]]]:
+    """Returns the cumulative import times of sigmadft.main and the modules of the last run"""
+    timings = []
+    modules: Dict[str, Tuple[int, int]] = {}
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import sigmadft.main"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        modules = parse_importtime(result.stderr)
+        timings.append(modules["sigmadft.main"][1])
+    return timings, modules
+
+
+def measure_cli_help(runs: int) -> List[float]:
+    """Returns the wall times in milliseconds of `sigmadft -h`"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "sigmadft.main", "-h"],
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure sigmadft CLI startup.")
+    parser.add_argument("--runs", type=int, default=10, help="Number of runs per measurement.")
+    parser.add_argument("--budget", default=BUDGET_PATH, help="Path to the startup budget JSON file.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list.")
+    args = parser.parse_args()
+
+    with open(args.budget) as file:
+        budget = json.load(file)
+
+    import_timings, modules = measure_import(args.runs)
+    help_timings = measure_cli_help(args.runs)
+
+    import_us = statistics.median(import_timings)
+    help_ms = statistics.median(help_timings)
+    loaded_forbidden = sorted(m for m in budget.get("forbidden_modules", []) if m in modules)
+
+    failures = []
+    if import_us > budget["import_sigmadft_main_us"]:
+        failures.append(f"import sigmadft.main took {import_us:.0f}us (budget {budget['import_sigmadft_main_us']}us)")
+    if help_ms > budget["cli_help_ms"]:
+        failures.append(f"sigmadft -h took {help_ms:.1f}ms (budget {budget['cli_help_ms']}ms)")
+    if loaded_forbidden:
+        failures.append(f"modules imported at startup: {', '.join(loaded_forbidden)}")
+
+    slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[: args.top]
+
+    print(f"import sigmadft.main: {import_us / 1000:.2f} ms median over {args.runs} runs "
+          f"(budget {budget['import_sigmadft_main_us'] / 1000:.2f} ms)")
+    print(f"sigmadft -h:          {help_ms:.2f} ms median over {args.runs} runs "
+          f"(budget {budget['cli_help_ms']} ms)")
+    print(f"Modules imported:     {len(modules)}")
+    print("Slowest imports (self time):")
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {self_us / 1000:7.2f} ms  {cumulative_us / 1000:7.2f} ms cumulative  {name}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(
+                {
+                    "python": sys.version,
+                    "runs": args.runs,
+                    "import_sigmadft_main_us": import_us,
+                    "cli_help_ms": help_ms,
+                    "import_timings_us": import_timings,
+                    "cli_help_timings_ms": help_timings,
+                    "modules_imported": len(modules),
+                    "slowest_imports": [
+                        {"module": name, "self_us": s, "cumulative_us": c} for name, (s, c) in slowest
+                    ],
+                    "budget": budget,
+                    "failures": failures,
+                },
+                file,
+                indent=4,
+            )
+
+    if failures:
+        print("Startup budget exceeded:")
+        for failure in failures:
+            print(f"  ✗ {failure}")
+        sys.exit(1)
+    print("Startup budget met.")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,15 @@ __version__ = "1.0.0"
 __author__ = "Java Kanaya Prada"
 __email__ = "javakanaya@gmail.com"
 
-# Import main classes for easy access
-from .timelines.LowLevelTimeline import LowLevelTimeline
-from .timelines.HighLevelTimeline import HighLevelTimeline
-from .events.LowLevelEvent import LowLevelEvent
-from .events.HighLevelEvent import HighLevelEvent
-from .rules.Rule import Rule
+# Main classes are imported on first access so that importing the package
+# (and running the CLI) does not load every module up front
+_lazy_imports = {
+    "LowLevelTimeline": "sigmadft.timelines.LowLevelTimeline",
+    "HighLevelTimeline": "sigmadft.timelines.HighLevelTimeline",
+    "LowLevelEvent": "sigmadft.events.LowLevelEvent",
+    "HighLevelEvent": "sigmadft.events.HighLevelEvent",
+    "Rule": "sigmadft.rules.Rule",
+}
 
 __all__ = [
     "LowLevelTimeline",
@@ -21,4 +24,18 @@ __all__ = [
     "LowLevelEvent",
     "HighLevelEvent",
     "Rule",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _lazy_imports:
+        import importlib
+
+        value = getattr(importlib.import_module(_lazy_imports[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,282 @@
+# src/sigmadft/analyzers/BatchAnalyzer.py
+
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+import sigmadft.analyzers.ReadFromYamlAnalyzer as ReadFromYamlAnalyzer
+from sigmadft.events.HighLevelEvent import HighLevelEvent
+from sigmadft.output.JSONWriter import JSONWriter
+from sigmadft.reader.ColumnMapping import ColumnMapping
+from sigmadft.reader.CSVReader import COMPRESSED_SUFFIXES, reader_for
+from sigmadft.reader.JSONLinesReader import JSON_LINES_SUFFIXES
+from sigmadft.reader.TimeRange import TimeRange
+from sigmadft.rules.LogSource import LogSourceMapping
+from sigmadft.rules.Rule import Rule
+from sigmadft.timelines.HighLevelTimeline import HighLevelTimeline, MergeHighLevelTimeline
+from sigmadft.timelines.LowLevelTimeline import LowLevelTimeline
+from sigmadft.timelines.RowFilter import RowFilter
+
+
+def is_batch_input(input_path: str) -> bool:
+    """Checks whether an input path names several timelines"""
+    if input_path.startswith("@") or os.path.isdir(input_path):
+        return True
+    return not os.path.exists(input_path) and glob.has_magic(input_path)
+
+
+def resolve_inputs(input_path: str) -> List[Tuple[str, str]]:
+    """Returns (timeline path, device) pairs for a directory, glob or @manifest.
+
+    A directory contributes its CSV and JSON Lines files. A manifest lists one
+    timeline per line, optionally followed by a tab and the device name; blank
+    lines and lines starting with # are skipped. Otherwise the device is the
+    file name without its extension.
+    """
+    inputs = []
+    if input_path.startswith("@"):
+        manifest_path = input_path[1:]
+        base_dir = os.path.dirname(os.path.abspath(manifest_path))
+        with open(manifest_path, "r") as file:
+            for line in file:
+                line = line.rstrip("\n")
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                path, _, device = line.partition("\t")
+                path = os.path.join(base_dir, path.strip())
+                inputs.append((path, device.strip() or _device_name(path)))
+    else:
+        if os.path.isdir(input_path):
+            paths = [
+                path
+                for extension in (".csv",) + JSON_LINES_SUFFIXES
+                for suffix in ("",) + COMPRESSED_SUFFIXES
+                for path in glob.glob(os.path.join(input_path, f"*{extension}{suffix}"))
+            ]
+        else:
+            paths = glob.glob(input_path)
+        inputs = [(path, _device_name(path)) for path in sorted(paths) if os.path.isfile(path)]
+
+    # Devices name the per-host outputs, so they must be unique
+    seen: Dict[str, int] = {}
+    unique = []
+    for path, device in inputs:
+        seen[device] = seen.get(device, 0) + 1
+        unique.append((path, device if seen[device] == 1 else f"{device}-{seen[device]}"))
+    return unique
+
+
+def _device_name(path: str) -> str:
+    name = os.path.basename(path)
+    if name.endswith(COMPRESSED_SUFFIXES):
+        name = os.path.splitext(name)[0]
+    return os.path.splitext(name)[0]
+
+
+@dataclass
+class FileSummary:
+    """Outcome of analyzing one timeline in a batch"""
+
+    path: str
+    device: str
+    size: int = 0
+    status: str = "ok"
+    error: Optional[str] = None
+    rows: int = 0
+    events: int = 0
+    output_path: Optional[str] = None
+    timeline_seconds: float = 0.0
+    rules_seconds: float = 0.0
+    write_seconds: float = 0.0
+    total_seconds: float = 0.0
+    rule_errors: List[str] = field(default_factory=list)
+
+
+# Set in each worker process by _init_worker, so the rules are sent once per worker
+_worker_rules: List[Rule] = []
+_worker_logsource_mapping: Optional[LogSourceMapping] = None
+_worker_match_cache_size = 0
+_worker_adaptive_order = True
+_worker_row_filter: Optional[RowFilter] = None
+_worker_time_range: Optional[TimeRange] = None
+_worker_input_format = "auto"
+_worker_column_mapping: Optional[ColumnMapping] = None
+
+
+def _init_worker(
+    rules: List[Rule],
+    logsource_mapping: Optional[LogSourceMapping],
+    match_cache_size: int,
+    adaptive_order: bool = True,
+    row_pushdown: bool = True,
+    time_range: Optional[TimeRange] = None,
+    input_format: str = "auto",
+    column_mapping: Optional[ColumnMapping] = None,
+):
+    global _worker_rules, _worker_logsource_mapping, _worker_match_cache_size, _worker_adaptive_order
+    global _worker_row_filter, _worker_time_range, _worker_input_format, _worker_column_mapping
+    _worker_rules = rules
+    _worker_logsource_mapping = logsource_mapping
+    _worker_match_cache_size = match_cache_size
+    _worker_adaptive_order = adaptive_order
+    _worker_row_filter = RowFilter.from_rules(rules, time_range, pushdown=row_pushdown)
+    _worker_time_range = time_range
+    _worker_input_format = input_format
+    _worker_column_mapping = column_mapping
+
+
+def analyze_file(path: str, device: str, output_path: Optional[str]) -> Tuple[FileSummary, List[HighLevelEvent]]:
+    """Analyzes one timeline with the worker's rules.
+
+    Writes the events to output_path if given and returns none, otherwise
+    returns them for a merged output.
+    """
+    summary = FileSummary(path, device, output_path=output_path)
+    total_start = time.perf_counter()
+    try:
+        summary.size = os.path.getsize(path)
+        timeline_start = time.perf_counter()
+        low_timeline = LowLevelTimeline(
+            match_cache_size=_worker_match_cache_size,
+            logsource_mapping=_worker_logsource_mapping,
+            adaptive_order=_worker_adaptive_order,
+            row_filter=_worker_row_filter,
+        )
+        low_timeline.create_timeline(reader_for(
+            path, _worker_time_range, _worker_input_format, column_mapping=_worker_column_mapping
+        ))
+        summary.rows = len(low_timeline.events)
+        summary.timeline_seconds = time.perf_counter() - timeline_start
+
+        rules_start = time.perf_counter()
+        merged, summary.rule_errors = ReadFromYamlAnalyzer.RunAll(low_timeline, _worker_rules)
+        for event in merged.events:
+            event.device = device
+        summary.events = len(merged.events)
+        summary.rules_seconds = time.perf_counter() - rules_start
+
+        events = merged.events
+        if output_path is not None:
+            write_start = time.perf_counter()
+            JSONWriter(merged, output_path).write()
+            summary.write_seconds = time.perf_counter() - write_start
+            events = []
+    except Exception as e:
+        summary.status = "error"
+        summary.error = f"{type(e).__name__}: {str(e)}"
+        events = []
+    summary.total_seconds = time.perf_counter() - total_start
+    return summary, events
+
+
+class BatchAnalyzer:
+    """Analyzes many timelines with one compiled rule set across a process pool.
+
+    Files are scheduled largest first so a big host does not start last and
+    hold up the batch. Each file gets its own output in the output directory,
+    or all events go to one merged output tagged with their device.
+    """
+
+    def __init__(
+        self,
+        rules: List[Rule],
+        logsource_mapping: Optional[LogSourceMapping] = None,
+        match_cache_size: int = 0,
+        workers: Optional[int] = None,
+        adaptive_order: bool = True,
+        row_pushdown: bool = True,
+        time_range: Optional[TimeRange] = None,
+        input_format: str = "auto",
+        column_mapping: Optional[ColumnMapping] = None,
+    ):
+        self.rules = rules
+        self.logsource_mapping = logsource_mapping
+        self.match_cache_size = match_cache_size
+        self.workers = workers or os.cpu_count() or 1
+        self.adaptive_order = adaptive_order
+        self.row_pushdown = row_pushdown
+        self.time_range = time_range
+        self.input_format = input_format
+        self.column_mapping = column_mapping
+
+    def run(self, inputs: List[Tuple[str, str]], output_path: str, merge: bool = False) -> List[FileSummary]:
+        """Analyzes the inputs and returns one summary per file, in input order"""
+        if not merge:
+            os.makedirs(output_path, exist_ok=True)
+
+        jobs = [
+            (path, device, None if merge else os.path.join(output_path, f"{device}.json"))
+            for path, device in sorted(inputs, key=lambda item: _file_size(item[0]), reverse=True)
+        ]
+        summaries: Dict[str, FileSummary] = {}
+        events: Dict[str, List[HighLevelEvent]] = {}
+
+        def collect(result: Tuple[FileSummary, List[HighLevelEvent]]):
+            summary, file_events = result
+            summaries[summary.device] = summary
+            events[summary.device] = file_events
+            if summary.status == "ok":
+                print(
+                    f"  ✓ {summary.device}: {summary.rows:,} rows, {summary.events:,} events "
+                    f"in {summary.total_seconds:.2f} seconds"
+                )
+            else:
+                print(f"  ✗ {summary.device}: {summary.error}")
+            for error in summary.rule_errors:
+                print(f"    ! {error}")
+
+        if self.workers == 1 or len(jobs) == 1:
+            _init_worker(
+                self.rules,
+                self.logsource_mapping,
+                self.match_cache_size,
+                self.adaptive_order,
+                self.row_pushdown,
+                self.time_range,
+                self.input_format,
+                self.column_mapping,
+            )
+            for job in jobs:
+                collect(analyze_file(*job))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(jobs)),
+                initializer=_init_worker,
+                initargs=(
+                    self.rules,
+                    self.logsource_mapping,
+                    self.match_cache_size,
+                    self.adaptive_order,
+                    self.row_pushdown,
+                    self.time_range,
+                    self.input_format,
+                    self.column_mapping,
+                ),
+            ) as executor:
+                futures = [executor.submit(analyze_file, *job) for job in jobs]
+                for future in as_completed(futures):
+                    collect(future.result())
+
+        if merge:
+            merged = HighLevelTimeline()
+            # Devices in input order, so ties in time keep a stable order
+            merged.add_events([event for _, device in inputs for event in events[device]])
+            merged = MergeHighLevelTimeline([merged]).merge()
+            JSONWriter(merged, output_path).write()
+
+        return [summaries[device] for _, device in inputs]
+
+    @staticmethod
+    def write_summary(summaries: List[FileSummary], path: str) -> None:
+        with open(path, "w") as file:
+            json.dump([asdict(summary) for summary in summaries], file, indent=4)
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
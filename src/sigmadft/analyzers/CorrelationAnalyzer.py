@@ -0,0 +1,317 @@
+# src/sigmadft/analyzers/CorrelationAnalyzer.py
+
+import re
+from collections import Counter, OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from sigmadft.events.HighLevelEvent import HighLevelEvent, ReasoningArtefact
+from sigmadft.rules.CorrelationRule import CorrelationRule
+from sigmadft.rules.Rule import Rule
+from sigmadft.timelines.HighLevelTimeline import HighLevelTimeline
+
+
+class _GroupWindow:
+    """Events of one group within the timespan, oldest first"""
+
+    __slots__ = ("entries", "values", "last_seen")
+
+    def __init__(self):
+        self.entries: Deque[Tuple[float, Any, str, Any]] = deque()  # (seconds, id, date_time_min, value)
+        self.values: Counter = Counter()  # value -> events in the window, for value_count
+        self.last_seen = float("-inf")
+
+
+class _SequenceState:
+    """Partial matches of a sequence for one group.
+
+    partials[k] holds the start time and events of the partial match that has
+    completed steps 0 to k. Of two partials at the same step, the one that
+    started later completes every sequence the other could, so only that one
+    is kept, and a group's state never exceeds one partial per step.
+    """
+
+    __slots__ = ("partials", "last_seen")  # last_seen: the latest start of a partial
+
+    def __init__(self, steps: int):
+        self.partials: List[Optional[Tuple[float, List[HighLevelEvent]]]] = [None] * (steps - 1)
+        self.last_seen = float("-inf")
+
+
+def event_seconds(event: HighLevelEvent) -> float:
+    """Seconds since the epoch of an event; invalid dates count as 1970, as in the merge"""
+    try:
+        return datetime.fromisoformat(event.date_time_min).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# Suffixes the user extractors keep after a name, e.g. "name=bob," or "user bob(uid=1001)"
+_JOIN_SUFFIX = re.compile(r"(?:,|\(uid=\d+\))$")
+
+
+def _join_value(value: Any) -> Any:
+    """A sequence's group-by value without the suffixes that keep one user's steps apart"""
+    return _JOIN_SUFFIX.sub("", value) if isinstance(value, str) else value
+
+
+def _hashable(value: Any) -> Any:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+class CorrelationAnalyzer:
+    """Evaluates correlation rules over the events of the rules they reference.
+
+    Each correlation keeps a sliding window per group, keyed by the tuple of
+    its group-by values. Events older than the timespan leave the window and
+    groups without events within the timespan are dropped, so memory grows with
+    the active groups and their recent events rather than with all the events
+    matched. When a group meets the condition, one aggregated event is emitted
+    and the group starts over.
+
+    A temporal_ordered correlation runs as an automaton instead: one pass over
+    the time-ordered events advances each group's partial matches step by
+    step, and partials that started more than the timespan ago expire. State is kept between calls to process, so
+    events can be fed batch by batch in time order.
+    """
+
+    def __init__(self, rules: List[CorrelationRule]):
+        self.rules = rules
+        # Per correlation, the open groups in order of their last event
+        self._groups: List["OrderedDict[Tuple, Any]"] = [OrderedDict() for _ in rules]
+        self.emitted = 0
+
+    def hidden_rules(self, rules: List[Any]) -> List[Rule]:
+        """Referenced rules that are not among rules; they run only to feed the correlations"""
+        hidden: List[Rule] = []
+        for correlation in self.rules:
+            for rule in correlation.base_rules:
+                if all(rule is not other for other in rules) and all(rule is not other for other in hidden):
+                    hidden.append(rule)
+        return hidden
+
+    def active_groups(self) -> int:
+        return sum(len(groups) for groups in self._groups)
+
+    def process(self, events_by_rule: Dict[int, List[HighLevelEvent]]) -> List[HighLevelTimeline]:
+        """Feeds the new events of each referenced rule, keyed by id(rule).
+
+        Returns one timeline of aggregated events per correlation, in the order
+        of self.rules.
+        """
+        timelines = []
+        for position, correlation in enumerate(self.rules):
+            timeline = HighLevelTimeline()
+            if correlation.type == "temporal_ordered":
+                self._process_sequence(position, correlation, events_by_rule, timeline)
+            else:
+                events = [
+                    (event_seconds(event), correlation.group_keys(rule), event)
+                    for rule in correlation.base_rules
+                    for event in events_by_rule.get(id(rule), [])
+                ]
+                events.sort(key=lambda item: item[0])
+
+                for seconds, group_keys, event in events:
+                    aggregated = self._add(position, correlation, event, seconds, group_keys)
+                    if aggregated is not None:
+                        timeline.add_event(aggregated)
+            self.emitted += len(timeline.events)
+            timelines.append(timeline)
+        return timelines
+
+    @staticmethod
+    def _group(event: HighLevelEvent, group_keys: List[str]) -> Tuple:
+        keys = event.keys or {}
+        return tuple(_hashable(keys.get(name)) for name in group_keys)
+
+    @staticmethod
+    def _expire(groups: "OrderedDict[Tuple, Any]", horizon: float) -> None:
+        # Groups are ordered by their last event, so idle ones are at the front
+        while groups:
+            oldest = next(iter(groups.values()))
+            if oldest.last_seen >= horizon:
+                break
+            groups.popitem(last=False)
+
+    def _add(
+        self, position: int, correlation: CorrelationRule, event: HighLevelEvent, seconds: float, group_keys: List[str]
+    ) -> Optional[HighLevelEvent]:
+        group = self._group(event, group_keys)
+        if None in group:
+            return None
+        value = None
+        if correlation.type == "value_count":
+            value = _hashable((event.keys or {}).get(correlation.value_field))
+            if value is None:
+                return None
+
+        groups = self._groups[position]
+        horizon = seconds - correlation.timespan
+        self._expire(groups, horizon)
+
+        window = groups.get(group)
+        if window is None:
+            window = groups[group] = _GroupWindow()
+        else:
+            groups.move_to_end(group)
+        window.entries.append((seconds, event.id, event.date_time_min, value))
+        window.last_seen = max(window.last_seen, seconds)
+        if value is not None:
+            window.values[value] += 1
+
+        while window.entries and window.entries[0][0] < horizon:
+            _, _, _, old_value = window.entries.popleft()
+            if old_value is not None:
+                window.values[old_value] -= 1
+                if not window.values[old_value]:
+                    del window.values[old_value]
+
+        count = len(window.values) if correlation.type == "value_count" else len(window.entries)
+        if not correlation.satisfied(count):
+            return None
+        del groups[group]
+        return self._aggregate(correlation, group, window, event, count)
+
+    def _process_sequence(
+        self,
+        position: int,
+        correlation: CorrelationRule,
+        events_by_rule: Dict[int, List[HighLevelEvent]],
+        timeline: HighLevelTimeline,
+    ) -> None:
+        steps = correlation.steps()
+        if len(steps) != len(correlation.rules):
+            # A step that did not resolve can never match
+            return
+        # Steps of each rule, last first, so an event never completes two
+        # consecutive steps of the same partial match
+        rule_steps = {
+            id(rule): sorted((k for k, step in enumerate(steps) if step is rule), reverse=True)
+            for rule in correlation.base_rules
+        }
+        events = [
+            (event_seconds(event), event.id if isinstance(event.id, int) else 0, rule, event)
+            for rule in correlation.base_rules
+            for event in events_by_rule.get(id(rule), [])
+        ]
+        # Timeline order within a second, so steps logged together keep their order
+        events.sort(key=lambda item: item[:2])
+
+        groups = self._groups[position]
+        last_step = len(steps) - 1
+        for seconds, _, rule, event in events:
+            group = tuple(_join_value(value) for value in self._group(event, correlation.group_keys(rule)))
+            if None in group:
+                continue
+            horizon = seconds - correlation.timespan
+            self._expire(groups, horizon)
+
+            state = groups.get(group)
+            if state is None:
+                if steps[0] is not rule:
+                    continue
+                state = groups[group] = _SequenceState(len(steps))
+
+            for k in rule_steps[id(rule)]:
+                if k == 0:
+                    partial = (seconds, [event])
+                else:
+                    previous = state.partials[k - 1]
+                    if previous is None or previous[0] < horizon:
+                        continue
+                    partial = (previous[0], previous[1] + [event])
+                if k == last_step:
+                    del groups[group]
+                    timeline.add_event(self._aggregate_sequence(correlation, group, partial[1], seconds - partial[0]))
+                    break
+                current = state.partials[k]
+                if current is None or current[0] <= partial[0]:
+                    state.partials[k] = partial
+                    state.last_seen = max(state.last_seen, partial[0])
+                    groups.move_to_end(group)
+
+    @staticmethod
+    def _aggregate(
+        correlation: CorrelationRule, group: Tuple, window: _GroupWindow, event: HighLevelEvent, count: int
+    ) -> HighLevelEvent:
+        """Creates the aggregated event, placed at the group's first event and triggered by its last"""
+        high_event = CorrelationAnalyzer._new_event(correlation, group, event, window.entries[0][2])
+        if correlation.type == "value_count":
+            high_event.set_keys("Value_Count", count)
+            high_event.set_keys("Values", sorted(str(value) for value in window.values))
+        else:
+            high_event.set_keys("Event_Count", count)
+        high_event.merged_id = [entry[1] for entry in window.entries]
+
+        counted = f"distinct {correlation.value_field} values" if correlation.type == "value_count" else "events"
+        CorrelationAnalyzer._finish(
+            correlation,
+            high_event,
+            event,
+            f"{count} {counted} of {', '.join(rule.title for rule in correlation.base_rules)} "
+            f"within {correlation.timespan_text}",
+        )
+        return high_event
+
+    @staticmethod
+    def _aggregate_sequence(
+        correlation: CorrelationRule, group: Tuple, events: List[HighLevelEvent], duration: float
+    ) -> HighLevelEvent:
+        """Creates the event of a completed sequence, placed at its first step and triggered by its last"""
+        event = events[-1]
+        high_event = CorrelationAnalyzer._new_event(correlation, group, event, events[0].date_time_min)
+        high_event.set_keys("Steps", [step.type for step in events])
+        high_event.set_keys("Duration", duration)
+        high_event.merged_id = [step.id for step in events]
+
+        CorrelationAnalyzer._finish(
+            correlation,
+            high_event,
+            event,
+            f"{' then '.join(rule.title for rule in correlation.steps())} within {correlation.timespan_text}",
+        )
+        return high_event
+
+    @staticmethod
+    def _new_event(correlation: CorrelationRule, group: Tuple, event: HighLevelEvent, date_time_min: str) -> HighLevelEvent:
+        high_event = HighLevelEvent()
+        high_event.id = event.id
+        high_event.date_time_min = date_time_min
+        high_event.date_time_max = event.date_time_min
+        high_event.evidence_source = event.evidence_source
+        high_event.category = correlation.category
+        high_event.plugin = getattr(event, "plugin", None)
+        high_event.files = event.files
+        for name, value in zip(correlation.group_by, group):
+            high_event.set_keys(name, value)
+        return high_event
+
+    @staticmethod
+    def _finish(correlation: CorrelationRule, high_event: HighLevelEvent, event: HighLevelEvent, reason: str) -> None:
+        """Sets the type, description, trigger and supporting events once the keys are set"""
+        if correlation.high_level_event:
+            high_event.type = correlation.high_level_event.type or correlation.title
+            high_event.description = correlation.high_level_event.description_template.render(high_event)
+        else:
+            high_event.type = correlation.title
+            high_event.description = correlation.description
+
+        trigger = ReasoningArtefact()
+        trigger.id = event.id
+        trigger.description = reason
+        if event.trigger is not None:
+            trigger.provenance = event.trigger.provenance
+            trigger.test_event = event.trigger.test_event
+        else:
+            trigger.test_event = {"type": event.type, "evidence": event.evidence_source}
+        trigger.references = correlation.references
+        trigger.keys = high_event.keys
+        high_event.trigger = trigger
+
+        # The supporting events are those around the last event; the lists are
+        # replaced, not changed, when later rows arrive
+        high_event.supporting = dict(event.supporting)
@@ -1,8 +1,10 @@
 # src/sigmadft/analyzers/KeyProcessor.py
 
-from typing import Any
+from time import perf_counter
+from typing import Any, Optional
 from sigmadft.events.LowLevelEvent import LowLevelEvent
 from sigmadft.rules.Rule import KeyDefinition
+from sigmadft.utils.RuleProfiler import RuleProfiler
 from sigmadft.utils.util import Utils
 
 
@@ -11,6 +13,8 @@ class KeyProcessor:
 
     def __init__(self):
         self.utils = Utils()
+        self._methods = {}  # source name -> resolved Utils method
+        self.profiler: Optional[RuleProfiler] = None  # times each extractor call when set
 
     def process_key(
         self,
@@ -19,15 +23,23 @@ class KeyProcessor:
     ) -> Any:
         """Process a key by calling the specified utility function"""
         try:
-            # Check if the utility function exists
-            if not hasattr(self.utils, key_def.source):
-                raise ValueError(f"Utility method {key_def.source} not found")
+            # Get the utility function, resolving it only once per source
+            util_method = self._methods.get(key_def.source)
+            if util_method is None:
+                # Check if the utility function exists
+                if not hasattr(self.utils, key_def.source):
+                    raise ValueError(f"Utility method {key_def.source} not found")
+                util_method = self._methods[key_def.source] = getattr(self.utils, key_def.source)
 
-            # Get the utility function
-            util_method = getattr(self.utils, key_def.source)
-            
-            # Call the function with the low-level event
-            return util_method(low_level_event)
+            # Call the function with the low-level event; results are memoized
+            # on the event so other keys and rules reuse them
+            if self.profiler is None:
+                return util_method(low_level_event)
+
+            start = perf_counter()
+            value = util_method(low_level_event)
+            self.profiler.record_extractor(key_def.source, value, perf_counter() - start)
+            return value
             
         except Exception as e:
             print(f"Error processing key {key_def.name} with source {key_def.source}: {str(e)}")
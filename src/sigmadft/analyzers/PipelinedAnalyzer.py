@@ -0,0 +1,237 @@
+# src/sigmadft/analyzers/PipelinedAnalyzer.py
+
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import sigmadft.analyzers.ReadFromYamlAnalyzer as ReadFromYamlAnalyzer
+from sigmadft.analyzers.StreamingAnalyzer import StreamingAnalyzer
+from sigmadft.events.HighLevelEvent import HighLevelEvent
+from sigmadft.output.JSONWriter import JSONWriter
+from sigmadft.reader.CSVReader import CSVReader
+from sigmadft.reader.TimeRange import TimeRange
+from sigmadft.rules.CorrelationRule import CorrelationRule
+from sigmadft.rules.LogSource import LogSourceMapping
+from sigmadft.rules.Rule import Rule
+from sigmadft.timelines.HighLevelTimeline import MergeHighLevelTimeline
+from sigmadft.timelines.LowLevelTimeline import LowLevelTimeline, num_supporting_events
+from sigmadft.timelines.MatchCache import DEFAULT_MAX_ENTRIES
+
+
+DEFAULT_CHUNK_ROWS = 10000
+DEFAULT_QUEUE_DEPTH = 4
+
+# Marks the end of a stage's output on its queue
+_END = None
+
+
+class OrderedJSONWriter:
+    """Serializes events on a writer thread and writes them in merged timeline order.
+
+    Events arrive batch by batch; they are ordered by time, then by rule, then
+    by arrival, which is the order the one-shot merge of all rules gives, so
+    the file is the same as JSONWriter's. Serialized events are spilled to a
+    temporary file next to the output, so memory holds only their sort keys.
+    """
+
+    def __init__(self, json_path: str, queue_depth: int = DEFAULT_QUEUE_DEPTH):
+        self.json_path = json_path
+        # Rule position of each event not yet written, by id(event)
+        self.rule_positions: Dict[int, int] = {}
+        self.seconds = 0.0
+        self.bytes_written = 0
+        self._queue: "queue.Queue[Optional[list]]" = queue.Queue(queue_depth)
+        self._spill = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(json_path)))
+        self._entries: List[Tuple] = []  # (time, rule position, sequence, spill offset, length)
+        self._sequence = 0
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._serialize, name="sigmadft-writer", daemon=True)
+        self._thread.start()
+
+    def write_events(self, events: List[HighLevelEvent]):
+        """Queues events whose supporting events are complete; blocks while the writer is behind"""
+        items = []
+        for event in events:
+            items.append((event.date_time_iso, self.rule_positions.pop(id(event)), self._sequence, event))
+            self._sequence += 1
+        self._queue.put(items)
+
+    def _serialize(self):
+        try:
+            offset = 0
+            while True:
+                items = self._queue.get()
+                if items is _END:
+                    return
+                started = time.perf_counter()
+                for date_time_iso, rule_position, sequence, event in items:
+                    # Indented one level, as json.dump nests it under its index; the
+                    # text is ASCII since json.dumps escapes everything else
+                    data = json.dumps(JSONWriter.event_to_dict(event), indent=4).replace("\n", "\n    ").encode("ascii")
+                    self._spill.write(data)
+                    self._entries.append((date_time_iso, rule_position, sequence, offset, len(data)))
+                    offset += len(data)
+                self.seconds += time.perf_counter() - started
+        except BaseException as e:
+            self._error = e
+            # Keep draining so the matcher never blocks on a dead writer
+            while self._queue.get() is not _END:
+                pass
+
+    def close(self) -> int:
+        """Writes the serialized events and returns their number; nothing is written without events"""
+        self._queue.put(_END)
+        self._thread.join()
+        try:
+            if self._error is not None:
+                raise self._error
+            if not self._entries:
+                return 0
+
+            started = time.perf_counter()
+            self._entries.sort(key=lambda entry: entry[:3])
+            self._spill.flush()
+            with open(self.json_path, "wb") as file:
+                file.write(b"{\n")
+                for index, (_, _, _, offset, length) in enumerate(self._entries):
+                    if index:
+                        file.write(b",\n")
+                    file.write(f'    "{index}": '.encode("ascii"))
+                    self._spill.seek(offset)
+                    file.write(self._spill.read(length))
+                file.write(b"\n}")
+                self.bytes_written = file.tell()
+            self.seconds += time.perf_counter() - started
+            return len(self._entries)
+        finally:
+            self._spill.close()
+
+
+class PipelinedAnalyzer(StreamingAnalyzer):
+    """Runs reading, matching and writing as overlapping stages.
+
+    A reader thread reads and decompresses the CSV into chunks of rows, the
+    calling thread runs the rules over each chunk as soon as it arrives, and a
+    writer thread serializes the events. Bounded queues between the stages hold
+    back a stage that runs ahead, so only a few chunks of low-level events are
+    in memory at a time instead of the whole timeline.
+    """
+
+    def __init__(
+        self,
+        rules: List[Rule],
+        output_path: str,
+        match_cache_size: int = DEFAULT_MAX_ENTRIES,
+        logsource_mapping: Optional[LogSourceMapping] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        queue_depth: int = DEFAULT_QUEUE_DEPTH,
+        adaptive_order: bool = True,
+        row_pushdown: bool = True,
+        time_range: Optional[TimeRange] = None,
+    ):
+        super().__init__(
+            rules,
+            OrderedJSONWriter(output_path, queue_depth),
+            match_cache_size=match_cache_size,
+            logsource_mapping=logsource_mapping,
+            lookahead_timeout=float("inf"),
+            adaptive_order=adaptive_order,
+            row_pushdown=row_pushdown,
+            time_range=time_range,
+        )
+        # A chunk must hold the rows after the events of the chunk before it
+        self.chunk_rows = max(chunk_rows, num_supporting_events)
+        self.queue_depth = queue_depth
+        self.read_seconds = 0.0
+        self.match_seconds = 0.0
+        self.failed_rules = set()
+
+    def _match(self, timeline: LowLevelTimeline, first_position: int) -> List[HighLevelEvent]:
+        base_rules = [rule for rule in self.rules if not isinstance(rule, CorrelationRule)]
+        hidden_rules = self.correlation_analyzer.hidden_rules(base_rules) if self.correlation_analyzer else []
+        high_timelines = []
+        events_by_rule: Dict[int, List[HighLevelEvent]] = {}
+        for position, rule in enumerate(base_rules + hidden_rules):
+            try:
+                high_timeline = ReadFromYamlAnalyzer.Run(timeline, rule, first_position)
+            except Exception as e:
+                if position not in self.failed_rules:
+                    self.failed_rules.add(position)
+                    print(f"  ✗ Error processing rule {rule.title}: {str(e)}")
+                continue
+            events_by_rule[id(rule)] = high_timeline.events
+            if position < len(base_rules):
+                high_timelines.append((position, high_timeline))
+        if self.correlation_analyzer is not None:
+            # Correlations come after the other rules, as in the one-shot run
+            for offset, high_timeline in enumerate(self.correlation_analyzer.process(events_by_rule)):
+                high_timelines.append((len(base_rules) + offset, high_timeline))
+
+        events = []
+        for position, high_timeline in high_timelines:
+            # Sets the sort time and replaces invalid dates, as the one-shot merge does
+            for event in MergeHighLevelTimeline([high_timeline]).merge().events:
+                self.writer.rule_positions[id(event)] = position
+                events.append(event)
+        return events
+
+    def _read(self, reader: CSVReader, chunks: "queue.Queue[Optional[list]]", stop: threading.Event):
+        started = time.perf_counter()
+        waited = 0.0
+
+        def put(item):
+            nonlocal waited
+            put_start = time.perf_counter()
+            chunks.put(item)
+            waited += time.perf_counter() - put_start
+
+        try:
+            chunk = []
+            for index, row in reader.read_csv():
+                if index == 0:  # Skip the first row, it is the CSV header
+                    continue
+                chunk.append((index, row))
+                if len(chunk) >= self.chunk_rows:
+                    put(chunk)
+                    chunk = []
+                    if stop.is_set():
+                        return
+            if chunk:
+                put(chunk)
+        except BaseException as e:
+            put(e)
+        finally:
+            put(_END)
+            self.read_seconds = time.perf_counter() - started - waited
+
+    def run(self, reader: CSVReader) -> int:
+        """Analyzes the whole input and writes the output; returns the number of events"""
+        chunks: "queue.Queue[Optional[list]]" = queue.Queue(self.queue_depth)
+        stop = threading.Event()
+        reader_thread = threading.Thread(
+            target=self._read, args=(reader, chunks, stop), name="sigmadft-reader", daemon=True
+        )
+        reader_thread.start()
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is _END:
+                    break
+                if isinstance(chunk, BaseException):
+                    raise chunk
+                started = time.perf_counter()
+                self.process(chunk)
+                self.match_seconds += time.perf_counter() - started
+        finally:
+            stop.set()
+            # Unblock the reader if it is waiting on a full queue
+            while reader_thread.is_alive():
+                try:
+                    chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        self.flush(force=True)
+        return self.writer.close()
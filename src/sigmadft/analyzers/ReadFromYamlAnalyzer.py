@@ -2,17 +2,23 @@
 
 __author__ = ['Java Kanaya Prada']
 
-from typing import List 
+from typing import Callable, Dict, List, Optional, Tuple
+from sigmadft.analyzers.CorrelationAnalyzer import CorrelationAnalyzer
 from sigmadft.analyzers.KeyProcessor import KeyProcessor
 from sigmadft.events.BaseEvent import BaseEvent
 from sigmadft.events.LowLevelEvent import LowLevelEvent
 from sigmadft.events.HighLevelEvent import HighLevelEvent, ReasoningArtefact
-from sigmadft.timelines.HighLevelTimeline import HighLevelTimeline
+from sigmadft.timelines.HighLevelTimeline import HighLevelTimeline, MergeHighLevelTimeline
 from sigmadft.timelines.LowLevelTimeline import LowLevelTimeline
+from sigmadft.rules.CorrelationRule import CorrelationRule
+from sigmadft.rules.DescriptionTemplate import DescriptionTemplate
 from sigmadft.rules.Rule import KeyDefinition, Rule
 from datetime import datetime
 
 
+# Shared across rules so extractor lookups are resolved once per run
+key_processor = KeyProcessor()
+
 def Run(low_level_timeline: LowLevelTimeline, rule: Rule, start_id: int=0, end_id=None) -> HighLevelTimeline:
     """Runs the Google Search analyser"""
     if end_id is None:
@@ -20,6 +26,41 @@ def Run(low_level_timeline: LowLevelTimeline, rule: Rule, start_id: int=0, end_i
     
     return CreateHighTimeline(low_level_timeline, rule, start_id, end_id)
 
+def RunAll(low_level_timeline: LowLevelTimeline, rules: List[Rule], start_id: int=0, should_stop: Optional[Callable[[], bool]]=None, correlation_analyzer: Optional[CorrelationAnalyzer]=None) -> Tuple[HighLevelTimeline, List[str]]:
+    """Runs every rule and returns the merged timeline and the errors of failed rules.
+
+    should_stop is checked before each rule, so a caller can cancel between rules.
+    Correlation rules among the rules run after the others, over their events;
+    pass a correlation_analyzer to keep their windows between calls.
+    """
+    base_rules = [rule for rule in rules if not isinstance(rule, CorrelationRule)]
+    correlation_rules = [rule for rule in rules if isinstance(rule, CorrelationRule)]
+    if correlation_rules and correlation_analyzer is None:
+        correlation_analyzer = CorrelationAnalyzer(correlation_rules)
+    # Referenced rules that were not selected run only to feed the correlations
+    hidden_rules = correlation_analyzer.hidden_rules(base_rules) if correlation_analyzer else []
+
+    high_timelines = []
+    errors = []
+    events_by_rule: Dict[int, List[HighLevelEvent]] = {}
+    for rule in base_rules + hidden_rules:
+        if should_stop is not None and should_stop():
+            break
+        try:
+            high_timeline = Run(low_level_timeline, rule, start_id)
+        except Exception as e:
+            errors.append(f"{rule.title}: {str(e)}")
+            continue
+        events_by_rule[id(rule)] = high_timeline.events
+        if high_timeline.events and all(rule is not hidden for hidden in hidden_rules):
+            high_timelines.append(high_timeline)
+
+    if correlation_analyzer is not None and not (should_stop is not None and should_stop()):
+        high_timelines.extend(
+            timeline for timeline in correlation_analyzer.process(events_by_rule) if timeline.events
+        )
+    return MergeHighLevelTimeline(high_timelines).merge(), errors
+
 def CreateHighTimeline(low_level_timeline: LowLevelTimeline, rule: Rule, start_id: int=0, end_id: int=None) -> HighLevelTimeline:
 
     # Find matching events
@@ -53,7 +94,7 @@ def CreateHighTimeline(low_level_timeline: LowLevelTimeline, rule: Rule, start_i
 
             # Set description after key definition
             high_event.description = format_description(
-                    rule.high_level_event.description, high_event
+                    rule.high_level_event.description_template, high_event
                 )
                         
             # Create and set trigger
@@ -81,8 +122,6 @@ def process_keys(
     key_definitions: List[KeyDefinition],
 ) -> None:
     """Process key definitions and set values in high-level event"""
-    key_processor = KeyProcessor()
-
     for key_def in key_definitions:
         try:
             # Process the key using our new processor
@@ -104,7 +143,7 @@ def create_trigger(rule: Rule, low_level_event: LowLevelEvent, high_level_event:
     trigger = ReasoningArtefact()
     trigger.id = low_level_event.id
     trigger.description = format_description(
-        rule.reasoning.description, low_level_event
+        rule.reasoning.description_template, low_level_event
     )
     trigger.provenance = low_level_event.provenance
     trigger.references = rule.references
@@ -115,11 +154,6 @@ def create_trigger(rule: Rule, low_level_event: LowLevelEvent, high_level_event:
     trigger.keys = high_level_event.keys
     return trigger
 
-def format_description(description_template: str, event: BaseEvent) -> str:
-    """Format the description template with event data"""
-    try:
-        # First try to format using any available keys in the low level event
-        return description_template.format(**event.to_dict())
-    except:  # noqa: E722
-        # If that fails, return the template as is
-        return description_template
+def format_description(description_template: DescriptionTemplate, event: BaseEvent) -> str:
+    """Format the compiled description template with the event fields it references"""
+    return description_template.render(event)
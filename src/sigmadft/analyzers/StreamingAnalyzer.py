@@ -0,0 +1,144 @@
+# src/sigmadft/analyzers/StreamingAnalyzer.py
+
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple, Union
+import sigmadft.analyzers.ReadFromYamlAnalyzer as ReadFromYamlAnalyzer
+from sigmadft.analyzers.CorrelationAnalyzer import CorrelationAnalyzer
+from sigmadft.events.DeferredEvent import DeferredEvent
+from sigmadft.events.HighLevelEvent import HighLevelEvent
+from sigmadft.events.LowLevelEvent import LowLevelEvent
+from sigmadft.output.JSONLinesWriter import JSONLinesWriter
+from sigmadft.reader.TailReader import TailReader
+from sigmadft.reader.TimeRange import TimeRange
+from sigmadft.rules.CorrelationRule import CorrelationRule
+from sigmadft.rules.LogSource import LogSourceMapping
+from sigmadft.rules.Rule import Rule
+from sigmadft.timelines.LowLevelTimeline import LowLevelTimeline, num_supporting_events
+from sigmadft.timelines.MatchCache import DEFAULT_MAX_ENTRIES, MatchCache
+from sigmadft.timelines.RowFilter import RowFilter
+from sigmadft.timelines.SelectivityTuner import SelectivityTuner
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class StreamingAnalyzer:
+    """Runs compiled rules over batches of rows from a growing timeline.
+
+    Only the last rows needed as supporting events are kept between batches.
+    A matched event is held until the rows after it arrive or the lookahead
+    timeout passes, and events are written in the order they were found.
+    """
+
+    def __init__(
+        self,
+        rules: List[Rule],
+        writer: JSONLinesWriter,
+        match_cache_size: int = DEFAULT_MAX_ENTRIES,
+        logsource_mapping: Optional[LogSourceMapping] = None,
+        lookahead_timeout: float = 5.0,
+        adaptive_order: bool = True,
+        row_pushdown: bool = True,
+        time_range: Optional[TimeRange] = None,
+    ):
+        self.rules = rules
+        self.writer = writer
+        # Correlation windows carry over from batch to batch
+        correlation_rules = [rule for rule in rules if isinstance(rule, CorrelationRule)]
+        self.correlation_analyzer = CorrelationAnalyzer(correlation_rules) if correlation_rules else None
+        self.match_cache = MatchCache(match_cache_size) if match_cache_size > 0 else None
+        self.tuner = SelectivityTuner() if adaptive_order else None
+        self.row_filter = RowFilter.from_rules(rules, time_range, pushdown=row_pushdown)
+        # Rows outside a time range are skipped, so ids follow the row's line number
+        self.line_ids = time_range is not None
+        self.logsource_mapping = logsource_mapping
+        self.lookahead_timeout = lookahead_timeout
+        self.window: Deque[Union[LowLevelEvent, DeferredEvent]] = deque(maxlen=num_supporting_events)
+        self.pending: Deque[Tuple[float, HighLevelEvent]] = deque()  # (deadline, event)
+        self.next_id = 1
+        self.rows = 0
+        self.emitted = 0
+
+    def process(self, rows: List[Tuple[int, list]]) -> int:
+        """Analyzes a batch of (line number, row) pairs and writes the events that are complete"""
+        timeline = LowLevelTimeline(
+            match_cache_size=0,
+            logsource_mapping=self.logsource_mapping,
+            adaptive_order=False,
+            row_filter=self.row_filter,
+        )
+        # One cache and one predicate order for the whole stream
+        timeline.match_cache = self.match_cache
+        timeline.tuner = self.tuner
+        timeline.id_offset = self.next_id - 1 - len(self.window)
+        for event in self.window:
+            if isinstance(event, DeferredEvent):
+                timeline.add_deferred(event)
+            else:
+                timeline.add_event(event, event.provenance['raw_entry'][5])
+        first_position = len(timeline.events)
+
+        for line_number, row in rows:
+            if len(row) < 7:
+                print(f"Warning: Skipping malformed row at line {line_number} of the input")
+                continue
+            row_id = line_number if self.line_ids else self.next_id
+            timeline.ingest_row(row_id, row, line_number)
+            self.next_id = row_id + 1
+        self.rows += len(timeline.events) - first_position
+
+        # Events held from earlier batches can now see the rows after them. Only
+        # events among the last rows lack some, and those rows are in the window.
+        for _, event in self.pending:
+            if len(event.supporting['after']) < num_supporting_events:
+                event.supporting['after'] = timeline.get_supporting_events(event.id)['after']
+
+        deadline = time.monotonic() + self.lookahead_timeout
+        for event in self._match(timeline, first_position):
+            self.pending.append((deadline, event))
+
+        self.window.extend(timeline.events[-num_supporting_events:])
+        return self.flush()
+
+    def _match(self, timeline: LowLevelTimeline, first_position: int) -> List[HighLevelEvent]:
+        """Runs the rules over the new rows of a batch and returns their events in output order"""
+        merged, errors = ReadFromYamlAnalyzer.RunAll(
+            timeline, self.rules, first_position, correlation_analyzer=self.correlation_analyzer
+        )
+        for error in errors:
+            print(f"  ✗ Error processing rule {error}")
+        return merged.events
+
+    def flush(self, force: bool = False) -> int:
+        """Writes the held events whose lookahead is complete or timed out, in order"""
+        now = time.monotonic()
+        ready = []
+        while self.pending:
+            deadline, event = self.pending[0]
+            complete = len(event.supporting['after']) >= num_supporting_events
+            if not (force or complete or now >= deadline):
+                break
+            ready.append(event)
+            self.pending.popleft()
+
+        if ready:
+            self.writer.write_events(ready)
+            self.emitted += len(ready)
+        return len(ready)
+
+    def follow(self, reader: TailReader, poll_interval: float = 1.0, batch_size: int = DEFAULT_BATCH_SIZE):
+        """Analyzes rows as they are appended until interrupted"""
+        try:
+            while True:
+                rows = reader.poll(batch_size)
+                if rows:
+                    self.process(rows)
+                else:
+                    self.flush()
+                    time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            reader.close()
+            self.flush(force=True)
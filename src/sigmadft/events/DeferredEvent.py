@@ -0,0 +1,29 @@
+# src/sigmadft/events/DeferredEvent.py
+
+from typing import Any, Dict, Optional
+from sigmadft.events.LowLevelEvent import LowLevelEvent
+
+
+class DeferredEvent:
+    """A timeline row that no selected rule can match.
+
+    Only the raw CSV row is kept, so the row can still be shown as a
+    supporting event of a match next to it. The full LowLevelEvent is built
+    when it is needed and not kept.
+    """
+
+    __slots__ = ("id", "row", "line_number")
+
+    def __init__(self, index: int, row: list, line_number: Optional[int] = None):
+        self.id = index
+        self.row = row
+        self.line_number = index if line_number is None else line_number
+
+    def materialize(self) -> LowLevelEvent:
+        """Builds the event that add_row would have created for the row"""
+        event = LowLevelEvent.from_row(self.id, self.row)
+        event.provenance['line_number'] = self.line_number
+        return event
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.materialize().to_dict()
@@ -13,6 +13,7 @@ class HighLevelEvent(BaseEvent):
         self.evidence_source: Optional[str] = None              
         self.description: Optional[str] = None                  
         self.category: Optional[str] = None                     
+        self.plugin: Optional[str] = None                       # plaso plugin of the matched low-level event
         self.device: Optional[str] = None                       
         self.files: Optional[List[str]] = None                  
         self.trigger: Optional[ReasoningArtefact] = None        
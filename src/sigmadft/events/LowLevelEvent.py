@@ -1,7 +1,7 @@
 # src/sigmadft/events/LowLevelEvent.py
 
 import re
-from typing import  Optional, Dict
+from typing import  Any, Optional, Dict
 from sigmadft.events.BaseEvent import BaseEvent
 
 
@@ -12,6 +12,8 @@ class LowLevelEvent(BaseEvent):
         self.provenance: Optional[Dict] = None    
         self.evidence: Optional[str] = None       
         self.plugin: Optional[str] = None         
+        self.extracted: Optional[Dict[str, Any]] = None     # per-event cache of Utils extractor results
+        self.attributes: Optional[Dict[str, Any]] = None    # structured attributes, e.g. url or hostname
     
     def match(self, test_event):
         """Tries to match a test event with the current event and returns true if they match"""
@@ -22,6 +24,15 @@ class LowLevelEvent(BaseEvent):
         else:
             return True
     
+    def attribute(self, name: str) -> Optional[str]:
+        """Returns a structured attribute as text, or None if the input has none or plaso left it unset"""
+        if self.attributes is None:
+            return None
+        value = self.attributes.get(name)
+        if value is None or value == "-" or value == "":
+            return None
+        return str(value)
+
     def to_dict(self):
         """Converts the event to a dictionary"""
         event_dict = {
@@ -37,6 +48,34 @@ class LowLevelEvent(BaseEvent):
         }
         
         return event_dict
+
+    @classmethod
+    def from_row(cls, index: int, row: list) -> "LowLevelEvent":
+        """Creates an event from a plaso CSV row"""
+        event = cls()
+        event.id = index
+        event.date_time_min = row[0]                    # [0] datetime
+        event.date_time_max = None
+        event.type = f"{row[1]}-{row[2]}"               # [1] timestamp_desc, [3] source_long
+        event.path = row[6]                             # [6] display_name
+        event.evidence = row[4]                         # [4] message
+        event.plugin = f"{row[2]}-{row[3]}-{row[5]}"    # [2] source, [3] source_long, [5] parser
+        event.provenance = {
+            'line_number': index,
+            'raw_entry': row
+        }
+        event.keys = None
+        # Rows from JSON Lines, or with attribute columns, carry the event's attributes
+        event.attributes = getattr(row, 'attributes', None)
+        return event
+
+    @classmethod
+    def from_dict(cls, event_dict: Dict[str, Any]) -> "LowLevelEvent":
+        """Creates an event from the output of to_dict"""
+        event = cls()
+        for name in ('id', 'date_time_min', 'date_time_max', 'type', 'path', 'evidence', 'provenance', 'plugin', 'keys'):
+            setattr(event, name, event_dict.get(name))
+        return event
     
     
 
@@ -2,16 +2,16 @@
 
 import argparse
 import os
-import time
 from datetime import datetime
-from typing import List
-import sigmadft.analyzers.ReadFromYamlAnalyzer as ReadFromYamlAnalyzer
-from sigmadft.reader.CSVReader import CSVReader
-from sigmadft.reader.YAMLReader import YAMLReader
-from sigmadft.timelines.LowLevelTimeline import LowLevelTimeline
-from sigmadft.timelines.HighLevelTimeline import MergeHighLevelTimeline
-from sigmadft.output.JSONWriter import JSONWriter
-from sigmadft.rules.Rule import Rule
+from typing import TYPE_CHECKING, List, Optional
+
+# Stage modules are imported inside main() when the stage runs, so that
+# `sigmadft -h` and short runs only pay for what they use.
+if TYPE_CHECKING:
+    from sigmadft.reader.CSVReader import CSVReader
+    from sigmadft.rules.Rule import Rule
+    from sigmadft.timelines.SelectivityTuner import SelectivityTuner
+    from sigmadft.utils.Metrics import Metrics
 
 
 def format_duration(seconds):
@@ -26,6 +26,21 @@ def format_duration(seconds):
         return f"{minutes}m {remaining_seconds:.2f}s"
 
 
+def load_tuner(args: argparse.Namespace, tuner: Optional["SelectivityTuner"]) -> Optional["SelectivityTuner"]:
+    """Replaces the stage's predicate tuner with one seeded from --selectivity-stats"""
+    if tuner is None or not args.selectivity_stats:
+        return tuner
+    from sigmadft.timelines.SelectivityTuner import SelectivityTuner
+
+    return SelectivityTuner.load(args.selectivity_stats, sample_size=tuner.sample_size, retune_interval=tuner.retune_interval)
+
+
+def save_tuner(args: argparse.Namespace, tuner: Optional["SelectivityTuner"]) -> None:
+    if tuner is not None and args.selectivity_stats:
+        tuner.save(args.selectivity_stats)
+        print(f"  ✓ Keyword hit rates saved to {args.selectivity_stats}")
+
+
 # Main function
 def main():
     # Parse command line arguments
@@ -36,7 +51,7 @@ def main():
         action="store",
         required=True,
         type=str,
-        help="Path to a CSV file from plaso.",
+        help="Path to a CSV file from plaso (optionally .gz, .bz2 or .xz), or for a batch run a directory, a quoted glob, or @manifest listing CSV files.",
     )
     parser.add_argument(
         "-o",
@@ -44,7 +59,7 @@ def main():
         action="store",
         required=True,
         type=str,
-        help="Output file path.",
+        help="Output file path, or the output directory of a batch run.",
     )
     parser.add_argument(
         "-t",
@@ -52,159 +67,319 @@ def main():
         action="store",
         required=False,
         type=str,
-        help="Type of the timeline to create.",
+        help=(
+            "Type of the timeline to create: a rule set name (see README.md) or a "
+            "comma-separated rule selector such as 'tag:authentication,level>=medium'."
+        ),
+    )
+    parser.add_argument(
+        "--rules-dir",
+        action="append",
+        required=False,
+        type=str,
+        help="Additional directory of YAML rules to index (can be repeated).",
+    )
+    parser.add_argument(
+        "--logsource-map",
+        action="store",
+        required=False,
+        type=str,
+        help="YAML file mapping rule logsource values to plaso parsers (default: config/logsource_mapping.yml).",
+    )
+    parser.add_argument(
+        "--no-logsource-routing",
+        action="store_true",
+        help="Scan every event with every rule instead of routing rules by logsource.",
+    )
+    parser.add_argument(
+        "--match-cache-size",
+        action="store",
+        required=False,
+        type=int,
+        default=100000,
+        help="Maximum number of distinct messages whose rule-match results are cached (0 disables the cache).",
+    )
+    parser.add_argument(
+        "--no-adaptive-order",
+        action="store_true",
+        help="Check rule keywords in their compiled order instead of reordering them by the hit rates sampled from the timeline.",
+    )
+    parser.add_argument(
+        "--no-row-pushdown",
+        action="store_true",
+        help="Build a full event for every row, instead of keeping rows no selected rule can match only as supporting events.",
+    )
+    parser.add_argument(
+        "--since",
+        action="store",
+        required=False,
+        type=str,
+        help="Only analyze rows at or after this UTC time (ISO 8601, e.g. 2024-01-01 or 2024-01-01T08:30:00).",
+    )
+    parser.add_argument(
+        "--until",
+        action="store",
+        required=False,
+        type=str,
+        help="Only analyze rows at or before this UTC time; a date or partial time includes all of it.",
+    )
+    parser.add_argument(
+        "--sorted-input",
+        action="store_true",
+        help="The input rows are in time order, so reading stops at the first row after --until.",
+    )
+    parser.add_argument(
+        "--input-format",
+        action="store",
+        choices=["auto", "csv", "jsonl"],
+        default="auto",
+        help="Format of the input: plaso CSV or json_line output (default: jsonl for .jsonl and .ndjson files, else csv).",
+    )
+    parser.add_argument(
+        "--columns",
+        action="store",
+        required=False,
+        default="auto",
+        type=str,
+        help=(
+            "How to map CSV columns by header name: 'dynamic' or 'l2tcsv' for psort's output formats, "
+            "or a YAML file mapping the plaso columns to header names (default: auto, detected from the header)."
+        ),
+    )
+    parser.add_argument(
+        "--decode-workers",
+        action="store",
+        required=False,
+        type=int,
+        default=1,
+        help="Processes decoding uncompressed JSON Lines input in parallel (default 1).",
+    )
+    parser.add_argument(
+        "--selectivity-stats",
+        action="store",
+        required=False,
+        type=str,
+        help="Load keyword hit rates from this JSON file to order rule keywords from the first row, and save the updated rates to it.",
+    )
+    parser.add_argument(
+        "--rule-cache-dir",
+        action="store",
+        required=False,
+        type=str,
+        help="Directory of the compiled rule-pack cache (default: the user cache directory).",
+    )
+    parser.add_argument(
+        "--no-rule-cache",
+        action="store_true",
+        help="Parse every YAML rule instead of using the compiled rule-pack cache.",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store",
+        required=False,
+        type=str,
+        help="Write per-stage and per-rule metrics to this file (Prometheus textfile for .prom, JSON otherwise).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store",
+        required=False,
+        type=str,
+        help="Run under cProfile and save the stats to this file (view with python -m pstats).",
+    )
+    parser.add_argument(
+        "--profile-rules",
+        action="store",
+        nargs="?",
+        const="",
+        required=False,
+        type=str,
+        help="Time every rule keyword and key extractor and print the costliest ones; optionally save the full profile as JSON.",
+    )
+    parser.add_argument(
+        "--memory-report",
+        action="store",
+        nargs="?",
+        const="",
+        required=False,
+        type=str,
+        help="Trace memory per stage and rule (slows the run) and print peak RSS and the top allocation sites; optionally save the report as JSON.",
+    )
+    parser.add_argument(
+        "--state",
+        action="store",
+        required=False,
+        type=str,
+        help="Checkpoint file for incremental runs: only rows added since the saved run are analyzed and appended to the output.",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep reading rows as they are appended to the input (like tail -F) and append events to the output as JSON Lines.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        action="store",
+        required=False,
+        type=float,
+        default=1.0,
+        help="Seconds between checks for new rows in --follow mode (default 1).",
+    )
+    parser.add_argument(
+        "--lookahead-timeout",
+        action="store",
+        required=False,
+        type=float,
+        default=5.0,
+        help="Seconds an event waits in --follow mode for the rows after it before it is written with fewer supporting events (default 5).",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Read, match and write in overlapping stages connected by bounded queues, keeping only a few chunks of rows in memory.",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        action="store",
+        required=False,
+        type=int,
+        default=10000,
+        help="Rows per chunk passed between --pipeline stages (default 10000).",
+    )
+    parser.add_argument(
+        "--workers",
+        action="store",
+        required=False,
+        type=int,
+        help="Worker processes for batch inputs (default: number of CPUs).",
+    )
+    parser.add_argument(
+        "--merge-output",
+        action="store_true",
+        help="Write the events of all batch inputs to one output file, tagged with their device, instead of one file per input.",
+    )
+    parser.add_argument(
+        "--batch-summary",
+        action="store",
+        required=False,
+        type=str,
+        help="Per-file summary of a batch run (default: batch_summary.json in the output directory, or <output>.summary.json).",
     )
 
     # Read the arguments from the command line
     args = parser.parse_args()
+
+    from sigmadft.utils.Metrics import Metrics
+
+    memory_report = None
+    if args.memory_report is not None:
+        from sigmadft.utils.MemoryReport import MemoryReport
+
+        memory_report = MemoryReport()
+        memory_report.start()
+
+    metrics = Metrics(enabled=args.metrics is not None, memory_report=memory_report)
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(run, args, metrics)
+        finally:
+            profiler.dump_stats(args.profile)
+            print(f"Profile written to {args.profile}")
+    else:
+        run(args, metrics)
+
+    if args.metrics:
+        metrics.write(args.metrics)
+        print(f"Metrics written to {args.metrics}")
+
+    if memory_report is not None:
+        memory_report.stop()
+        print(memory_report.report())
+        if args.memory_report:
+            memory_report.write(args.memory_report)
+            print(f"Memory report written to {args.memory_report}")
+
+
+def print_time_range_skips(reader: "CSVReader"):
+    """Prints how many rows a time-range read skipped without parsing them"""
+    print(f"  ✓ Time range: {reader.skipped:,} rows outside it skipped unparsed")
+    if reader.stopped_early:
+        print("  ✓ Time range: sorted input, stopped reading after --until")
+
+
+def read_header(reader: "CSVReader") -> bool:
+    """Binds the column mapping to the input's header; prints the error and returns False if it cannot be"""
+    try:
+        reader.read_header()
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        return False
+    return True
+
+
+def print_columns(reader: "CSVReader"):
+    """Prints how the input's columns were mapped when its rows are not used as they are"""
+    if reader.projection is not None and reader.projection.project is not None:
+        print(f"  ✓ Columns: {reader.projection}")
+
+
+def run(args: argparse.Namespace, metrics: "Metrics"):
+    """Runs the analysis for the parsed command line arguments"""
     input_path = args.input_path
     output_path = args.output_path
     event_type = args.type
     
     # Start timing the entire process
-    total_start_time = time.time()
+    total_start = metrics.start()
     start_datetime = datetime.now()
 
     print(f"[{start_datetime.strftime('%Y-%m-%d %H:%M:%S')}] Starting analysis...")
     print("=" * 60)
 
-    # Read the CSV file
-    csv_start_time = time.time()
-    print("Reading CSV file ...")
-    reader = CSVReader(input_path)
-    csv_end_time = time.time()
-    print(
-        f"  ✓ CSV reading completed in {format_duration(csv_end_time - csv_start_time)}"
-    )
+    # Rows outside the time range are skipped by the reader before they are parsed
+    time_range = None
+    if args.since or args.until:
+        from sigmadft.reader.TimeRange import TimeRange
 
-    # Create a list of LowLevelEvent objects
-    timeline_start_time = time.time()
-    print("Creating low-level timeline ...")
-    low_timeline = LowLevelTimeline()
-    low_timeline.create_timeline(reader)
-    timeline_end_time = time.time()
-    print(
-        f"  ✓ Low-level timeline created with {len(low_timeline.events)} events in {format_duration(timeline_end_time - timeline_start_time)}"
-    )
+        try:
+            time_range = TimeRange(args.since, args.until, sorted_input=args.sorted_input)
+        except ValueError as e:
+            print(f"Error: {str(e)}")
+            return
+        if args.follow or args.state:
+            print("Warning: --since and --until are ignored with --follow and --state")
+            time_range = None
+        else:
+            print(f"Analyzing rows from {time_range}")
+    elif args.sorted_input:
+        print("Warning: --sorted-input has no effect without --since or --until")
 
-    # Create a list of high-level timeline
-    high_timelines = []
+    # Select rules from the rule index by rule set name or selector
+    from sigmadft.reader.RuleIndex import BUNDLED_RULES_DIR, LOGSOURCE_MAPPING_PATH, RuleIndex
 
-    # List of search rules
-    # Dictionary mapping event types to rules
-    event_analyzers = {
-        # Web browsing related events
-        "google-search": ["/web/google_search.yml"],
-        "bing-search": ["/web/bing_search.yml"],
-        "web-visits": ["/web/web_visit.yml"],
-        "youtube-watch": ["/web/youtube_watch.yml"],
-        "all-web-activity": [
-            "/web/google_search.yml",
-            "/web/bing_search.yml",
-            "/web/web_visit.yml",
-            "/web/youtube_watch.yml",
-        ],
-        # Linux Account Management
-        "user-add": [
-            "/linux/custom_susp/lnx_user_add.yml",
-        ],
-        "user-mod": [
-            "/linux/custom_susp/lnx_user_mod.yml",
-        ],
-        "account-management-activity": [
-            "/linux/custom_susp/lnx_user_add.yml",
-            "/linux/custom_susp/lnx_user_mod.yml",
-        ],
-        # Authentication related events
-        "auth-failure": [
-            "/linux/custom_susp/lnx_auth_failure.yml",
-        ],
-        "session-opened": [
-            "/linux/custom_susp/lnx_session_opened.yml",
-        ],
-        "authentication-activity": [
-            "/linux/custom_susp/lnx_auth_failure.yml",
-            "/linux/custom_susp/lnx_session_opened.yml",
-        ],
-        # Web security events
-        "web-shell": [
-            "/linux/custom_susp/lnx_web_shell_detection.yml",
-        ],
-        # System log related events
-        "security-tools": [
-            "/linux/builtin/syslog/lnx_syslog_security_tools_disabling_syslog.yml"
-        ],
-        "suspicious-dns": ["/linux/builtin/syslog/lnx_syslog_susp_named.yml"],
-        # Cron related events
-        "crontab-modification": [
-            "/linux/builtin/cron/lnx_cron_crontab_file_modification.yml"
-        ],
-        # VSFTPD related events
-        "ftp-errors": ["/linux/builtin/vsftpd/lnx_vsftpd_susp_error_messages.yml"],
-        "suspicious-logs": ["/linux/builtin/lnx_shell_susp_log_entries.yml"],
-        # Comprehensive rule sets
-        "all-linux-security": [
-            "/linux/custom_susp/lnx_user_add.yml",
-            "/linux/custom_susp/lnx_user_mod.yml",
-            "/linux/custom_susp/lnx_auth_failure.yml",
-            "/linux/custom_susp/lnx_session_opened.yml",
-            "/linux/custom_susp/lnx_web_shell_detection.yml",
-            "/linux/builtin/syslog/lnx_syslog_security_tools_disabling_syslog.yml",
-            "/linux/builtin/syslog/lnx_syslog_susp_named.yml",
-            "/linux/builtin/cron/lnx_cron_crontab_file_modification.yml",
-            "/linux/builtin/vsftpd/lnx_vsftpd_susp_error_messages.yml",
-            "/linux/builtin/lnx_shell_susp_log_entries.yml",
-        ],
-        # Default for running all available rules
-        "all": [
-            # Web browsing rules
-            "/web/google_search.yml",
-            "/web/bing_search.yml",
-            "/web/web_visit.yml",
-            "/web/youtube_watch.yml",
-            # Linux account management rules
-            "/linux/custom_susp/lnx_user_add.yml",
-            "/linux/custom_susp/lnx_user_mod.yml",
-            # Authentication rules
-            "/linux/custom_susp/lnx_auth_failure.yml",
-            "/linux/custom_susp/lnx_session_opened.yml",
-            # Web shell rule
-            "/linux/custom_susp/lnx_web_shell_detection.yml",
-            # System security rules
-            "/linux/builtin/syslog/lnx_syslog_security_tools_disabling_syslog.yml",
-            "/linux/builtin/syslog/lnx_syslog_susp_named.yml",
-            # Cron and scheduled task rules
-            "/linux/builtin/cron/lnx_cron_crontab_file_modification.yml",
-            # FTP and service rules
-            "/linux/builtin/vsftpd/lnx_vsftpd_susp_error_messages.yml",
-            # General suspicious activity rules
-            "/linux/builtin/lnx_shell_susp_log_entries.yml",
-        ],
-    }
-
-    # Default rules - comprehensive set for general analysis
-    default_rules = [
-        # Core web activity rules
-        "/web/google_search.yml",
-        "/web/bing_search.yml",
-        "/web/web_visit.yml",
-        "/web/youtube_watch.yml",
-        # Core security rules
-        "/linux/custom_susp/lnx_user_add.yml",
-        "/linux/custom_susp/lnx_user_mod.yml",
-        "/linux/custom_susp/lnx_auth_failure.yml",
-        "/linux/custom_susp/lnx_session_opened.yml",
-        # Core system monitoring rules
-        "/linux/builtin/syslog/lnx_syslog_security_tools_disabling_syslog.yml",
-        "/linux/builtin/syslog/lnx_syslog_susp_named.yml",
-        "/linux/builtin/cron/lnx_cron_crontab_file_modification.yml",
-        "/linux/builtin/vsftpd/lnx_vsftpd_susp_error_messages.yml",
-        "/linux/builtin/lnx_shell_susp_log_entries.yml",
-        "/linux/custom_susp/lnx_web_shell_detection.yml",
-    ]
+    rule_index = RuleIndex(
+        [BUNDLED_RULES_DIR] + (args.rules_dir or []),
+        cache_dir=args.rule_cache_dir,
+        persist=not args.no_rule_cache,
+    )
+    try:
+        rules = rule_index.select(event_type)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        return
 
-    # Get rules based on event_type, or use default rules
-    rules = event_analyzers.get(event_type, default_rules)
+    # Route each rule only to the rows of parsers matching its logsource
+    logsource_mapping = None
+    if not args.no_logsource_routing:
+        from sigmadft.rules.LogSource import LogSourceMapping
+
+        logsource_mapping = LogSourceMapping(
+            rule_index.load_config(args.logsource_map or LOGSOURCE_MAPPING_PATH)
+        )
+    rule_index.save()
 
     # Print information about selected rules
     if event_type:
@@ -213,104 +388,505 @@ def main():
         print(f"Running analysis with default rule set ({len(rules)} rules)")
 
     # Read the YAML rules
-    rules_start_time = time.time()
+    rules_start = metrics.start()
     print("Loading YAML rules ...")
-    yaml_contents: List[Rule] = []
-    for rule in rules:
-        yaml_file_path = os.path.join(os.path.dirname(__file__), "rules" + rule)
+    yaml_contents: List["Rule"] = []
+    rule_paths: List[str] = []
+    rule_cache = None
+    if not args.no_rule_cache:
+        from sigmadft.reader.RulePackCache import RulePackCache
 
-        # Check if rule file exists
-        if not os.path.exists(yaml_file_path):
-            print(f"Warning: Rule file not found: {yaml_file_path}")
-            continue
+        rule_cache = RulePackCache(args.rule_cache_dir)
 
+    def load_rule(entry):
+        if rule_cache is not None:
+            return rule_cache.load_rule(entry.path, entry.content_hash)
+        from sigmadft.reader.YAMLReader import YAMLReader
+
+        return YAMLReader(entry.path).read()
+
+    from sigmadft.rules.CorrelationRule import CorrelationRule
+
+    for rule in rules:
         try:
-            reader = YAMLReader(yaml_file_path)
-            yaml_content = reader.read()
+            yaml_content = load_rule(rule)
             yaml_contents.append(yaml_content)
-            print(f"  ✓ Loaded rule: {rule}")
+            rule_paths.append(rule.relative_path)
+            print(f"  ✓ Loaded rule: {rule.relative_path}")
+            # Correlations are validated once their referenced rules are resolved
+            if not isinstance(yaml_content, CorrelationRule):
+                for error in yaml_content.validate():
+                    print(f"    ! {error}")
         except Exception as e:
-            print(f"  ✗ Error loading rule {rule}: {str(e)}")
+            print(f"  ✗ Error loading rule {rule.relative_path}: {str(e)}")
             continue
 
-    rules_end_time = time.time()
+    def load_reference(reference):
+        entry = rule_index.find(reference)
+        if entry is None:
+            return None
+        try:
+            referenced = load_rule(entry)
+        except Exception as e:
+            print(f"  ✗ Error loading rule {entry.relative_path}: {str(e)}")
+            return None
+        # Correlations of correlations are not supported
+        return None if isinstance(referenced, CorrelationRule) else referenced
+
+    for yaml_content in yaml_contents:
+        if isinstance(yaml_content, CorrelationRule):
+            for reference in yaml_content.resolve(yaml_contents, load_reference):
+                print(f"    ! {yaml_content.title}: referenced rule '{reference}' not found")
+            for error in yaml_content.validate():
+                print(f"    ! {yaml_content.title}: {error}")
+
+    if rule_cache is not None:
+        rule_cache.save()
+    rules_stage = metrics.record("load_rules", rules_start)
     print(
-        f"  ✓ Loaded {len(yaml_contents)} rules in {format_duration(rules_end_time - rules_start_time)}"
+        f"  ✓ Loaded {len(yaml_contents)} rules in {format_duration(rules_stage.wall_seconds)}"
     )
+    if rule_cache is not None:
+        print(
+            f"  ✓ Rule cache: {rule_cache.hits} cached, {rule_cache.misses} compiled ({rule_cache.pack_path})"
+        )
 
     if not yaml_contents:
         print("Error: No valid rules could be loaded. Exiting.")
         return
 
+    # Columns are mapped by header name, and only those the rules use are read
+    from sigmadft.reader.ColumnMapping import ColumnMapping, rule_attributes
+
+    try:
+        column_mapping = ColumnMapping.load(args.columns, rule_attributes(yaml_contents))
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        return
+
+    from sigmadft.analyzers.BatchAnalyzer import is_batch_input
+
+    if is_batch_input(input_path):
+        from sigmadft.analyzers.BatchAnalyzer import BatchAnalyzer, resolve_inputs
+
+        inputs = resolve_inputs(input_path)
+        if not inputs:
+            print(f"Error: No CSV files found for {input_path}")
+            return
+        if args.selectivity_stats:
+            print("Warning: --selectivity-stats is ignored for batch inputs")
+        batch_start = metrics.start()
+        batch_analyzer = BatchAnalyzer(
+            yaml_contents,
+            logsource_mapping=logsource_mapping,
+            match_cache_size=args.match_cache_size,
+            workers=args.workers,
+            adaptive_order=not args.no_adaptive_order,
+            row_pushdown=not args.no_row_pushdown,
+            time_range=time_range,
+            input_format=args.input_format,
+            column_mapping=column_mapping,
+        )
+        print(f"Analyzing {len(inputs)} timelines with {min(batch_analyzer.workers, len(inputs))} workers ...")
+        summaries = batch_analyzer.run(inputs, output_path, merge=args.merge_output)
+        batch_stage = metrics.record(
+            "batch",
+            batch_start,
+            events_scanned=sum(summary.rows for summary in summaries),
+            matches=sum(summary.events for summary in summaries),
+            bytes_read=sum(summary.size for summary in summaries),
+        )
+
+        summary_path = args.batch_summary or (
+            f"{output_path}.summary.json" if args.merge_output else os.path.join(output_path, "batch_summary.json")
+        )
+        BatchAnalyzer.write_summary(summaries, summary_path)
+        failed = [summary for summary in summaries if summary.status != "ok"]
+        print("=" * 60)
+        print(f"Timelines analyzed:  {len(summaries) - len(failed)} of {len(summaries)}")
+        print(f"Input events:        {sum(summary.rows for summary in summaries):,}")
+        print(f"Output events:       {sum(summary.events for summary in summaries):,}")
+        print(f"Total duration:      {format_duration(batch_stage.wall_seconds)}")
+        print(f"Summary:             {summary_path}")
+        for summary in failed:
+            print(f"  ✗ {summary.path}: {summary.error}")
+        return
+
+    if args.follow:
+        from sigmadft.analyzers.StreamingAnalyzer import StreamingAnalyzer
+        from sigmadft.output.JSONLinesWriter import JSONLinesWriter
+        from sigmadft.reader.CSVReader import reader_for
+        from sigmadft.reader.TailReader import TailReader
+
+        if args.state:
+            print("Warning: --state is ignored with --follow")
+        print(f"Following {input_path}, writing events to {output_path} (press Ctrl+C to stop) ...")
+        json_lines_writer = JSONLinesWriter(output_path)
+        streaming_analyzer = StreamingAnalyzer(
+            yaml_contents,
+            json_lines_writer,
+            match_cache_size=args.match_cache_size,
+            logsource_mapping=logsource_mapping,
+            lookahead_timeout=args.lookahead_timeout,
+            adaptive_order=not args.no_adaptive_order,
+            row_pushdown=not args.no_row_pushdown,
+        )
+        streaming_analyzer.tuner = load_tuner(args, streaming_analyzer.tuner)
+        try:
+            tail_reader = TailReader(
+                input_path, reader_for(input_path, input_format=args.input_format, column_mapping=column_mapping)
+            )
+            streaming_analyzer.follow(tail_reader, poll_interval=args.poll_interval)
+        finally:
+            json_lines_writer.close()
+            save_tuner(args, streaming_analyzer.tuner)
+        print(
+            f"  ✓ Analyzed {streaming_analyzer.rows:,} rows and wrote {streaming_analyzer.emitted:,} events"
+        )
+        return
+
+    if args.pipeline and args.state:
+        print("Warning: --pipeline is ignored with --state")
+    elif args.pipeline and args.profile_rules is not None:
+        print("Warning: --pipeline is ignored with --profile-rules")
+    elif args.pipeline:
+        from sigmadft.analyzers.PipelinedAnalyzer import PipelinedAnalyzer
+        from sigmadft.reader.CSVReader import reader_for
+
+        pipeline_start = metrics.start()
+        print(f"Running {len(yaml_contents)} rules in a pipeline over {input_path} ...")
+        pipelined_analyzer = PipelinedAnalyzer(
+            yaml_contents,
+            output_path,
+            match_cache_size=args.match_cache_size,
+            logsource_mapping=logsource_mapping,
+            chunk_rows=args.chunk_rows,
+            adaptive_order=not args.no_adaptive_order,
+            row_pushdown=not args.no_row_pushdown,
+            time_range=time_range,
+        )
+        pipelined_analyzer.tuner = load_tuner(args, pipelined_analyzer.tuner)
+        reader = reader_for(input_path, time_range, args.input_format, args.decode_workers, column_mapping)
+        if not read_header(reader):
+            return
+        events_written = pipelined_analyzer.run(reader)
+        save_tuner(args, pipelined_analyzer.tuner)
+        bytes_read = os.path.getsize(input_path)
+        pipeline_stage = metrics.record(
+            "pipeline",
+            pipeline_start,
+            events_scanned=pipelined_analyzer.rows,
+            matches=events_written,
+            bytes_read=bytes_read,
+            bytes_written=pipelined_analyzer.writer.bytes_written,
+        )
+        print(f"  ✓ Read and parsed in {format_duration(pipelined_analyzer.read_seconds)} (reader thread)")
+        print(f"  ✓ Matched in {format_duration(pipelined_analyzer.match_seconds)}")
+        print(f"  ✓ Serialized and wrote in {format_duration(pipelined_analyzer.writer.seconds)} (writer thread)")
+        if time_range is not None:
+            print_time_range_skips(reader)
+        print_columns(reader)
+        if events_written == 0:
+            print("No events were detected by any rules.")
+        total_stage = metrics.record(
+            "total",
+            total_start,
+            events_scanned=pipelined_analyzer.rows,
+            matches=events_written,
+            bytes_read=bytes_read,
+            bytes_written=pipelined_analyzer.writer.bytes_written,
+        )
+        print("=" * 60)
+        print(f"Total duration:      {format_duration(total_stage.wall_seconds)}")
+        print(f"Input events:        {pipelined_analyzer.rows:,}")
+        print(f"Rules processed:     {len(yaml_contents)}")
+        print(f"Output events:       {events_written:,}")
+        print(
+            f"Processing rate:     {pipelined_analyzer.rows / total_stage.wall_seconds:.0f} events/second"
+        )
+        return
+
+    # Resume from the state checkpoint when the input only grew since it was saved
+    from sigmadft.reader.CSVReader import COMPRESSED_SUFFIXES
+
+    checkpoint = None
+    rules_hash = None
+    if args.state and input_path.endswith(COMPRESSED_SUFFIXES):
+        # Byte offsets into a compressed stream cannot be resumed from
+        print("Warning: --state is ignored for compressed input")
+        args.state = None
+    if args.state:
+        from sigmadft.timelines.Checkpoint import Checkpoint, rules_fingerprint
+
+        rules_hash = rules_fingerprint(rules)
+        checkpoint = Checkpoint.load(args.state)
+        if checkpoint is not None:
+            problem = checkpoint.resume_problem(input_path, output_path, rules_hash)
+            if problem:
+                print(f"Warning: Not resuming from {args.state} because {problem}; analyzing the whole input")
+                checkpoint = None
+            else:
+                print(f"Resuming after row {checkpoint.last_row_id:,} (byte {checkpoint.byte_offset:,}) from {args.state}")
+
+    # Read the CSV file
+    csv_start = metrics.start()
+    print("Reading CSV file ...")
+    from sigmadft.reader.CSVReader import reader_for
+
+    reader = reader_for(input_path, time_range, args.input_format, args.decode_workers, column_mapping)
+    if not read_header(reader):
+        return
+    csv_stage = metrics.record("csv_read", csv_start)
+    print(
+        f"  ✓ CSV reading completed in {format_duration(csv_stage.wall_seconds)}"
+    )
+
+    # Create a list of LowLevelEvent objects
+    timeline_start = metrics.start()
+    print("Creating low-level timeline ...")
+    from sigmadft.timelines.LowLevelTimeline import LowLevelTimeline
+    from sigmadft.timelines.RowFilter import RowFilter
+
+    low_timeline = LowLevelTimeline(
+        match_cache_size=args.match_cache_size,
+        logsource_mapping=logsource_mapping,
+        adaptive_order=not args.no_adaptive_order,
+        row_filter=RowFilter.from_rules(yaml_contents, time_range, pushdown=not args.no_row_pushdown),
+    )
+    low_timeline.tuner = load_tuner(args, low_timeline.tuner)
+    first_position = 0
+    if args.state:
+        # Track the byte offset of the last complete record for the next run
+        start_offset, next_row_id = 0, 0
+        if checkpoint is not None:
+            low_timeline.resume(checkpoint.window, checkpoint.last_row_id)
+            first_position = len(low_timeline.events)
+            start_offset, next_row_id = checkpoint.byte_offset, checkpoint.last_row_id + 1
+        end_offset, last_row_id = low_timeline.append_records(reader, start_offset, next_row_id)
+        bytes_read = end_offset - start_offset
+    else:
+        low_timeline.create_timeline(reader)
+        bytes_read = os.path.getsize(input_path)
+    new_events = len(low_timeline.events) - first_position
+    # The CSV is streamed while the timeline is built, so its bytes count here
+    timeline_stage = metrics.record(
+        "create_timeline",
+        timeline_start,
+        events_scanned=new_events,
+        bytes_read=bytes_read,
+    )
+    print(
+        f"  ✓ Low-level timeline created with {new_events} events in {format_duration(timeline_stage.wall_seconds)}"
+    )
+    if time_range is not None:
+        print_time_range_skips(reader)
+    print_columns(reader)
+    if low_timeline.row_filter is not None and low_timeline.row_filter.literals is not None:
+        print(
+            f"  ✓ Row pushdown: {low_timeline.row_filter.deferred:,} rows no rule can match "
+            f"kept only as supporting events"
+        )
+
+    if checkpoint is not None and new_events == 0:
+        print("No new rows since the last run.")
+        return
+
+    # Create a list of high-level timeline
+    high_timelines = []
+
     # Run each rules with the analyzer
-    analysis_start_time = time.time()
+    analysis_start = metrics.start()
     print(f"Running {len(yaml_contents)} rules against the timeline...")
+    import sigmadft.analyzers.ReadFromYamlAnalyzer as ReadFromYamlAnalyzer
+
+    rule_profiler = None
+    if args.profile_rules is not None:
+        from sigmadft.utils.RuleProfiler import RuleProfiler
+
+        rule_profiler = RuleProfiler()
+    low_timeline.profiler = rule_profiler
+    ReadFromYamlAnalyzer.key_processor.profiler = rule_profiler
+
     total_events_found = 0
 
-    for i, yaml_content in enumerate(yaml_contents, 1):
-        rule_start_time = time.time()
-        print(f"[{i}/{len(yaml_contents)}] Processing rule: {yaml_content.title} ...")
+    # Correlations run after the other rules, over the events of the rules they
+    # reference; referenced rules that were not selected run only to feed them
+    correlation_rules = [
+        (rule_path, rule) for rule_path, rule in zip(rule_paths, yaml_contents) if isinstance(rule, CorrelationRule)
+    ]
+    hidden_rules = []
+    if correlation_rules:
+        from sigmadft.analyzers.CorrelationAnalyzer import CorrelationAnalyzer
+
+        hidden_rules = CorrelationAnalyzer([rule for _, rule in correlation_rules]).hidden_rules(yaml_contents)
+        if args.state:
+            print("Warning: Correlation windows start empty on each --state run")
+    rule_runs = [
+        (rule_path, rule, False)
+        for rule_path, rule in zip(rule_paths, yaml_contents)
+        if not isinstance(rule, CorrelationRule)
+    ] + [(rule.title, rule, True) for rule in hidden_rules]
+    rules_total = len(rule_runs) + len(correlation_rules)
+    events_by_rule = {}
+
+    for i, (rule_path, yaml_content, hidden) in enumerate(rule_runs, 1):
+        rule_start = metrics.start()
+        referenced = " (referenced by a correlation, events not written)" if hidden else ""
+        print(f"[{i}/{rules_total}] Processing rule: {yaml_content.title}{referenced} ...")
 
         try:
-            high_timeline = ReadFromYamlAnalyzer.Run(low_timeline, yaml_content)
-            rule_end_time = time.time()
+            high_timeline = ReadFromYamlAnalyzer.Run(low_timeline, yaml_content, first_position)
+            events_count = len(high_timeline.events) if high_timeline else 0
+            events_scanned = low_timeline.count_events_for_rule(yaml_content)
+            # Counting the extracted keys walks every match, so only when metrics are kept
+            keys_extracted = sum(
+                1 for event in (high_timeline.events if high_timeline else []) for value in event.keys.values() if value is not None
+            ) if metrics.enabled else 0
+            rule_stage = metrics.record(
+                "rule",
+                rule_start,
+                rule=rule_path,
+                events_scanned=events_scanned,
+                matches=events_count,
+                keys_extracted=keys_extracted,
+            )
+            events_by_rule[id(yaml_content)] = high_timeline.events
 
-            if high_timeline and len(high_timeline.events) > 0:
-                high_timelines.append(high_timeline)
-                events_count = len(high_timeline.events)
-                total_events_found += events_count
+            scanned = f"scanned {events_scanned:,} of {len(low_timeline.events):,} events"
+
+            if events_count > 0:
+                if not hidden:
+                    high_timelines.append(high_timeline)
+                    total_events_found += events_count
                 print(
-                    f"  ✓ Found {events_count} events in {format_duration(rule_end_time - rule_start_time)}"
+                    f"  ✓ Found {events_count} events in {format_duration(rule_stage.wall_seconds)} ({scanned})"
                 )
             else:
                 print(
-                    f"  ○ No events found in {format_duration(rule_end_time - rule_start_time)}"
+                    f"  ○ No events found in {format_duration(rule_stage.wall_seconds)} ({scanned})"
                 )
         except Exception as e:
-            rule_end_time = time.time()
+            rule_stage = metrics.record("rule", rule_start, rule=rule_path)
             print(
-                f"  ✗ Error processing rule in {format_duration(rule_end_time - rule_start_time)}: {str(e)}"
+                f"  ✗ Error processing rule in {format_duration(rule_stage.wall_seconds)}: {str(e)}"
             )
             continue
 
-    analysis_end_time = time.time()
+    for i, (rule_path, correlation_rule) in enumerate(correlation_rules, len(rule_runs) + 1):
+        rule_start = metrics.start()
+        print(f"[{i}/{rules_total}] Correlating: {correlation_rule.title} ...")
+        correlation_analyzer = CorrelationAnalyzer([correlation_rule])
+        high_timeline = correlation_analyzer.process(events_by_rule)[0]
+        events_count = len(high_timeline.events)
+        rule_stage = metrics.record(
+            "rule",
+            rule_start,
+            rule=rule_path,
+            events_scanned=sum(len(events_by_rule.get(id(rule), [])) for rule in correlation_rule.base_rules),
+            matches=events_count,
+        )
+        if events_count > 0:
+            high_timelines.append(high_timeline)
+            total_events_found += events_count
+            print(f"  ✓ Found {events_count} events in {format_duration(rule_stage.wall_seconds)}")
+        else:
+            print(f"  ○ No events found in {format_duration(rule_stage.wall_seconds)}")
+
+    analysis_stage = metrics.record(
+        "analysis",
+        analysis_start,
+        events_scanned=len(low_timeline.events),
+        matches=total_events_found,
+    )
     print(
-        f"  ✓ Rule analysis completed in {format_duration(analysis_end_time - analysis_start_time)}"
+        f"  ✓ Rule analysis completed in {format_duration(analysis_stage.wall_seconds)}"
     )
     print(f"  ✓ Total events found: {total_events_found}")
+    save_tuner(args, low_timeline.tuner)
+
+    if rule_profiler is not None:
+        print(rule_profiler.report())
+        if args.profile_rules:
+            rule_profiler.write(args.profile_rules)
+            print(f"Rule profile written to {args.profile_rules}")
 
-    if not high_timelines:
+    # Incremental runs always write, since earlier events may need updating
+    if not high_timelines and not args.state:
         print("No events were detected by any rules.")
-        total_end_time = time.time()
+        total_stage = metrics.record("total", total_start, events_scanned=new_events, bytes_read=bytes_read)
         print(
-            f"\nTotal execution time: {format_duration(total_end_time - total_start_time)}"
+            f"\nTotal execution time: {format_duration(total_stage.wall_seconds)}"
         )
         return
 
     # Merge the high-level timelines
-    merge_start_time = time.time()
+    merge_start = metrics.start()
     print("Merging high-level timelines ...")
+    from sigmadft.timelines.HighLevelTimeline import MergeHighLevelTimeline
+
     merge_timelines = MergeHighLevelTimeline(high_timelines)
     merged_high_timelines = merge_timelines.merge()
-    merge_end_time = time.time()
+    merge_stage = metrics.record("merge", merge_start, matches=len(merged_high_timelines.events))
     print(
-        f"  ✓ Timeline merging completed in {format_duration(merge_end_time - merge_start_time)}"
+        f"  ✓ Timeline merging completed in {format_duration(merge_stage.wall_seconds)}"
     )
 
     # Write the results to a JSON file
-    output_start_time = time.time()
+    output_start = metrics.start()
     print(f"Writing results to JSON file: {output_path} ...")
     print(f"Total events in merged timeline: {len(merged_high_timelines.events)}")
+    from sigmadft.output.JSONWriter import JSONWriter
+
+    previous_events = None
+    if checkpoint is not None:
+        from sigmadft.timelines.LowLevelTimeline import num_supporting_events
+
+        previous_events = JSONWriter.read_events(output_path)
+        # The last events of the previous run now have rows after them
+        for event in previous_events:
+            event_id = event.get("id")
+            if isinstance(event_id, int) and event.get("supporting") and event_id > checkpoint.last_row_id - num_supporting_events:
+                event["supporting"]["after"] = low_timeline.get_supporting_events(event_id)["after"]
+        print(f"Appending to {len(previous_events)} events from the previous run")
+
     json_writer = JSONWriter(merged_high_timelines, output_path)
-    json_writer.write()
-    output_end_time = time.time()
+    json_writer.write(previous_events)
+    output_stage = metrics.record(
+        "write_output",
+        output_start,
+        matches=len(merged_high_timelines.events),
+        bytes_written=os.path.getsize(output_path),
+    )
     print(
-        f"  ✓ JSON output completed in {format_duration(output_end_time - output_start_time)}"
+        f"  ✓ JSON output completed in {format_duration(output_stage.wall_seconds)}"
     )
 
+    if args.state:
+        from sigmadft.timelines.Checkpoint import Checkpoint, input_fingerprint, output_stat
+        from sigmadft.timelines.LowLevelTimeline import num_supporting_events
+
+        Checkpoint(
+            os.path.abspath(input_path),
+            end_offset,
+            last_row_id,
+            input_fingerprint(input_path, end_offset),
+            rules_hash,
+            os.path.abspath(output_path),
+            output_stat(output_path),
+            [event.to_dict() for event in low_timeline.events[-num_supporting_events:]],
+        ).save(args.state)
+        print(f"  ✓ State saved to {args.state} (row {last_row_id:,}, byte {end_offset:,})")
+
     # Calculate and display total execution time
-    total_end_time = time.time()
-    total_duration = total_end_time - total_start_time
+    total_stage = metrics.record(
+        "total",
+        total_start,
+        events_scanned=new_events,
+        matches=len(merged_high_timelines.events),
+        bytes_read=bytes_read,
+        bytes_written=os.path.getsize(output_path),
+    )
+    total_duration = total_stage.wall_seconds
     end_datetime = datetime.now()
 
     print("=" * 60)
@@ -319,11 +895,22 @@ def main():
     print(f"Start time:          {start_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"End time:            {end_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"Total duration:      {format_duration(total_duration)}")
-    print(f"Input events:        {len(low_timeline.events):,}")
+    print(f"Input events:        {new_events:,}")
     print(f"Rules processed:     {len(yaml_contents)}")
     print(f"Output events:       {len(merged_high_timelines.events):,}")
     print(
-        f"Processing rate:     {len(low_timeline.events) / total_duration:.0f} events/second"
+        f"Processing rate:     {new_events / total_duration:.0f} events/second"
     )
+    if low_timeline.match_cache is not None:
+        cache_stats = low_timeline.match_cache.stats()
+        print(
+            f"Match cache:         {cache_stats['hits']:,}/{cache_stats['lookups']:,} hits "
+            f"({cache_stats['hit_rate']:.1%}), {cache_stats['entries']:,} entries, "
+            f"{cache_stats['evictions']:,} evictions"
+        )
     print("=" * 60)
     print("Analysis completed successfully!")
+
+
+if __name__ == "__main__":
+    main()
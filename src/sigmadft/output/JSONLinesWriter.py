@@ -0,0 +1,23 @@
+# src/sigmadft/output/JSONLinesWriter.py
+
+import json
+from typing import List
+from sigmadft.events.HighLevelEvent import HighLevelEvent
+from sigmadft.output.JSONWriter import JSONWriter
+
+
+class JSONLinesWriter:
+    """Appends high-level events to a JSON Lines file as they are found"""
+
+    def __init__(self, json_path: str):
+        self.json_path = json_path
+        self.file = open(json_path, 'a')
+
+    def write_events(self, events: List[HighLevelEvent]):
+        """Writes one JSON object per event and flushes, so readers see them at once"""
+        for event in events:
+            self.file.write(json.dumps(JSONWriter.event_to_dict(event)) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
@@ -1,6 +1,8 @@
 # src/sigmadft//output/JSONWriter.py
 
 import json
+from typing import List, Optional
+from sigmadft.events.HighLevelEvent import HighLevelEvent
 from sigmadft.timelines.HighLevelTimeline import HighLevelTimeline
 
 
@@ -10,30 +12,49 @@ class JSONWriter:
         self.timeline = timeline.events
         self.json_path = json_path
 
-    def to_dict(self) -> dict:
-        """Converts the timeline (list) to a dictionary"""
-        timeline_dict = {}
-        for index, event in enumerate(self.timeline):
-            timeline_dict[index] = {
-                'id': event.id,
-                'date_time_min': event.date_time_min,
-                'date_time_max': event.date_time_max,
-                'evidence_source': event.evidence_source,
-                'type': event.type,
-                'description': event.description,
-                'category': event.category,
-                'plugin': event.plugin,
-                'files': event.files,
-                'keys': event.keys,
-                'supporting': event.supporting,
-                'trigger': event.trigger.to_dict() if event.trigger else None,
-            }
+    @staticmethod
+    def read_events(json_path: str) -> List[dict]:
+        """Reads the events of a previously written timeline, in order"""
+        with open(json_path, 'r') as file:
+            timeline_dict = json.load(file)
+        return [timeline_dict[index] for index in sorted(timeline_dict, key=int)]
+
+    def to_dict(self, previous: Optional[List[dict]] = None) -> dict:
+        """Converts the timeline (list) to a dictionary, after the events of a previous run"""
+        timeline_dict = dict(enumerate(previous or []))
+        for index, event in enumerate(self.timeline, len(timeline_dict)):
+            timeline_dict[index] = self.event_to_dict(event)
         
         return timeline_dict
 
-    def write(self):
-        """Writes the timeline to a JSON file"""
-        timeline_dict = self.to_dict()
+    @staticmethod
+    def event_to_dict(event: HighLevelEvent) -> dict:
+        """Converts a high-level event to its output dictionary"""
+        event_dict = {
+            'id': event.id,
+            'date_time_min': event.date_time_min,
+            'date_time_max': event.date_time_max,
+            'evidence_source': event.evidence_source,
+            'type': event.type,
+            'description': event.description,
+            'category': event.category,
+            'plugin': event.plugin,
+            'files': event.files,
+            'keys': event.keys,
+            'supporting': event.supporting,
+            'trigger': event.trigger.to_dict() if event.trigger else None,
+        }
+        # Only batch runs over several hosts set the device
+        if event.device is not None:
+            event_dict['device'] = event.device
+        # Aggregated events list the events they were built from
+        if event.merged_id:
+            event_dict['merged_id'] = event.merged_id
+        return event_dict
+
+    def write(self, previous: Optional[List[dict]] = None):
+        """Writes the timeline to a JSON file, appended to the events of a previous run if given"""
+        timeline_dict = self.to_dict(previous)
         
         with open(self.json_path, 'w') as file:
             json.dump(timeline_dict, file, indent=4)
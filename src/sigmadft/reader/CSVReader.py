@@ -1,15 +1,232 @@
 # src/sigmadft//readers/CSVReader.py
 
 import csv
+import io
+import locale
+from collections import deque
+from typing import Optional
+from sigmadft.reader.ColumnMapping import ColumnMapping, ColumnProjection
+from sigmadft.reader.TimeRange import TimeRange
+
+# Inputs with these suffixes are decompressed while they are read
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz')
+
+
+def open_input(file_path: str, encoding: Optional[str] = None):
+    """Opens an input file as text, decompressing .gz, .bz2 and .xz files on the fly"""
+    if file_path.endswith('.gz'):
+        import gzip
+        return gzip.open(file_path, 'rt', encoding=encoding)
+    if file_path.endswith('.bz2'):
+        import bz2
+        return bz2.open(file_path, 'rt', encoding=encoding)
+    if file_path.endswith('.xz'):
+        import lzma
+        return lzma.open(file_path, 'rt', encoding=encoding)
+    return open(file_path, 'r', encoding=encoding)
+
+
+def reader_for(
+    file_path: str,
+    time_range: Optional[TimeRange] = None,
+    input_format: str = "auto",
+    decode_workers: int = 1,
+    column_mapping: Optional[ColumnMapping] = None,
+) -> "CSVReader":
+    """Returns the reader for a timeline: plaso json_line output by its suffix or input_format, else CSV"""
+    from sigmadft.reader.JSONLinesReader import JSONLinesReader, is_json_lines
+
+    if input_format == "jsonl" or (input_format == "auto" and is_json_lines(file_path)):
+        return JSONLinesReader(file_path, time_range, decode_workers=decode_workers, column_mapping=column_mapping)
+    return CSVReader(file_path, time_range, column_mapping)
+
 
 class CSVReader:
-    def __init__(self, file_path: str):
+    """Reads the rows of a plaso CSV file.
+
+    Record 0 is the header, which is yielded as it is. The rows after it are
+    converted to the plaso columns every stage reads by the column mapping
+    bound to the header; rows of psort's default dynamic output are used as
+    they are.
+    """
+
+    # Record 0 is the header, and quoted fields may span lines
+    has_header = True
+    multiline_records = True
+    # None reads text in the locale's encoding
+    encoding: Optional[str] = None
+
+    def __init__(
+        self,
+        file_path: str,
+        time_range: Optional[TimeRange] = None,
+        column_mapping: Optional[ColumnMapping] = None,
+    ):
         self.file_path = file_path
+        self.time_range = time_range
+        self.column_mapping = column_mapping or ColumnMapping()
+        # The column mapping bound to the file's header, once it is read
+        self.projection: Optional[ColumnProjection] = None
+        # Rows of a time-range read that were never parsed, and whether it stopped early
+        self.skipped = 0
+        self.stopped_early = False
         csv.field_size_limit(1000000)
 
+    def bind_header(self, header: list) -> ColumnProjection:
+        """Binds the column mapping to the file's header.
+
+        Raises ValueError when the header lacks a column the mapping requires.
+        """
+        self.projection = self.column_mapping.bind(header, self.file_path)
+        return self.projection
+
+    def read_header(self) -> Optional[ColumnProjection]:
+        """Reads and binds the header when it is not bound yet, e.g. before resuming at an offset"""
+        if self.projection is None:
+            with open_input(self.file_path, self.encoding) as file:
+                header = next(csv.reader(file), None)
+            if header is not None:
+                self.bind_header(header)
+        return self.projection
+
+    def project(self, row: list) -> list:
+        """Converts a row after the header to the plaso columns"""
+        project = self.projection.project if self.projection is not None else None
+        return row if project is None else project(row)
+
     def read_csv(self):
-        with open(self.file_path, 'r') as file:
+        if self.time_range is not None:
+            yield from self._read_time_range()
+            return
+        with open_input(self.file_path, self.encoding) as file:
             csv_reader = csv.reader(file)
-            for index, row in enumerate(csv_reader):
-                yield index, row
-        
\ No newline at end of file
+            header = next(csv_reader, None)
+            if header is None:
+                return
+            yield 0, header
+            project = (self.projection or self.bind_header(header)).project
+            if project is None:
+                yield from enumerate(csv_reader, 1)
+                return
+            for index, row in enumerate(csv_reader, 1):
+                yield index, project(row)
+
+    def _read_time_range(self):
+        """read_csv for the rows in the time range and the rows around them.
+
+        Records are told apart by quote parity and their leading timestamp is
+        compared as text, so rows far from the range are never parsed. The
+        time_range.margin rows on each side of a row in the range are kept for
+        its supporting events; the others are skipped and leave gaps in the
+        indexes. Sorted input is read only up to the margin after the range.
+        """
+        time_range = self.time_range
+        before = deque(maxlen=time_range.margin)  # (index, record) of the last skipped rows
+        after = 0  # rows still to keep after the last row in the range
+        with open_input(self.file_path, self.encoding) as file:
+            for index, record in self._records(file):
+                if index == 0:  # The header
+                    header = _parse(record)
+                    if self.projection is None:
+                        self.bind_header(header)
+                    yield index, header
+                    continue
+                position = time_range.position(self._timestamp(record))
+                if position == 0:
+                    for before_index, before_record in before:
+                        row = self._parse(before_record)
+                        if row is not None:
+                            yield before_index, row
+                    self.skipped -= len(before)
+                    before.clear()
+                    after = time_range.margin
+                elif after:
+                    after -= 1
+                else:
+                    if position > 0 and time_range.sorted_input:
+                        self.stopped_early = True
+                        return
+                    before.append((index, record))
+                    self.skipped += 1
+                    continue
+                row = self._parse(record)
+                if row is not None:
+                    yield index, row
+
+    def _records(self, file):
+        """Yields (index, record text) for _read_time_range"""
+        return enumerate(_records(file))
+
+    def _timestamp(self, record: str) -> str:
+        """Returns the timestamp of a record, without parsing the rest when the record starts with it"""
+        if self.projection.datetime_index != 0:
+            return self._parse(record)[0]
+        if record.startswith('"'):
+            return _parse(record)[0]
+        return record[:record.find(",")]
+
+    def _parse(self, record: str) -> Optional[list]:
+        """Parses a record after the header for _read_time_range; None skips it"""
+        return self.project(_parse(record))
+
+    def read_records(self, offset: int = 0, start_index: int = 0):
+        """Yields (index, row, end offset) for the complete records after a byte offset.
+
+        Lines are joined into records by quote parity, so quoted fields may span
+        lines. A last record without its line end is still being written and is
+        left for a later read, so the end offset is always a record boundary.
+        """
+        encoding = locale.getpreferredencoding(False)
+        if offset > 0:
+            self.read_header()
+        with open(self.file_path, 'rb') as file:
+            file.seek(offset)
+            index = start_index
+            lines = []
+            quotes = 0
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                lines.append(line)
+                quotes += line.count(b'"')
+                if quotes % 2:
+                    continue
+
+                record = b"".join(lines)
+                offset += len(record)
+                lines, quotes = [], 0
+                for row in self.parse_record(record, encoding):
+                    if index == 0:
+                        if self.projection is None:
+                            self.bind_header(row)
+                    else:
+                        row = self.project(row)
+                    yield index, row, offset
+                    index += 1
+
+    @staticmethod
+    def parse_record(record: bytes, encoding: str) -> list:
+        """Parses the rows of a complete CSV record read in binary mode"""
+        # Translate line ends the way read_csv's text mode does
+        text = record.decode(encoding).replace("\r\n", "\n").replace("\r", "\n")
+        return list(csv.reader(io.StringIO(text)))
+
+
+def _records(file):
+    """Yields the records of a text file, joining lines inside quoted fields"""
+    lines = []
+    quotes = 0
+    for line in file:
+        lines.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        yield "".join(lines) if len(lines) > 1 else line
+        lines, quotes = [], 0
+    if lines:
+        yield "".join(lines)
+
+
+def _parse(record: str) -> list:
+    """Parses a record that holds one CSV row"""
+    return next(csv.reader(io.StringIO(record)), [])
@@ -0,0 +1,278 @@
+# src/sigmadft/reader/ColumnMapping.py
+
+import re
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+
+# Columns of the rows every stage reads, in the order of psort's default dynamic output
+ROW_COLUMNS = ("datetime", "timestamp_desc", "source", "source_long", "message", "parser", "display_name", "tag")
+
+# Row columns a header must map; the others are left empty when it has no column for them
+REQUIRED_COLUMNS = ("datetime", "message")
+
+PROFILES = ("auto", "dynamic", "l2tcsv")
+
+# Header names psort's dynamic output may use for each row column and attribute
+DYNAMIC_ALIASES = {
+    "timestamp_desc": ("timestamp_desc", "type"),
+    "source": ("source", "source_short"),
+    "source_long": ("source_long", "sourcetype"),
+    "message": ("message", "description"),
+    "display_name": ("display_name", "filename"),
+    "hostname": ("hostname", "host"),
+    "username": ("username", "user"),
+}
+
+# The 17 columns of psort's l2tcsv output
+L2TCSV_HEADER = (
+    "date", "time", "timezone", "macb", "source", "sourcetype", "type", "user", "host",
+    "short", "desc", "version", "filename", "inode", "notes", "format", "extra",
+)
+L2TCSV_COLUMNS = {
+    "datetime": ["date", "time", "timezone"],
+    "timestamp_desc": "type",
+    "source": "source",
+    "source_long": "sourcetype",
+    "message": "desc",
+    "parser": "format",
+    "display_name": "filename",
+}
+L2TCSV_ATTRIBUTES = {"username": "user", "hostname": "host", "inode": "inode", "notes": "notes", "extra": "extra"}
+
+_US_DATE = re.compile(r"(\d{2})/(\d{2})/(\d{4})$")
+
+
+class AttributedRow(list):
+    """A row with the structured attributes of its event, such as url or hostname"""
+
+    __slots__ = ("attributes",)
+
+    def __init__(self, row: Iterable[str] = (), attributes: Optional[Dict[str, Any]] = None):
+        super().__init__(row)
+        self.attributes = attributes
+
+    def __reduce__(self):
+        return AttributedRow, (list(self), self.attributes)
+
+
+def rule_attributes(rules: Iterable[Any]) -> Set[str]:
+    """Returns the structured attributes the extractors of the rules' keys read"""
+    from sigmadft.utils.util import EXTRACTOR_ATTRIBUTES
+
+    attributes = set()
+    for rule in rules:
+        # Correlations run the extractors of the rules they reference
+        base_rules = getattr(rule, "base_rules", None)
+        if base_rules:
+            attributes |= rule_attributes(base_rules)
+        high_level_event = getattr(rule, "high_level_event", None)
+        for key_def in getattr(high_level_event, "keys", None) or []:
+            attributes.update(EXTRACTOR_ATTRIBUTES.get(key_def.source, ()))
+    return attributes
+
+
+def join_datetime(parts: List[str]) -> str:
+    """Joins l2tcsv-style date, time and timezone columns into an ISO 8601 datetime"""
+    match = _US_DATE.match(parts[0])
+    text = f"{match.group(3)}-{match.group(1)}-{match.group(2)}" if match else parts[0]
+    if len(parts) > 1:
+        text = f"{text}T{parts[1]}"
+    # Only UTC has a fixed offset; other zone names are kept as local time
+    if len(parts) > 2 and parts[2].upper() == "UTC":
+        text += "+00:00"
+    return text
+
+
+class ColumnProjection:
+    """A column mapping bound to one header.
+
+    project converts a row of the file to the ROW_COLUMNS layout, reading only
+    the mapped columns; it is None when the file's rows already have that
+    layout and are used as they are.
+    """
+
+    __slots__ = ("profile", "project", "columns_read", "width", "datetime_index")
+
+    def __init__(
+        self,
+        profile: str,
+        project: Optional[Callable[[list], list]],
+        columns_read: int,
+        width: int,
+        datetime_index: Optional[int],
+    ):
+        self.profile = profile
+        self.project = project
+        self.columns_read = columns_read
+        self.width = width
+        # Column of the datetime when it is read as is, else None
+        self.datetime_index = datetime_index
+
+    def __str__(self) -> str:
+        return f"{self.profile} profile, {self.columns_read} of {self.width} columns read"
+
+
+class ColumnMapping:
+    """Maps the columns of a plaso CSV header to the rows every stage reads.
+
+    Columns are found by header name, so psort's dynamic output may have its
+    fields in any order or extra fields, and its l2tcsv output is read through
+    a built-in profile. A custom mapping names the header column of each row
+    column and attribute. Only the columns a row needs are read: the row
+    columns, and of the other columns the structured attributes in
+    attributes_needed (all of them when it is None), which extractors read
+    through LowLevelEvent.attribute.
+    """
+
+    def __init__(
+        self,
+        profile: str = "auto",
+        columns: Optional[Dict[str, Union[str, List[str]]]] = None,
+        attributes: Optional[Dict[str, str]] = None,
+        attributes_needed: Optional[Set[str]] = None,
+    ):
+        self.profile = profile
+        self.columns = columns or {}
+        self.attributes = attributes or {}
+        self.attributes_needed = attributes_needed
+
+    @classmethod
+    def load(cls, spec: Optional[str], attributes_needed: Optional[Set[str]] = None) -> "ColumnMapping":
+        """Creates a mapping from a profile name or the path of a YAML mapping file.
+
+        Raises ValueError for a mapping file that cannot be used.
+        """
+        if not spec or spec in PROFILES:
+            return cls(spec or "auto", attributes_needed=attributes_needed)
+
+        import yaml
+
+        try:
+            with open(spec, "r") as file:
+                data = yaml.safe_load(file) or {}
+        except (OSError, yaml.YAMLError) as e:
+            raise ValueError(f"Could not read column mapping {spec}: {str(e)}")
+        if not isinstance(data, dict) or not isinstance(data.get("columns", {}), dict) or not isinstance(data.get("attributes", {}), dict):
+            raise ValueError(f"Column mapping {spec} must map 'columns' and 'attributes' to header names")
+        columns = {str(name): value for name, value in (data.get("columns") or {}).items()}
+        unknown = [name for name in columns if name not in ROW_COLUMNS]
+        if unknown:
+            raise ValueError(f"Column mapping {spec} maps unknown columns: {', '.join(unknown)}")
+        missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+        if missing:
+            raise ValueError(f"Column mapping {spec} does not map: {', '.join(missing)}")
+        attributes = {str(name): str(value) for name, value in (data.get("attributes") or {}).items()}
+        return cls("custom", columns, attributes, attributes_needed)
+
+    def bind(self, header: List[str], source: str = "") -> ColumnProjection:
+        """Returns the projection of rows under a header.
+
+        Raises ValueError when the header lacks a column the mapping requires.
+        """
+        names = [name.strip().lstrip("\ufeff").lower() for name in header]
+        profile = self.profile
+        if profile == "custom":
+            columns, attributes = self.columns, self.attributes
+        elif profile == "l2tcsv" or (profile == "auto" and tuple(names) == L2TCSV_HEADER):
+            profile = "l2tcsv"
+            columns, attributes = L2TCSV_COLUMNS, L2TCSV_ATTRIBUTES
+        elif profile == "dynamic" or (profile == "auto" and "datetime" in names):
+            profile = "dynamic"
+            columns, attributes = _dynamic_columns(names)
+        else:
+            print(f"Warning: Unrecognized CSV header in {source}, reading the plaso columns by position")
+            width = len(header)
+            if width >= len(ROW_COLUMNS):
+                return ColumnProjection("positional", None, width, width, 0)
+            # Short rows get empty values for the columns they lack
+            indexes = list(range(width)) + [width] * (len(ROW_COLUMNS) - width)
+            return ColumnProjection("positional", _projection(indexes, width + 1, None, []), width, width, 0)
+
+        positions = {}
+        for index, name in enumerate(names):
+            positions.setdefault(name, index)
+
+        def position(name: str) -> Optional[int]:
+            return positions.get(str(name).strip().lower())
+
+        indexes: List[Optional[int]] = []
+        datetime_parts: Optional[List[int]] = None
+        for column in ROW_COLUMNS:
+            name = columns.get(column)
+            if isinstance(name, list) and len(name) == 1:
+                name = name[0]
+            if isinstance(name, list):
+                # A datetime split over several columns, as in l2tcsv
+                parts = [position(part) for part in name]
+                if not parts or None in parts:
+                    raise ValueError(f"The header of {source} has no {'/'.join(map(str, name))} columns for {column}")
+                datetime_parts = parts
+                indexes.append(parts[0])
+                continue
+            index = position(name) if name is not None else None
+            if index is None and column in REQUIRED_COLUMNS:
+                raise ValueError(f"The header of {source} has no '{name or column}' column for {column}")
+            indexes.append(index)
+
+        attribute_indexes = [
+            (name, position(column))
+            for name, column in attributes.items()
+            if position(column) is not None and (self.attributes_needed is None or name in self.attributes_needed)
+        ]
+
+        width = len(header)
+        datetime_index = indexes[0] if datetime_parts is None else None
+        columns_read = len({index for index in indexes if index is not None} | {index for _, index in attribute_indexes})
+        # Rows are used as they are only when the header is exactly the row columns in order
+        if datetime_parts is None and not attribute_indexes and indexes == list(range(len(ROW_COLUMNS))) == list(range(width)):
+            return ColumnProjection(profile, None, width, width, datetime_index)
+
+        # Columns the header does not have are read from an empty slot after the row
+        if None in indexes:
+            indexes = [width if index is None else index for index in indexes]
+            width += 1
+        project = _projection(indexes, width, datetime_parts, attribute_indexes)
+        if datetime_parts is not None:
+            columns_read += len(set(datetime_parts) - set(indexes))
+        return ColumnProjection(profile, project, columns_read, len(header), datetime_index)
+
+
+def _dynamic_columns(names: List[str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Resolves the aliases of a dynamic header; columns that are no row column are attributes"""
+    columns = {}
+    for column in ROW_COLUMNS:
+        for alias in DYNAMIC_ALIASES.get(column, (column,)):
+            if alias in names:
+                columns[column] = alias
+                break
+    used = set(columns.values())
+    attributes = {}
+    for name in names:
+        if name in used:
+            continue
+        attribute = next((key for key, aliases in DYNAMIC_ALIASES.items() if name in aliases), name)
+        attributes.setdefault(attribute, name)
+    return columns, attributes
+
+
+def _projection(
+    indexes: List[int],
+    width: int,
+    datetime_parts: Optional[List[int]],
+    attribute_indexes: List[Tuple[str, int]],
+) -> Callable[[list], list]:
+    get_columns = itemgetter(*indexes)
+    get_datetime = itemgetter(*datetime_parts) if datetime_parts is not None else None
+
+    def project(row: list) -> list:
+        if len(row) < width:
+            row = row + [""] * (width - len(row))
+        projected = list(get_columns(row))
+        if get_datetime is not None:
+            projected[0] = join_datetime(get_datetime(row))
+        if attribute_indexes:
+            return AttributedRow(projected, {name: row[index] for name, index in attribute_indexes})
+        return projected
+
+    return project
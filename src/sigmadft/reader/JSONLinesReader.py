@@ -0,0 +1,245 @@
+# src/sigmadft/reader/JSONLinesReader.py
+
+import json
+import os
+import re
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sigmadft.reader.ColumnMapping import AttributedRow, ColumnMapping
+from sigmadft.reader.CSVReader import COMPRESSED_SUFFIXES, CSVReader, open_input
+from sigmadft.reader.TimeRange import TimeRange
+
+
+# Inputs with these suffixes, compressed or not, are read as plaso json_line output
+JSON_LINES_SUFFIXES = ('.jsonl', '.ndjson')
+
+# Bytes of input a decode worker parses per task
+DECODE_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Attributes that fill the plaso CSV columns, so they are not kept twice
+_ROW_KEYS = frozenset((
+    'datetime', 'timestamp_desc', 'source_short', 'source', 'source_long', 'message', 'parser', 'display_name', 'tag'
+))
+
+# The datetime attribute, read from the raw line to check a time range before decoding it
+_DATETIME = re.compile(r'"datetime":\s*"([^"]*)"')
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def is_json_lines(file_path: str) -> bool:
+    """Checks whether a path names plaso json_line output, possibly compressed"""
+    name = file_path
+    if name.endswith(COMPRESSED_SUFFIXES):
+        name = os.path.splitext(name)[0]
+    return name.endswith(JSON_LINES_SUFFIXES)
+
+
+def decode_event(line, attributes: Optional[Set[str]] = None) -> AttributedRow:
+    """Converts a line of plaso json_line output to the row of a plaso CSV.
+
+    The row keeps the given attributes of the event, or all of them when
+    attributes is None. Raises ValueError for a line that is not a JSON object.
+    """
+    event = json.loads(line)
+    if not isinstance(event, dict):
+        raise ValueError("expected a JSON object")
+    tag = event.get("tag")
+    row = [
+        _datetime(event),
+        _text(event.get("timestamp_desc")),
+        _text(event.get("source_short") or event.get("source")),
+        _text(event.get("source_long")),
+        _text(event.get("message")),
+        _text(event.get("parser")),
+        _text(event.get("display_name") or event.get("filename")),
+        " ".join(map(str, tag)) if isinstance(tag, list) else _text(tag),
+    ]
+    # Only scalar attributes are kept: nested containers such as the path
+    # specification are never read by extractors, and dicts of scalars are
+    # not tracked by the garbage collector, which would otherwise rescan
+    # every event's attributes as the timeline grows
+    if attributes is not None:
+        kept = {key: event[key] for key in attributes if key in event and not isinstance(event[key], (dict, list))}
+    else:
+        kept = {
+            key: value
+            for key, value in event.items()
+            if key not in _ROW_KEYS and not key.startswith("__") and not isinstance(value, (dict, list))
+        }
+    return AttributedRow(row, kept)
+
+
+def _datetime(event: Dict[str, Any]) -> str:
+    value = event.get("datetime")
+    if isinstance(value, str) and value:
+        return value
+    # Microseconds since the epoch, written as psort writes its datetime column
+    timestamp = event.get("timestamp")
+    if isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool):
+        try:
+            return (_EPOCH + timedelta(microseconds=int(timestamp))).isoformat(timespec="microseconds")
+        except OverflowError:
+            pass
+    return ""
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _decode_range(
+    file_path: str, start: int, end: int, attributes: Optional[Set[str]]
+) -> Tuple[List[AttributedRow], List[str]]:
+    """Decodes the lines between two byte offsets in a worker; returns the rows and errors"""
+    rows, errors = [], []
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            rows.append(decode_event(line, attributes))
+        except ValueError as e:
+            errors.append(str(e))
+    return rows, errors
+
+
+def _line_ranges(file_path: str, chunk_bytes: int):
+    """Yields (start, end) byte ranges of about chunk_bytes that end at a line end"""
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as file:
+        start = 0
+        while start < size:
+            file.seek(min(start + chunk_bytes, size))
+            file.readline()
+            end = min(file.tell(), size)
+            yield start, end
+            start = end
+
+
+class JSONLinesReader(CSVReader):
+    """Reads plaso json_line output as the rows CSVReader yields.
+
+    Each line is an event, converted to the plaso CSV columns by
+    decode_event. The row also keeps the event's other attributes, such as
+    url, username and hostname, which extractors read through
+    LowLevelEvent.attribute instead of parsing them out of the message. There
+    is no header, so the first event has index 1 like the first CSV row. Of
+    the column mapping only the attributes the rules need apply; the columns
+    are always those of plaso's json_line output.
+
+    Lines are decoded independently, so with decode_workers > 1 an
+    uncompressed file is split at line ends and a process pool decodes the
+    chunks in parallel while they are consumed in order.
+    """
+
+    has_header = False
+    multiline_records = False
+    encoding = "utf-8"
+
+    def __init__(
+        self,
+        file_path: str,
+        time_range: Optional[TimeRange] = None,
+        decode_workers: int = 1,
+        column_mapping: Optional[ColumnMapping] = None,
+    ):
+        super().__init__(file_path, time_range, column_mapping)
+        self.decode_workers = decode_workers
+        self.attributes = self.column_mapping.attributes_needed
+        self.malformed = 0
+
+    def read_csv(self):
+        if self.time_range is not None:
+            yield from self._read_time_range()
+            return
+        if self.decode_workers > 1 and not self.file_path.endswith(COMPRESSED_SUFFIXES):
+            rows = self._decode_parallel()
+        else:
+            rows = self._decode()
+        for index, row in enumerate(rows, 1):
+            yield index, row
+
+    def _decode(self):
+        with open_input(self.file_path, self.encoding) as file:
+            for line in file:
+                if line.strip():
+                    row = self._parse(line)
+                    if row is not None:
+                        yield row
+
+    def _decode_parallel(self):
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(self.decode_workers) as pool:
+            # A few chunks ahead keep the workers busy without holding the whole file
+            pending = deque()
+            for start, end in _line_ranges(self.file_path, DECODE_CHUNK_BYTES):
+                pending.append(pool.submit(_decode_range, self.file_path, start, end, self.attributes))
+                if len(pending) > 2 * self.decode_workers:
+                    yield from self._decoded(pending.popleft().result())
+            while pending:
+                yield from self._decoded(pending.popleft().result())
+
+    def _decoded(self, result: Tuple[List[AttributedRow], List[str]]) -> List[AttributedRow]:
+        rows, errors = result
+        for error in errors:
+            self._malformed(error)
+        return rows
+
+    def _malformed(self, error: str) -> None:
+        self.malformed += 1
+        print(f"Warning: Skipping malformed JSON Lines event in {self.file_path}: {error}")
+
+    def read_header(self) -> None:
+        """There is no header; events always have the json_line attributes"""
+        return None
+
+    def _records(self, file):
+        return enumerate((line for line in file if line.strip()), 1)
+
+    @staticmethod
+    def _timestamp(record: str) -> str:
+        match = _DATETIME.search(record)
+        if match is not None:
+            return match.group(1)
+        try:
+            return decode_event(record)[0]
+        except ValueError:
+            return ""
+
+    def _parse(self, record) -> Optional[AttributedRow]:
+        try:
+            return decode_event(record, self.attributes)
+        except ValueError as e:
+            self._malformed(str(e))
+            return None
+
+    def read_records(self, offset: int = 0, start_index: int = 0):
+        """Yields (index, row, end offset) for the complete lines after a byte offset.
+
+        As CSVReader.read_records; indexes start at 1 since there is no header.
+        """
+        index = max(start_index, 1)
+        with open(self.file_path, 'rb') as file:
+            file.seek(offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                for row in self.parse_record(line, self.encoding):
+                    yield index, row, offset
+                    index += 1
+
+    def parse_record(self, record: bytes, encoding: str) -> list:
+        """Decodes the event of a complete line read in binary mode, or none for a blank or malformed line"""
+        if not record.strip():
+            return []
+        try:
+            return [decode_event(record.decode(encoding), self.attributes)]
+        except ValueError as e:
+            print(f"Warning: Skipping malformed JSON Lines event: {str(e)}")
+            return []
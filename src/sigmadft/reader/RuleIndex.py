@@ -0,0 +1,320 @@
+# src/sigmadft/reader/RuleIndex.py
+
+import fnmatch
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+from sigmadft.reader.RulePackCache import default_cache_dir, hash_content
+
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUNDLED_RULES_DIR = os.path.join(PACKAGE_DIR, "rules")
+RULE_SETS_PATH = os.path.join(PACKAGE_DIR, "config", "rule_sets.yml")
+LOGSOURCE_MAPPING_PATH = os.path.join(PACKAGE_DIR, "config", "logsource_mapping.yml")
+INDEX_FILE_NAME = "rule_index.json"
+INDEX_FORMAT = 3
+
+# Rule levels from least to most severe, used by level comparisons in selectors
+LEVEL_ORDER = ["informational", "low", "medium", "high", "critical"]
+
+# A selector term such as tag:authentication, level>=medium or logsource.product:linux
+_SELECTOR_TERM = re.compile(r"^(?P<field>[\w.-]+)\s*(?P<op>>=|<=|!=|>|<|=|:)\s*(?P<value>.+)$")
+
+# Fields a selector term may compare, besides logsource.<field>
+SELECTOR_FIELDS = ("tag", "tags", "id", "title", "level", "status", "category", "path")
+
+
+def _as_list(value: Any) -> List[str]:
+    """Normalizes a scalar or list YAML value to a list of non-empty strings"""
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    return [str(v) for v in value if v is not None and str(v) != ""]
+
+
+@dataclass
+class RuleIndexEntry:
+    """Metadata recorded for one rule file in the manifest"""
+
+    path: str
+    rules_dir: str
+    relative_path: str
+    mtime_ns: int
+    size: int
+    content_hash: str
+    is_rule: bool = True
+    id: str = ""
+    title: str = ""
+    tags: List[str] = field(default_factory=list)
+    level: Optional[str] = None
+    status: Optional[str] = None
+    category: Optional[str] = None
+    logsource: Dict[str, List[str]] = field(default_factory=dict)
+
+    @classmethod
+    def from_yaml(
+        cls, path: str, rules_dir: str, stat: os.stat_result, content_hash: str, data: Any
+    ) -> "RuleIndexEntry":
+        relative_path = os.path.relpath(path, rules_dir).replace(os.sep, "/")
+        entry = cls(path, rules_dir, relative_path, stat.st_mtime_ns, stat.st_size, content_hash)
+        if not isinstance(data, dict) or ("detection" not in data and "correlation" not in data):
+            entry.is_rule = False
+            return entry
+
+        entry.id = str(data.get("id") or "")
+        entry.title = str(data.get("title") or "")
+        entry.tags = _as_list(data.get("tags"))
+        entry.level = str(data["level"]) if data.get("level") else None
+        entry.status = str(data["status"]) if data.get("status") else None
+        entry.category = str(data["category"]) if data.get("category") else None
+        logsource = data.get("logsource") or {}
+        if isinstance(logsource, dict):
+            entry.logsource = {str(k): _as_list(v) for k, v in logsource.items()}
+        return entry
+
+    def values(self, field_name: str) -> List[str]:
+        """Returns the values a selector field is compared against"""
+        if field_name in ("tag", "tags"):
+            return self.tags
+        if field_name.startswith("logsource."):
+            return self.logsource.get(field_name[len("logsource."):], [])
+        if field_name == "path":
+            return [self.relative_path]
+        value = getattr(self, field_name, None) if field_name in ("id", "title", "level", "status", "category") else None
+        return [value] if value else []
+
+
+class RuleIndex:
+    """Manifest of the rule files found in the rule directories.
+
+    Each entry records a rule's id, title, tags, level, status, category,
+    logsource and content hash. The manifest is kept in the cache directory and
+    only files whose size or modification time changed are re-read, so choosing
+    a subset of rules costs an index lookup instead of parsing every YAML file.
+    """
+
+    def __init__(self, rules_dirs: Optional[List[str]] = None, cache_dir: Optional[str] = None, persist: bool = True):
+        self.rules_dirs = [os.path.abspath(d) for d in (rules_dirs or [BUNDLED_RULES_DIR])]
+        self.index_path = os.path.join(cache_dir or default_cache_dir(), INDEX_FILE_NAME)
+        self.persist = persist
+        self._entries: Dict[str, RuleIndexEntry] = {}
+        self._configs: Dict[str, Any] = {}  # config YAML path -> cached parse with its stat
+        self._dirty = False
+        self.parsed = 0
+        self._load()
+        self.refresh()
+
+    def _load(self) -> None:
+        """Loads the manifest from disk, ignoring missing or stale manifests"""
+        if not self.persist:
+            return
+        try:
+            with open(self.index_path, "r") as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable rule index {self.index_path}: {str(e)}")
+            return
+
+        if manifest.get("format") != INDEX_FORMAT:
+            return
+        self._entries = {path: RuleIndexEntry(**entry) for path, entry in manifest.get("entries", {}).items()}
+        self._configs = manifest.get("configs", {})
+
+    def refresh(self) -> None:
+        """Scans the rule directories and updates entries for new or changed files"""
+        seen = set()
+        for rules_dir in self.rules_dirs:
+            if not os.path.isdir(rules_dir):
+                print(f"Warning: Rule directory not found: {rules_dir}")
+                continue
+            for root, dirs, files in os.walk(rules_dir):
+                dirs.sort()
+                for name in sorted(files):
+                    if not name.endswith((".yml", ".yaml")):
+                        continue
+                    path = os.path.join(root, name)
+                    seen.add(path)
+                    self._refresh_file(path, rules_dir)
+
+        for path in [p for p in self._entries if p not in seen]:
+            del self._entries[path]
+            self._dirty = True
+
+    def _refresh_file(self, path: str, rules_dir: str) -> None:
+        stat = os.stat(path)
+        entry = self._entries.get(path)
+        if (
+            entry is not None
+            and entry.rules_dir == rules_dir
+            and entry.mtime_ns == stat.st_mtime_ns
+            and entry.size == stat.st_size
+        ):
+            return
+
+        with open(path, "rb") as file:
+            content = file.read()
+        content_hash = hash_content(content)
+        if entry is not None and entry.rules_dir == rules_dir and entry.content_hash == content_hash:
+            # Touched but unchanged, only the stat fields need updating
+            entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+            self._dirty = True
+            return
+
+        import yaml
+
+        try:
+            data = yaml.safe_load(content)
+        except yaml.YAMLError as e:
+            print(f"Warning: Skipping unparsable rule file {path}: {str(e)}")
+            return
+
+        self._entries[path] = RuleIndexEntry.from_yaml(path, rules_dir, stat, content_hash, data)
+        self._dirty = True
+        self.parsed += 1
+
+    def save(self) -> None:
+        """Writes the manifest back to the cache directory if it changed"""
+        if not self.persist or not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as file:
+                json.dump(
+                    {
+                        "format": INDEX_FORMAT,
+                        "entries": {path: asdict(entry) for path, entry in self._entries.items()},
+                        "configs": self._configs,
+                    },
+                    file,
+                )
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Warning: Could not write rule index {self.index_path}: {str(e)}")
+
+    @property
+    def entries(self) -> List[RuleIndexEntry]:
+        """All indexed rules, in rule directory and path order"""
+        order = {d: i for i, d in enumerate(self.rules_dirs)}
+        return sorted(
+            (e for e in self._entries.values() if e.is_rule),
+            key=lambda e: (order.get(e.rules_dir, len(order)), e.relative_path),
+        )
+
+    def load_config(self, path: str) -> Dict[str, Any]:
+        """Returns a parsed configuration YAML file, cached in the manifest by size and mtime"""
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return {}
+
+        cached = self._configs.get(path)
+        if cached and cached.get("mtime_ns") == stat.st_mtime_ns and cached.get("size") == stat.st_size:
+            return cached["data"]
+
+        import yaml
+
+        with open(path, "r") as file:
+            data = yaml.safe_load(file) or {}
+        self._configs[path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "data": data}
+        self._dirty = True
+        return data
+
+    def find(self, reference: str) -> Optional[RuleIndexEntry]:
+        """Returns the rule with the given id, or else title, as referenced by correlation rules"""
+        entries = self.entries
+        for entry in entries:
+            if entry.id == reference:
+                return entry
+        return next((entry for entry in entries if entry.title == reference), None)
+
+    def rule_sets(self) -> Dict[str, List[str]]:
+        """Returns the named rule sets from config/rule_sets.yml"""
+        return self.load_config(RULE_SETS_PATH)
+
+    def names(self) -> List[str]:
+        """Names of the available rule sets"""
+        return [name for name in self.rule_sets() if name != "default"]
+
+    def select(self, selector: Optional[str]) -> List[RuleIndexEntry]:
+        """Returns the rules chosen by a rule set name or a selector expression.
+
+        Selector expressions are comma-separated terms that must all match, e.g.
+        ``tag:authentication,level>=medium`` or ``logsource.product:linux``.
+        Without a selector the ``default`` rule set is used.
+        """
+        rule_sets = self.rule_sets()
+
+        if selector is None:
+            return self._select_set(rule_sets, "default", include_unlisted=True)
+        if selector == "all":
+            return self._select_set(rule_sets, "all", include_unlisted=True)
+        if selector in rule_sets:
+            return self._select_set(rule_sets, selector)
+
+        terms = [t.strip() for t in selector.split(",") if t.strip()]
+        parsed_terms = [_SELECTOR_TERM.match(t) for t in terms]
+        if not terms or not all(parsed_terms):
+            print(f"Warning: Unknown rule set or selector '{selector}', using the default rule set")
+            return self._select_set(rule_sets, "default", include_unlisted=True)
+
+        for term in parsed_terms:
+            field_name = term.group("field")
+            if field_name not in SELECTOR_FIELDS and not (
+                field_name.startswith("logsource.") and len(field_name) > len("logsource.")
+            ):
+                raise ValueError(
+                    f"Unknown selector field '{field_name}'; supported fields are "
+                    f"{', '.join(SELECTOR_FIELDS)} and logsource.<field>"
+                )
+            if term.group("op") in (">", ">=", "<", "<=") and term.group("field") != "level":
+                raise ValueError(f"Comparison '{term.group(0)}' is only supported for level")
+            if term.group("field") == "level" and term.group("value").lower() not in LEVEL_ORDER:
+                raise ValueError(f"Unknown level '{term.group('value')}' in selector")
+
+        return [entry for entry in self.entries if all(self._term_matches(entry, t) for t in parsed_terms)]
+
+    def _select_set(self, rule_sets: Dict[str, List[str]], name: str, include_unlisted: bool = False) -> List[RuleIndexEntry]:
+        """Resolves a named rule set; listed paths are relative to the bundled rules"""
+        selected = []
+        listed = set()
+        for relative_path in rule_sets.get(name) or []:
+            path = os.path.join(BUNDLED_RULES_DIR, relative_path)
+            entry = self._entries.get(path)
+            if entry is None or not entry.is_rule:
+                print(f"Warning: Rule file not found: {path}")
+                continue
+            if path not in listed:
+                listed.add(path)
+                selected.append(entry)
+
+        if include_unlisted:
+            # Rules added to the rule directories run without editing the rule sets
+            selected.extend(e for e in self.entries if e.path not in listed)
+        return selected
+
+    @staticmethod
+    def _term_matches(entry: RuleIndexEntry, term: "re.Match") -> bool:
+        field_name, op, value = term.group("field"), term.group("op"), term.group("value").strip()
+
+        if field_name == "level" and op in (">", ">=", "<", "<="):
+            if entry.level not in LEVEL_ORDER:
+                return False
+            rank, wanted = LEVEL_ORDER.index(entry.level), LEVEL_ORDER.index(value.lower())
+            return {
+                ">": rank > wanted,
+                ">=": rank >= wanted,
+                "<": rank < wanted,
+                "<=": rank <= wanted,
+            }[op]
+
+        pattern = value.lower()
+        matched = any(fnmatch.fnmatchcase(v.lower(), pattern) for v in entry.values(field_name))
+        return not matched if op == "!=" else matched
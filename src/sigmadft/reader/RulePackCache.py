@@ -0,0 +1,123 @@
+# src/sigmadft/reader/RulePackCache.py
+
+import hashlib
+import os
+import pickle
+from typing import Dict, Optional, Tuple
+from sigmadft.rules.Rule import Rule
+
+
+PACK_FILE_NAME = "rulepack.pickle"
+
+
+def default_cache_dir() -> str:
+    """Returns the user cache directory used by sigmadft"""
+    if os.environ.get("SIGMADFT_CACHE_DIR"):
+        return os.environ["SIGMADFT_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "sigmadft")
+
+
+def hash_content(content: bytes) -> str:
+    """Returns the content hash used to key cached rules"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def compiler_fingerprint() -> str:
+    """Fingerprint of the code that compiles rules.
+
+    Cached rules are pickled instances of the classes in sigmadft.rules, so the
+    pack is discarded whenever the package version or those modules change.
+    """
+    import sigmadft.rules
+    from sigmadft import __version__
+
+    digest = hashlib.sha256(__version__.encode())
+    rules_package = os.path.dirname(os.path.abspath(sigmadft.rules.__file__))
+    for name in sorted(os.listdir(rules_package)):
+        if name.endswith(".py"):
+            with open(os.path.join(rules_package, name), "rb") as file:
+                digest.update(name.encode())
+                digest.update(file.read())
+    return digest.hexdigest()
+
+
+class RulePackCache:
+    """On-disk bundle of compiled rules, invalidated per file by content hash.
+
+    A warm start reads each YAML file only to hash it and returns the cached
+    Rule without parsing YAML or recompiling templates and patterns.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.pack_path = os.path.join(self.cache_dir, PACK_FILE_NAME)
+        self.fingerprint = compiler_fingerprint()
+        self._entries: Dict[str, Tuple[str, Rule]] = {}  # absolute YAML path -> (content hash, rule)
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        """Loads the pack from disk, ignoring missing, stale or unreadable packs"""
+        try:
+            with open(self.pack_path, "rb") as file:
+                pack = pickle.load(file)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable rule cache {self.pack_path}: {str(e)}")
+            return
+
+        if isinstance(pack, dict) and pack.get("fingerprint") == self.fingerprint:
+            self._entries = pack.get("rules", {})
+
+    def load_rule(self, yaml_path: str, content_hash: Optional[str] = None) -> Rule:
+        """Returns the compiled rule for a YAML file, parsing it only if it changed"""
+        yaml_path = os.path.abspath(yaml_path)
+        if content_hash is None:
+            with open(yaml_path, "rb") as file:
+                content_hash = hash_content(file.read())
+
+        entry = self._entries.get(yaml_path)
+        if entry is not None and entry[0] == content_hash:
+            self.hits += 1
+            return entry[1]
+
+        # YAML is only imported when a rule has to be (re)compiled
+        from sigmadft.reader.YAMLReader import YAMLReader
+
+        self.misses += 1
+        rule = YAMLReader(yaml_path).read()
+        self._entries[yaml_path] = (content_hash, rule)
+        self._dirty = True
+        return rule
+
+    def save(self) -> None:
+        """Writes the pack back to disk if any rule was compiled during this run"""
+        if not self._dirty:
+            return
+
+        import tempfile
+
+        # Drop entries for rule files that no longer exist
+        entries = {path: entry for path, entry in self._entries.items() if os.path.exists(path)}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".rulepack-")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    pickle.dump(
+                        {"fingerprint": self.fingerprint, "rules": entries},
+                        file,
+                        protocol=pickle.HIGHEST_PROTOCOL,
+                    )
+                # Replace atomically so concurrent runs never read a partial pack
+                os.replace(tmp_path, self.pack_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._dirty = False
+        except OSError as e:
+            print(f"Warning: Could not write rule cache {self.pack_path}: {str(e)}")
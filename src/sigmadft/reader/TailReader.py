@@ -0,0 +1,106 @@
+# src/sigmadft/reader/TailReader.py
+
+import locale
+import os
+from typing import List, Optional, Tuple
+from sigmadft.reader.CSVReader import CSVReader
+
+
+class TailReader:
+    """Reads the CSV records appended to a growing file, like `tail -F`.
+
+    Each poll returns the complete records written since the last one; a record
+    still being written is kept until its line end arrives. When the file is
+    truncated, or the path is rotated to a new file, the reader finishes the
+    old file and starts the new one from its header, binding the reader's
+    column mapping to it again. Records are parsed by the reader, so a
+    JSONLinesReader tails plaso json_line output.
+    """
+
+    def __init__(self, file_path: str, reader: Optional[CSVReader] = None):
+        self.file_path = file_path
+        self.reader = reader or CSVReader(file_path)
+        self.encoding = self.reader.encoding or locale.getpreferredencoding(False)
+        self.file = None
+        self.inode: Optional[int] = None
+        self.index = self._first_index()    # record index within the current file, 0 is the header
+        self._partial = b""     # a line without its line end yet
+        self._lines: List[bytes] = []
+        self._quotes = 0
+
+    def _open(self) -> bool:
+        try:
+            self.file = open(self.file_path, "rb")
+        except FileNotFoundError:
+            return False
+        self.inode = os.fstat(self.file.fileno()).st_ino
+        self.index = self._first_index()
+        self._partial, self._lines, self._quotes = b"", [], 0
+        return True
+
+    def _first_index(self) -> int:
+        # Without a header the first record is the first row
+        return 0 if self.reader.has_header else 1
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def poll(self, max_records: int = 1000) -> List[Tuple[int, list]]:
+        """Returns up to max_records new (record index, row) pairs, without the header"""
+        if self.file is None and not self._open():
+            return []
+
+        records = self._read(max_records)
+        if records:
+            return records
+
+        # The old file is drained, so switching to a new one loses no rows
+        change = self._file_change()
+        if change:
+            print(f"Input {change}, reading {self.file_path} from the start")
+            self.close()
+            if self._open():
+                records = self._read(max_records)
+        return records
+
+    def _file_change(self) -> Optional[str]:
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            # Rotated away and not recreated yet, keep the old file open
+            return None
+        if stat.st_ino != self.inode:
+            return "was rotated"
+        if stat.st_size < self.file.tell():
+            return "was truncated"
+        return None
+
+    def _read(self, max_records: int) -> List[Tuple[int, list]]:
+        records = []
+        while len(records) < max_records:
+            line = self.file.readline()
+            if not line:
+                break
+            line = self._partial + line
+            if not line.endswith(b"\n"):
+                self._partial = line
+                break
+            self._partial = b""
+
+            self._lines.append(line)
+            if self.reader.multiline_records:
+                self._quotes += line.count(b'"')
+                if self._quotes % 2:
+                    continue
+
+            record = b"".join(self._lines)
+            self._lines, self._quotes = [], 0
+            for row in self.reader.parse_record(record, self.encoding):
+                if self.index > 0:   # Skip the first row, it is the CSV header
+                    records.append((self.index, self.reader.project(row)))
+                else:
+                    self.reader.bind_header(row)
+                self.index += 1
+        return records
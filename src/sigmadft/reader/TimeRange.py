@@ -0,0 +1,60 @@
+# src/sigmadft/reader/TimeRange.py
+
+import re
+from typing import Optional
+
+
+# A prefix of a timestamp as plaso writes them: 2024, 2024-01 up to 2024-01-01T00:00:21.711050
+_ISO_PREFIX = re.compile(r"^\d{4}(-\d{2}(-\d{2}(T\d{2}(:\d{2}(:\d{2}(\.\d+)?)?)?)?)?)?$")
+
+# Rows kept on each side of a row in the range, so its supporting events are complete
+DEFAULT_MARGIN = 5
+
+
+class TimeRange:
+    """The --since/--until window, compared on the raw timestamp text.
+
+    plaso writes UTC timestamps in ISO 8601 with fixed-width fields, so
+    comparing a row's timestamp, cut to the length of the bound, orders it
+    against the bound without building a datetime. Bounds are inclusive at
+    their precision: --until 2024-01-01 keeps the whole day. Timestamps that do
+    not start with a digit are outside every range.
+    """
+
+    def __init__(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        sorted_input: bool = False,
+        margin: int = DEFAULT_MARGIN,
+    ):
+        self.since = self.parse_bound(since) if since else None
+        self.until = self.parse_bound(until) if until else None
+        common = min(len(self.since or ""), len(self.until or ""))
+        if self.since and self.until and self.until[:common] < self.since[:common]:
+            raise ValueError(f"--until {until} is before --since {since}")
+        # Sorted input lets the reader stop at the first row after the range
+        self.sorted_input = sorted_input
+        self.margin = margin
+
+    @staticmethod
+    def parse_bound(value: str) -> str:
+        bound = value.strip().replace(" ", "T", 1)
+        if not _ISO_PREFIX.match(bound):
+            raise ValueError(
+                f"Invalid time '{value}', expected UTC ISO 8601 such as 2024-01, 2024-01-01 or 2024-01-01T08:30:00"
+            )
+        return bound
+
+    def position(self, timestamp: str) -> int:
+        """Returns -1 for a timestamp before the range, 0 inside it and 1 after it"""
+        if not timestamp[:1].isdigit():
+            return -1
+        if self.since is not None and timestamp[: len(self.since)] < self.since:
+            return -1
+        if self.until is not None and timestamp[: len(self.until)] > self.until:
+            return 1
+        return 0
+
+    def __str__(self) -> str:
+        return f"{self.since or 'the start'} to {self.until or 'the end'}"
@@ -1,6 +1,8 @@
 # src/sigmadft//reader/YAMLReader.py
 
+from typing import Union
 import yaml
+from sigmadft.rules.CorrelationRule import CorrelationRule
 from sigmadft.rules.Rule import Rule
 
 
@@ -8,8 +10,10 @@ class YAMLReader:
     def __init__(self, file_path):
         self.file_path = file_path
 
-    def read(self) -> Rule:
+    def read(self) -> Union[Rule, CorrelationRule]:
         with open(self.file_path, "r") as file:
             rule_data = yaml.safe_load(file)
 
+        if isinstance(rule_data, dict) and "correlation" in rule_data:
+            return CorrelationRule.from_yaml(rule_data)
         return Rule.from_yaml(rule_data)
@@ -0,0 +1,639 @@
+# src/sigmadft/rules/Condition.py
+
+import fnmatch
+import re
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+
+# Relative evaluation costs, used to test cheap predicates before expensive ones
+PREFIX_COST = 1
+LITERAL_COST = 2
+REGEX_COST = 20
+
+# Hit rates are clamped to this distance from 0 and 1 when ordering by them
+MIN_RATE = 0.001
+
+# Keyword modifiers a selection may use
+SELECTION_MODIFIERS = {"all", "re", "contains", "startswith", "endswith", "cased"}
+
+# Modifiers choosing how a field is compared; without one its value must equal a keyword
+FIELD_OPERATORS = ("contains", "startswith", "endswith")
+
+# Low-level event fields a selection may target, in the order matchers take them
+FIELDS = ("type", "evidence", "plugin")
+
+# The event text that keywords without a field are matched against
+EVENT_TEXT = 'f"{type} {evidence} {plugin}"'
+
+_TOKEN = re.compile(r"\(|\)|[^\s()]+")
+
+
+@dataclass
+class Predicate:
+    """A single keyword test against the event text, or against one field of the event"""
+
+    selection: str
+    keyword: str
+    regex: bool = False
+    # None tests the whole event text
+    field_name: Optional[str] = None
+    # How a field is compared: "equals", "contains", "startswith" or "endswith"
+    operator: str = "contains"
+    # Fields ignore case unless |cased is given; the event text is always case-sensitive
+    cased: bool = True
+    # Compiled once at load; None marks an invalid pattern, which never matches
+    pattern: Optional[re.Pattern] = field(default=None, repr=False)
+    # Tested as a substring, also for regexes without special characters
+    literal: bool = field(init=False, default=True)
+    _evaluate: Optional[Callable[[str, str, str], bool]] = field(
+        init=False, default=None, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self.literal = not self.regex or re.escape(self.keyword) == self.keyword
+        if self.regex:
+            try:
+                self.pattern = re.compile(self.keyword, 0 if self.cased else re.IGNORECASE)
+            except re.error:
+                self.pattern = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_evaluate"] = None
+        return state
+
+    @property
+    def cost(self) -> int:
+        if not self.literal:
+            return REGEX_COST
+        if self.field_name is not None and self.operator != "contains":
+            return PREFIX_COST
+        return LITERAL_COST
+
+    @property
+    def scope(self) -> str:
+        """The selection key the predicate came from, without the selection's own modifiers"""
+        if self.field_name is None:
+            return "|re" if self.regex else ""
+        modifiers = ["re"] if self.regex else [self.operator] if self.operator != "equals" else []
+        return "|" + "|".join([self.field_name] + modifiers + (["cased"] if self.cased else []))
+
+    @property
+    def label(self) -> str:
+        if self.field_name is None:
+            return f"{self.selection}: {self.keyword}"
+        return f"{self.selection}{self.scope}: {self.keyword}"
+
+    def evaluate(self, type: str, evidence: str, plugin: str) -> bool:
+        if self._evaluate is None:
+            namespace: Dict[str, Any] = {}
+            self._evaluate = _function("evaluate", _predicate_source(self, 0, namespace), [self], namespace)
+        return self._evaluate(type, evidence, plugin)
+
+
+@dataclass
+class BooleanNode:
+    """An and/or over child nodes, or the negation of its single child"""
+
+    operator: str  # "and", "or" or "not"
+    children: List["Node"]
+
+    @property
+    def cost(self) -> int:
+        return sum(child.cost for child in self.children)
+
+    def evaluate(self, type: str, evidence: str, plugin: str) -> bool:
+        if self.operator == "not":
+            return not self.children[0].evaluate(type, evidence, plugin)
+        if self.operator == "and":
+            return all(child.evaluate(type, evidence, plugin) for child in self.children)
+        return any(child.evaluate(type, evidence, plugin) for child in self.children)
+
+
+Node = Union[Predicate, BooleanNode]
+
+
+@dataclass
+class Selection:
+    """A named group of keywords in the detection section.
+
+    A list matches when any keyword is found in the event text. A dictionary
+    keyed by modifiers, such as ``{"|all|re": [...]}``, applies them to its
+    keywords; several such keys must all match. A key may start with a field
+    of the event, such as ``evidence|contains`` or ``plugin|startswith``, to
+    compare its keywords with that field alone, ignoring case unless
+    ``|cased`` is given. A field without an operator must equal a keyword.
+    """
+
+    groups: List[List[str]]
+    modifiers: List[List[str]]
+    # The event field of each group, None for the event text
+    field_names: List[Optional[str]] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not self.field_names:
+            self.field_names = [None] * len(self.groups)
+
+    @classmethod
+    def from_value(cls, name: str, value: Any) -> "Selection":
+        if isinstance(value, dict):
+            groups, modifiers, field_names = [], [], []
+            for key, keywords in value.items():
+                field_name, *key_modifiers = str(key).split("|")
+                if field_name and field_name not in FIELDS:
+                    raise ValueError(
+                        f"Unknown field '{field_name}' in selection '{name}', expected one of: {', '.join(FIELDS)}"
+                    )
+                field_names.append(field_name or None)
+                modifiers.append([m for m in key_modifiers if m])
+                groups.append(_as_keywords(keywords))
+            return cls(groups, modifiers, field_names)
+        return cls([_as_keywords(value)], [[]])
+
+    def to_value(self) -> Any:
+        if len(self.groups) == 1 and not self.modifiers[0] and self.field_names[0] is None:
+            return self.groups[0]
+        return {
+            "|".join([field_name or ""] + modifiers): keywords
+            for keywords, modifiers, field_name in zip(self.groups, self.modifiers, self.field_names)
+        }
+
+    def compile(self, name: str) -> Node:
+        nodes = []
+        for keywords, modifiers, field_name in zip(self.groups, self.modifiers, self.field_names):
+            if field_name is None or "re" in modifiers:
+                operator = "contains"
+            else:
+                operator = next((m for m in modifiers if m in FIELD_OPERATORS), "equals")
+            predicates = [
+                Predicate(
+                    name,
+                    keyword,
+                    regex="re" in modifiers,
+                    field_name=field_name,
+                    operator=operator,
+                    cased=field_name is None or "cased" in modifiers,
+                )
+                for keyword in keywords
+            ]
+            nodes.append(BooleanNode("and" if "all" in modifiers else "or", predicates))
+        return nodes[0] if len(nodes) == 1 else BooleanNode("and", nodes)
+
+    def validate(self, name: str) -> List[str]:
+        errors = []
+        for keywords, modifiers, field_name in zip(self.groups, self.modifiers, self.field_names):
+            if not keywords:
+                errors.append(f"Selection '{name}' needs at least one keyword")
+            for modifier in modifiers:
+                if modifier not in SELECTION_MODIFIERS:
+                    errors.append(f"Invalid modifier: {modifier}")
+            operators = [m for m in modifiers if m in FIELD_OPERATORS] + (["re"] if "re" in modifiers else [])
+            if len(operators) > 1:
+                errors.append(f"Selection '{name}' combines modifiers {' and '.join(operators)}")
+            if field_name is None and any(m in FIELD_OPERATORS or m == "cased" for m in modifiers):
+                errors.append(f"Selection '{name}' uses a field modifier without a field, e.g. evidence|contains")
+            if "re" in modifiers:
+                for keyword in keywords:
+                    try:
+                        re.compile(keyword)
+                    except re.error as e:
+                        errors.append(f"Invalid regex `{keyword}`: {str(e)}")
+        return errors
+
+
+def _as_keywords(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    return [str(v) for v in value if v is not None]
+
+
+class Condition:
+    """A Sigma condition compiled into a boolean tree over keyword predicates.
+
+    Supports named selections, ``and``, ``or``, ``not``, parentheses and the
+    ``1 of``/``any of``/``all of`` quantifiers over a selection name pattern
+    or ``them``. Children are ordered cheapest first, so literal checks run
+    before regexes, and evaluation stops as soon as the outcome is known.
+    """
+
+    def __init__(self, expression: str, selections: Dict[str, Selection]):
+        self.expression = expression
+        self.selections = selections
+        self.predicates: List[Predicate] = []
+        self._tokens: List[str] = []
+        self._position = 0
+        self.root = self._order(self._parse())
+        self._tokens = []
+        self._matcher: Optional[Callable[[str], bool]] = None
+        self._signatures: Dict[int, str] = {}  # id(node) -> signature
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The generated matcher is rebuilt on first use after unpickling
+        state = self.__dict__.copy()
+        state["_matcher"] = None
+        state["_signatures"] = {}
+        return state
+
+    # Parsing
+
+    def _parse(self) -> Node:
+        if "|" in self.expression:
+            raise ValueError(
+                f"Aggregations are not supported in condition '{self.expression}'; use a correlation rule"
+            )
+        self._tokens = _TOKEN.findall(self.expression)
+        self._position = 0
+        if not self._tokens:
+            raise ValueError("Condition is empty")
+        node = self._parse_or()
+        if self._position < len(self._tokens):
+            raise ValueError(f"Unexpected '{self._tokens[self._position]}' in condition '{self.expression}'")
+        return node
+
+    def _peek(self) -> Optional[str]:
+        return self._tokens[self._position].lower() if self._position < len(self._tokens) else None
+
+    def _next(self) -> str:
+        if self._position >= len(self._tokens):
+            raise ValueError(f"Condition '{self.expression}' ends unexpectedly")
+        token = self._tokens[self._position]
+        self._position += 1
+        return token
+
+    def _parse_or(self) -> Node:
+        children = [self._parse_and()]
+        while self._peek() == "or":
+            self._next()
+            children.append(self._parse_and())
+        return children[0] if len(children) == 1 else BooleanNode("or", children)
+
+    def _parse_and(self) -> Node:
+        children = [self._parse_not()]
+        while self._peek() == "and":
+            self._next()
+            children.append(self._parse_not())
+        return children[0] if len(children) == 1 else BooleanNode("and", children)
+
+    def _parse_not(self) -> Node:
+        if self._peek() == "not":
+            self._next()
+            return BooleanNode("not", [self._parse_not()])
+        return self._parse_atom()
+
+    def _parse_atom(self) -> Node:
+        token = self._next()
+        if token == "(":
+            node = self._parse_or()
+            if self._next() != ")":
+                raise ValueError(f"Missing ')' in condition '{self.expression}'")
+            return node
+        if token == ")" or token.lower() in ("and", "or"):
+            raise ValueError(f"Unexpected '{token}' in condition '{self.expression}'")
+        if token.lower() in ("1", "any", "all") and self._peek() == "of":
+            self._next()
+            return self._parse_quantifier("and" if token.lower() == "all" else "or", self._next())
+        return self._selection(token)
+
+    def _parse_quantifier(self, operator: str, target: str) -> Node:
+        if target.lower() == "them":
+            # Selections starting with an underscore are helpers, not matched by "them"
+            names = [name for name in self.selections if not name.startswith("_")]
+        else:
+            names = [name for name in self.selections if fnmatch.fnmatchcase(name, target)]
+        if not names:
+            raise ValueError(f"'{target}' matches no selection in condition '{self.expression}'")
+        children = [self._selection(name) for name in names]
+        return children[0] if len(children) == 1 else BooleanNode(operator, children)
+
+    def _selection(self, name: str) -> Node:
+        selection = self.selections.get(name)
+        if selection is None:
+            raise ValueError(f"Unknown selection '{name}' in condition '{self.expression}'")
+        node = selection.compile(name)
+        self.predicates.extend(_leaves(node))
+        return node
+
+    # Ordering
+
+    def _order(self, node: Node) -> Node:
+        """Flattens nested and/or nodes and orders children cheapest first"""
+        if isinstance(node, Predicate):
+            return node
+        children = [self._order(child) for child in node.children]
+        if node.operator == "not":
+            return BooleanNode("not", children)
+        flattened = []
+        for child in children:
+            if isinstance(child, BooleanNode) and child.operator == node.operator:
+                flattened.extend(child.children)
+            else:
+                flattened.append(child)
+        # A stable sort keeps the rule's own order among equally cheap children
+        flattened.sort(key=lambda child: child.cost)
+        return BooleanNode(node.operator, flattened)
+
+    # Selectivity
+
+    def signature(self, node: Node) -> str:
+        """Identifies a node by its content, independent of the order of its children"""
+        signature = self._signatures.get(id(node))
+        if signature is None:
+            if isinstance(node, Predicate):
+                signature = f"{node.selection}{node.scope}: {node.keyword}"
+            else:
+                signature = f"{node.operator}(" + ", ".join(sorted(self.signature(child) for child in node.children)) + ")"
+            self._signatures[id(node)] = signature
+        return signature
+
+    def sampler(self) -> Callable[[str, str, str], Tuple[bool, ...]]:
+        """Returns a function giving the result of every predicate, indexed like self.predicates"""
+        namespace: Dict[str, Any] = {}
+        values = ", ".join(_predicate_source(predicate, i, namespace) for i, predicate in enumerate(self.predicates))
+        return _function(
+            "sample", f"({values},)" if values else "()", self.predicates, namespace, self.expression
+        )
+
+    def count_hits(self, samples: List[Tuple[bool, ...]], counts: Dict[str, List[int]]) -> None:
+        """Adds the [evaluations, hits] of every node over sampler() results to counts, by signature.
+
+        The samples evaluate every predicate, so the rates are not skewed by
+        short-circuiting.
+        """
+        if not samples:
+            return
+        columns = [list(column) for column in zip(*samples)]
+        index = {id(predicate): i for i, predicate in enumerate(self.predicates)}
+
+        def results(node: Node) -> List[bool]:
+            if isinstance(node, Predicate):
+                column = columns[index[id(node)]]
+            else:
+                children = [results(child) for child in node.children]
+                if node.operator == "not":
+                    column = [not value for value in children[0]]
+                elif not children:
+                    column = [node.operator == "and"] * len(samples)
+                else:
+                    column = list(map(all if node.operator == "and" else any, zip(*children)))
+            count = counts.setdefault(self.signature(node), [0, 0])
+            count[0] += len(column)
+            count[1] += sum(column)
+            return column
+
+        results(self.root)
+
+    def ordered_matcher(self, rates: Dict[str, float]) -> Callable[[str, str, str], bool]:
+        """Returns a matcher with children ordered by their hit rates, keyed by signature.
+
+        An and stops at its first miss, so it tests the children that rarely hit
+        first; an or stops at its first hit, so it tests the commonest first. Each
+        child's rate is weighed against its cost. Nodes without a rate keep
+        their position relative to equally cheap ones.
+        """
+        root, _ = self._reorder(self.root, rates)
+        return self._generate(root=root)
+
+    def _reorder(self, node: Node, rates: Dict[str, float]) -> Tuple[Node, float]:
+        """Returns the reordered node and its expected evaluation cost"""
+        if isinstance(node, Predicate):
+            return node, float(node.cost)
+        if node.operator == "not":
+            child, cost = self._reorder(node.children[0], rates)
+            return BooleanNode("not", [child]), cost
+
+        # (reordered child, expected cost, hit rate); rates are looked up on the
+        # original children, since signatures are cached by node identity
+        children = []
+        for child in node.children:
+            rate = min(max(rates.get(self.signature(child), 0.5), MIN_RATE), 1.0 - MIN_RATE)
+            children.append(self._reorder(child, rates) + (rate,))
+        if node.operator == "and":
+            children.sort(key=lambda child: child[1] / (1.0 - child[2]))
+        else:
+            children.sort(key=lambda child: child[1] / child[2])
+
+        expected, reached = 0.0, 1.0
+        for _, cost, rate in children:
+            expected += reached * cost
+            reached *= rate if node.operator == "and" else 1.0 - rate
+        return BooleanNode(node.operator, [child for child, _, _ in children]), expected
+
+    # Pushdown
+
+    def required_literals(self) -> Optional[List[Tuple[str, bool]]]:
+        """Returns (literal, cased) pairs of which every matching event text contains one.
+
+        Literals that are not cased may appear in any case. None means no such
+        set is known, so any text may match. An empty list means no text can
+        match. A field holds part of the event text, so field predicates give
+        literals too.
+        """
+        return _required_literals(self.root)
+
+    # Evaluation
+
+    def evaluate(self, type: str, evidence: str, plugin: str) -> bool:
+        """Returns whether an event with these fields satisfies the condition"""
+        if self._matcher is None:
+            self._matcher = self._generate()
+        return self._matcher(type, evidence, plugin)
+
+    def matcher(self) -> Callable[[str, str, str], bool]:
+        """Returns the compiled matcher function of an event's type, evidence and plugin"""
+        if self._matcher is None:
+            self._matcher = self._generate()
+        return self._matcher
+
+    def profiled_matcher(
+        self, evaluations: List[int], hits: List[int], seconds: List[float]
+    ) -> Callable[[str, str, str], bool]:
+        """Returns a matcher that counts and times each predicate, indexed like self.predicates"""
+        namespace = {}
+        for i, predicate in enumerate(self.predicates):
+            namespace[f"_p{i}"] = _timed(predicate.evaluate, i, evaluations, hits, seconds)
+        return self._generate(namespace, profiled=True)
+
+    def _generate(
+        self, namespace: Optional[Dict[str, Any]] = None, profiled: bool = False, root: Optional[Node] = None
+    ) -> Callable[[str, str, str], bool]:
+        """Generates one Python expression for the tree, so and/or short-circuit natively"""
+        namespace = {} if namespace is None else namespace
+        index = {id(predicate): i for i, predicate in enumerate(self.predicates)}
+        leaves = _leaves(root or self.root)
+
+        def source(node: Node) -> str:
+            if isinstance(node, Predicate):
+                i = index[id(node)]
+                if profiled:
+                    return f"_p{i}(type, evidence, plugin)"
+                return _predicate_source(node, i, namespace)
+            if node.operator == "not":
+                return f"(not {source(node.children[0])})"
+            if not node.children:
+                return "True" if node.operator == "and" else "False"
+            return "(" + f" {node.operator} ".join(source(child) for child in node.children) + ")"
+
+        return _function(
+            "match", f"bool({source(root or self.root)})", [] if profiled else leaves, namespace, self.expression
+        )
+
+
+def _function(
+    name: str, expression: str, predicates: List[Predicate], namespace: Dict[str, Any], expression_name: str = ""
+) -> Callable[[str, str, str], Any]:
+    """Compiles a function of the event fields returning the expression.
+
+    The event text and lowercased fields the predicates use are built on first
+    use, so a rule that only compares fields never builds the event text. The
+    operand of the first predicate is always needed and is built up front.
+    """
+    operands = list(dict.fromkeys(_operand(predicate) for predicate in predicates))
+    lines = [f"def {name}({', '.join(FIELDS)}):"]
+    for variable, value in operands:
+        if variable is None:
+            continue
+        if (variable, value) == operands[0]:
+            lines.append(f"    {variable} = {value}")
+        else:
+            lines.append(f"    {variable} = None")
+    lines.append(f"    return {expression}")
+    code = "\n".join(lines)
+    exec(compile(code, f"<condition {expression_name!r}>", "exec"), namespace)
+    return namespace[name]
+
+
+def _operand(predicate: Predicate) -> Tuple[Optional[str], str]:
+    """Returns the (variable, value) a predicate is tested against; no variable for a plain field"""
+    if predicate.field_name is None:
+        return "text", EVENT_TEXT
+    if predicate.literal and not predicate.cased and predicate.operator in ("contains", "equals"):
+        return f"{predicate.field_name}_lower", f"{predicate.field_name}.lower()"
+    return None, predicate.field_name
+
+
+def _operand_source(predicate: Predicate) -> str:
+    variable, value = _operand(predicate)
+    if variable is None:
+        return value
+    return f"({variable} if {variable} is not None else ({variable} := {value}))"
+
+
+def _predicate_source(predicate: Predicate, i: int, namespace: Dict[str, Any]) -> str:
+    operand = _operand_source(predicate)
+    if not predicate.literal:
+        if predicate.pattern is None:
+            return "False"
+        namespace[f"_search{i}"] = predicate.pattern.search
+        return f"(_search{i}({operand}) is not None)"
+    keyword = predicate.keyword if predicate.cased else predicate.keyword.lower()
+    if predicate.operator == "contains":
+        return f"({keyword!r} in {operand})"
+    if predicate.operator == "equals":
+        return f"({operand} == {keyword!r})"
+    if predicate.cased:
+        return f"{operand}.{predicate.operator}({keyword!r})"
+    # Only the prefix or suffix the keyword could match is lowercased
+    if not predicate.keyword:
+        return "True"
+    length = len(predicate.keyword)
+    part = f"{operand}[:{length}]" if predicate.operator == "startswith" else f"{operand}[-{length}:]"
+    return f"({part}.lower() == {keyword!r})"
+
+
+Literals = Optional[List[Tuple[str, bool]]]
+
+
+def _required_literals(node: Node) -> Literals:
+    if isinstance(node, Predicate):
+        if node.literal:
+            return [(node.keyword, node.cased)] if node.keyword else None
+        if node.pattern is None:
+            return []
+        return _pattern_literals(node.pattern)
+    if node.operator == "not":
+        return None
+    alternatives = [_required_literals(child) for child in node.children]
+    if node.operator == "and":
+        return _best_literals(alternatives)
+    return _any_literals(alternatives)
+
+
+def _best_literals(alternatives: List[Literals]) -> Literals:
+    """Picks one of several required literal sets, all of which hold; the fewest and longest filter best"""
+    known = [literals for literals in alternatives if literals is not None]
+    if not known:
+        return None
+    return min(
+        known, key=lambda literals: (len(literals), -min((len(literal) for literal, _ in literals), default=0))
+    )
+
+
+def _any_literals(alternatives: List[Literals]) -> Literals:
+    """Merges the literal sets of alternatives, of which one holds"""
+    if not alternatives or any(literals is None for literals in alternatives):
+        return None
+    return list(dict.fromkeys(literal for literals in alternatives for literal in literals))
+
+
+def _pattern_literals(pattern: re.Pattern) -> Literals:
+    """Returns literals of which every match of a regex contains one, or None"""
+    try:
+        from re import _parser as sre_parse  # Python 3.11+
+    except ImportError:
+        import sre_parse
+
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+    return _sequence_literals(list(parsed), sre_parse, not pattern.flags & re.IGNORECASE)
+
+
+def _sequence_literals(items: List[Tuple[Any, Any]], sre_parse: Any, cased: bool) -> Literals:
+    # Runs of literal characters and required groups in a sequence each give a set
+    alternatives: List[Literals] = []
+    run: List[str] = []
+    for op, value in items:
+        if op is sre_parse.LITERAL:
+            run.append(chr(value))
+            continue
+        if run:
+            alternatives.append([("".join(run), cased)])
+            run = []
+        if op is sre_parse.SUBPATTERN:
+            _, add_flags, del_flags, subpattern = value
+            subpattern_cased = not add_flags & re.IGNORECASE and (cased or bool(del_flags & re.IGNORECASE))
+            alternatives.append(_sequence_literals(list(subpattern), sre_parse, subpattern_cased))
+        elif op is sre_parse.BRANCH:
+            alternatives.append(
+                _any_literals([_sequence_literals(list(branch), sre_parse, cased) for branch in value[1]])
+            )
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and value[0] >= 1:
+            alternatives.append(_sequence_literals(list(value[2]), sre_parse, cased))
+    if run:
+        alternatives.append([("".join(run), cased)])
+    return _best_literals(alternatives)
+
+
+def _leaves(node: Node) -> List[Predicate]:
+    if isinstance(node, Predicate):
+        return [node]
+    return [leaf for child in node.children for leaf in _leaves(child)]
+
+
+def _timed(
+    evaluate: Callable[[str, str, str], bool], i: int, evaluations: List[int], hits: List[int], seconds: List[float]
+):
+    def timed(type: str, evidence: str, plugin: str) -> bool:
+        started = perf_counter()
+        matched = evaluate(type, evidence, plugin)
+        seconds[i] += perf_counter() - started
+        evaluations[i] += 1
+        hits[i] += matched
+        return matched
+
+    return timed
@@ -0,0 +1,250 @@
+# src/sigmadft/rules/CorrelationRule.py
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from sigmadft.rules.Rule import HighLevelEventDefinition, Rule
+
+
+CORRELATION_TYPES = ("event_count", "value_count", "temporal_ordered")
+# Only lower bounds can be decided while the window is still filling
+CONDITION_OPERATORS = ("gt", "gte")
+
+_TIMESPAN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$")
+_TIMESPAN_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_timespan(value: Any) -> float:
+    """Converts a Sigma timespan such as 30s, 5m, 1h or 2d to seconds"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = float(value)
+    else:
+        match = _TIMESPAN.match(str(value))
+        if not match:
+            raise ValueError(f"Invalid timespan '{value}', expected a number followed by s, m, h or d")
+        seconds = float(match.group(1)) * _TIMESPAN_UNITS[match.group(2)]
+    if seconds <= 0:
+        raise ValueError(f"Timespan must be positive: '{value}'")
+    return seconds
+
+
+@dataclass
+class CorrelationRule:
+    """A Sigma correlation rule aggregating the events of other rules.
+
+    Events of the referenced rules are grouped by the values of their
+    extracted keys named in group_by, and an aggregated event is emitted when
+    a group reaches the threshold within the timespan: a number of events for
+    event_count, or of distinct values of a key for value_count. A
+    temporal_ordered correlation is a sequence: its rules must match in the
+    order listed, all within the timespan. aliases name the key that stands
+    for a group-by name in each rule, where the rules call it differently.
+    """
+
+    title: str
+    id: str
+    description: str
+    category: str
+    type: str
+    rules: List[str]
+    timespan: float
+    threshold: int
+    operator: str = "gte"
+    group_by: List[str] = field(default_factory=list)
+    value_field: Optional[str] = None  # Key counted by value_count
+    aliases: Dict[str, Dict[str, str]] = field(default_factory=dict)  # group-by name -> rule reference -> key
+    high_level_event: Optional[HighLevelEventDefinition] = None
+    status: str = "experimental"
+    level: Optional[str] = None
+    author: Optional[str] = None
+    references: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    timespan_text: str = ""
+    # The referenced rules, set by resolve() after loading
+    base_rules: List[Rule] = field(default_factory=list, repr=False)
+
+    @classmethod
+    def from_yaml(cls, yaml_data: Dict) -> "CorrelationRule":
+        correlation = yaml_data.get("correlation")
+        if not isinstance(correlation, dict):
+            raise ValueError("Correlation definition must be a dictionary")
+
+        correlation_type = str(correlation.get("type", ""))
+        if correlation_type not in CORRELATION_TYPES:
+            raise ValueError(
+                f"Unsupported correlation type '{correlation_type}', expected one of {', '.join(CORRELATION_TYPES)}"
+            )
+
+        rules = correlation.get("rules")
+        if isinstance(rules, str):
+            rules = [rules]
+        if not rules:
+            raise ValueError("A correlation must reference at least one rule")
+
+        group_by = correlation.get("group-by") or []
+        if isinstance(group_by, str):
+            group_by = [group_by]
+
+        condition = correlation.get("condition")
+        if condition is None and correlation_type == "temporal_ordered":
+            # A sequence is complete when every step has matched
+            condition = {"gte": len(rules)}
+        if not isinstance(condition, dict):
+            raise ValueError("Correlation condition must be a dictionary such as {gte: 5}")
+        operators = [name for name in condition if name != "field"]
+        if len(operators) != 1 or operators[0] not in CONDITION_OPERATORS:
+            raise ValueError(
+                f"Correlation condition must have exactly one of {', '.join(CONDITION_OPERATORS)}: {condition}"
+            )
+        operator = operators[0]
+        try:
+            threshold = int(condition[operator])
+        except (TypeError, ValueError):
+            raise ValueError(f"Correlation threshold must be an integer: {condition[operator]}")
+        value_field = condition.get("field")
+        if correlation_type == "value_count" and not value_field:
+            raise ValueError("A value_count correlation needs the key to count in condition.field")
+
+        aliases = correlation.get("aliases") or {}
+        if not isinstance(aliases, dict) or not all(isinstance(keys, dict) for keys in aliases.values()):
+            raise ValueError("Correlation aliases must map each group-by name to a dictionary of rule: key")
+
+        high_level_event = None
+        if "high_level_event" in yaml_data:
+            high_level_event = HighLevelEventDefinition.from_dict(yaml_data.get("high_level_event") or {})
+
+        return cls(
+            title=yaml_data.get("title", ""),
+            id=yaml_data.get("id", ""),
+            description=yaml_data.get("description", ""),
+            category=yaml_data.get("category", "Unknown"),
+            type=correlation_type,
+            rules=[str(rule) for rule in rules],
+            timespan=parse_timespan(correlation.get("timespan")),
+            threshold=threshold,
+            operator=operator,
+            group_by=[str(key) for key in group_by],
+            value_field=str(value_field) if value_field else None,
+            aliases={
+                str(name): {str(reference): str(key) for reference, key in keys.items()}
+                for name, keys in aliases.items()
+            },
+            high_level_event=high_level_event,
+            status=yaml_data.get("status", "experimental"),
+            level=yaml_data.get("level"),
+            author=yaml_data.get("author"),
+            references=yaml_data.get("references", []),
+            tags=yaml_data.get("tags", []),
+            timespan_text=str(correlation.get("timespan")),
+        )
+
+    def resolve(self, rules: List[Any], load: Callable[[str], Optional[Rule]]) -> List[str]:
+        """Sets base_rules from the referenced ids or titles and returns the references not found.
+
+        References are looked up in the loaded rules first, then loaded with load.
+        """
+        base_rules: List[Rule] = []
+        missing = []
+        for reference in self.rules:
+            rule = next(
+                (rule for rule in rules if isinstance(rule, Rule) and reference in (rule.id, rule.title)), None
+            )
+            if rule is None:
+                rule = load(reference)
+            if rule is None:
+                missing.append(reference)
+            elif all(rule is not base_rule for base_rule in base_rules):
+                base_rules.append(rule)
+        # Replaced in one step, as a running analysis may be reading the list
+        self.base_rules = base_rules
+        return missing
+
+    def group_keys(self, rule: Rule) -> List[str]:
+        """Names of the keys of rule that hold its group-by values"""
+        keys = []
+        for name in self.group_by:
+            aliases = self.aliases.get(name, {})
+            keys.append(aliases.get(rule.id) or aliases.get(rule.title) or name)
+        return keys
+
+    def steps(self) -> List[Rule]:
+        """The referenced rules in listed order, repeats included, as the steps of a sequence"""
+        steps = []
+        base_rules = self.base_rules
+        for reference in self.rules:
+            rule = next((rule for rule in base_rules if reference in (rule.id, rule.title)), None)
+            if rule is not None:
+                steps.append(rule)
+        return steps
+
+    def satisfied(self, count: int) -> bool:
+        """Returns whether a group's count meets the condition"""
+        return count > self.threshold if self.operator == "gt" else count >= self.threshold
+
+    def validate(self) -> List[str]:
+        """Validate the correlation, including the keys its description references"""
+        from sigmadft.events.HighLevelEvent import HighLevelEvent
+
+        errors = []
+        if self.threshold < 1:
+            errors.append(f"correlation.condition: threshold must be at least 1, got {self.threshold}")
+        if self.type == "temporal_ordered":
+            if len(self.rules) < 2:
+                errors.append("correlation.rules: a temporal_ordered correlation needs at least two steps")
+            if (self.operator, self.threshold) != ("gte", len(self.rules)):
+                errors.append(
+                    f"correlation.condition: a temporal_ordered correlation completes when all "
+                    f"{len(self.rules)} steps match; leave the condition out"
+                )
+        for rule in self.base_rules:
+            key_names = [key.name for key in rule.high_level_event.keys] if rule.high_level_event else []
+            for key in self.group_keys(rule) + ([self.value_field] if self.value_field else []):
+                if key not in key_names:
+                    errors.append(f"correlation: '{rule.title}' does not extract key '{key}'")
+        if self.high_level_event:
+            errors.extend(
+                f"high_level_event.description: {error}"
+                for error in self.high_level_event.description_template.validate(
+                    vars(HighLevelEvent()), self.key_names()
+                )
+            )
+        return errors
+
+    def key_names(self) -> List[str]:
+        """Names of the keys of the aggregated events"""
+        if self.type == "value_count":
+            return self.group_by + ["Value_Count", "Values"]
+        if self.type == "temporal_ordered":
+            return self.group_by + ["Steps", "Duration"]
+        return self.group_by + ["Event_Count"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the correlation rule to a dictionary"""
+        condition: Dict[str, Any] = {self.operator: self.threshold}
+        if self.value_field:
+            condition["field"] = self.value_field
+        result = {
+            "title": self.title,
+            "id": self.id,
+            "description": self.description,
+            "category": self.category,
+            "status": self.status,
+            "author": self.author,
+            "references": self.references,
+            "tags": self.tags,
+            "correlation": {
+                "type": self.type,
+                "rules": self.rules,
+                "group-by": self.group_by,
+                "timespan": self.timespan_text,
+                "condition": condition,
+            },
+        }
+        if self.aliases:
+            result["correlation"]["aliases"] = self.aliases
+        if self.high_level_event:
+            result["high_level_event"] = {
+                "type": self.high_level_event.type,
+                "description": self.high_level_event.description,
+            }
+        return result
@@ -0,0 +1,136 @@
+# src/sigmadft/rules/DescriptionTemplate.py
+
+import re
+from dataclasses import dataclass, field
+from string import Formatter
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+# Lookups that may follow the field name, e.g. keys[Domain] or provenance.line_number
+_FIELD_LOOKUP = re.compile(r"\[([^\]]*)\]|\.(\w+)")
+
+
+class _RenderError(Exception):
+    """Raised when a field referenced by a template cannot be rendered for an event"""
+
+
+@dataclass
+class TemplateField:
+    """A replacement field referenced by a description template"""
+
+    expression: str                     # field as written, e.g. "keys[Domain]"
+    root: str                           # event attribute read first, e.g. "keys"
+    lookups: List[Tuple[bool, Any]]     # (is_item, key) lookups applied after the root
+    conversion: Optional[str] = None    # !r, !s or !a
+    format_spec: str = ""
+
+    @classmethod
+    def parse(cls, expression: str, conversion: Optional[str], format_spec: str) -> "TemplateField":
+        match = re.match(r"\w+", expression)
+        if not match:
+            raise ValueError(f"Unsupported field '{{{expression}}}'")
+        root = match.group(0)
+
+        lookups = []
+        position = match.end()
+        while position < len(expression):
+            lookup = _FIELD_LOOKUP.match(expression, position)
+            if not lookup:
+                raise ValueError(f"Unsupported field '{{{expression}}}'")
+            if lookup.group(2) is not None:
+                lookups.append((False, lookup.group(2)))
+            else:
+                # str.format treats all-digit item keys as integers
+                key = lookup.group(1)
+                lookups.append((True, int(key) if key.isdigit() else key))
+            position = lookup.end()
+
+        if "{" in format_spec:
+            raise ValueError(f"Nested fields in format spec of '{{{expression}}}' are not supported")
+
+        return cls(expression, root, lookups, conversion, format_spec)
+
+    def resolve(self, event: Any) -> str:
+        """Fetch the value of this field from the event and format it"""
+        try:
+            value = getattr(event, self.root)
+            for is_item, key in self.lookups:
+                value = value[key] if is_item else getattr(value, key)
+        except (AttributeError, KeyError, IndexError, TypeError) as e:
+            raise _RenderError(self.expression) from e
+
+        if self.conversion == "r":
+            value = repr(value)
+        elif self.conversion == "s":
+            value = str(value)
+        elif self.conversion == "a":
+            value = ascii(value)
+        try:
+            return format(value, self.format_spec)
+        except (ValueError, TypeError) as e:
+            raise _RenderError(self.expression) from e
+
+
+@dataclass
+class DescriptionTemplate:
+    """A description template parsed once at rule load into literals and field lookups"""
+
+    template: str
+    parts: List[Union[str, TemplateField]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @classmethod
+    def compile(cls, template: str) -> "DescriptionTemplate":
+        template = template or ""
+        parts: List[Union[str, TemplateField]] = []
+        try:
+            for literal, expression, format_spec, conversion in Formatter().parse(template):
+                if literal:
+                    parts.append(literal)
+                if expression is None:
+                    continue
+                if not expression:
+                    raise ValueError("Positional fields '{}' are not supported")
+                parts.append(TemplateField.parse(expression, conversion, format_spec or ""))
+        except ValueError as e:
+            # Rendering falls back to the raw template, as str.format failures did
+            return cls(template=template, error=str(e))
+
+        return cls(template=template, parts=parts)
+
+    @property
+    def fields(self) -> List[TemplateField]:
+        """The replacement fields referenced by the template"""
+        return [part for part in self.parts if isinstance(part, TemplateField)]
+
+    def validate(self, event_fields: Iterable[str], key_names: Iterable[str] = ()) -> List[str]:
+        """Check that every referenced field exists on the target event.
+
+        event_fields are the attribute names render reads, e.g. vars(HighLevelEvent()).
+        """
+        if self.error:
+            return [f"Invalid template '{self.template}': {self.error}"]
+
+        errors = []
+        event_fields = set(event_fields)
+        key_names = set(key_names)
+        for template_field in self.fields:
+            if template_field.root not in event_fields:
+                errors.append(f"Template field '{{{template_field.expression}}}' is not an event field")
+            elif template_field.root == "keys" and template_field.lookups:
+                is_item, key = template_field.lookups[0]
+                if not is_item or key not in key_names:
+                    errors.append(f"Template field '{{{template_field.expression}}}' references an undefined key")
+        return errors
+
+    def render(self, event: Any) -> str:
+        """Render the template, reading only the fields it references"""
+        if self.error:
+            return self.template
+        try:
+            return "".join(
+                part if isinstance(part, str) else part.resolve(event)
+                for part in self.parts
+            )
+        except _RenderError:
+            # If a field is not available, return the template as is
+            return self.template
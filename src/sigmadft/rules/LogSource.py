@@ -0,0 +1,87 @@
+# src/sigmadft/rules/LogSource.py
+
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterable, List, Optional
+
+
+LOGSOURCE_FIELDS = ("product", "service", "category")
+
+
+def _as_list(value: Any) -> List[str]:
+    """Normalizes a scalar or list YAML value to a list of non-empty strings"""
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    return [str(v) for v in value if v is not None and str(v) != ""]
+
+
+@dataclass
+class LogSourceDefinition:
+    """Represents the logsource section of a rule"""
+
+    product: List[str] = field(default_factory=list)
+    service: List[str] = field(default_factory=list)
+    category: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogSourceDefinition":
+        if not isinstance(data, dict):
+            raise ValueError("Logsource definition must be a dictionary")
+        return cls(**{name: _as_list(data.get(name)) for name in LOGSOURCE_FIELDS})
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {name: getattr(self, name) for name in LOGSOURCE_FIELDS if getattr(self, name)}
+
+
+class LogSourceMapping:
+    """Maps rule logsource values to the plaso parsers that produce them.
+
+    The mapping has one section per logsource field, each mapping a value to a
+    list of parser names or glob patterns. A pattern also matches the parser's
+    plugins, so ``syslog`` covers ``syslog/cron`` and ``syslog/ssh``. A row is
+    relevant to a rule when its parser matches every logsource field that has a
+    mapped value; unmapped values do not restrict the rule.
+    """
+
+    def __init__(self, mapping: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.mapping = {
+            name: {str(value): _as_list(parsers) for value, parsers in (section or {}).items()}
+            for name, section in (mapping or {}).items()
+        }
+
+    def resolve(self, logsource: Optional[LogSourceDefinition]) -> Optional[List[List[str]]]:
+        """Returns one list of parser patterns per restricting field, or None for all rows"""
+        if logsource is None:
+            return None
+
+        constraints = []
+        for name in LOGSOURCE_FIELDS:
+            values = getattr(logsource, name)
+            section = self.mapping.get(name, {})
+            if not values or any(value not in section for value in values):
+                # A value we cannot map could come from any parser
+                continue
+            constraints.append([pattern for value in values for pattern in section[value]])
+
+        return constraints or None
+
+    @staticmethod
+    def parser_matches(parser: str, patterns: Iterable[str]) -> bool:
+        """Checks a plaso parser name against parser patterns"""
+        for pattern in patterns:
+            if fnmatchcase(parser, pattern) or parser.startswith(pattern + "/"):
+                return True
+        return False
+
+    def select_parsers(self, logsource: Optional[LogSourceDefinition], parsers: Iterable[str]) -> Optional[List[str]]:
+        """Returns the parsers relevant to the logsource, or None if every parser is"""
+        constraints = self.resolve(logsource)
+        if constraints is None:
+            return None
+        return [
+            parser
+            for parser in parsers
+            if all(self.parser_matches(parser, patterns) for patterns in constraints)
+        ]
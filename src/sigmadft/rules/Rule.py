@@ -2,8 +2,11 @@
 
 from dataclasses import dataclass, field
 from datetime import datetime, date
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional
 from enum import Enum
+from sigmadft.rules.Condition import Condition, Selection
+from sigmadft.rules.DescriptionTemplate import DescriptionTemplate
+from sigmadft.rules.LogSource import LogSourceDefinition
 
 class RuleStatus(Enum):
     """Valid status values for rules"""
@@ -26,44 +29,48 @@ class RuleLevel(Enum):
 class DetectionDefinition:
     """Represents the detection configuration in a rule"""
 
-    keywords: Union[List[str], Dict[str, List[str]]]
+    selections: Dict[str, Selection]
     condition: str = "keywords"
-    modifiers: List[str] = field(default_factory=list)
+    # The condition compiled over the selections at load
+    tree: Condition = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.tree = Condition(self.condition, self.selections)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "DetectionDefinition":
         if not isinstance(data, dict):
             raise ValueError("Detection definition must be a dictionary")
 
-        keywords_data = data.get("keywords", [])
         condition = data.get("condition", "keywords")
-        modifiers = []
+        if isinstance(condition, list):
+            # A list of conditions matches when any of them does
+            condition = " or ".join(f"({c})" for c in condition)
 
-        if isinstance(keywords_data, dict):
-            modifier_key = next(iter(keywords_data))
-            if modifier_key.startswith("|"):
-                modifiers = [m for m in modifier_key.split("|") if m]
-                keywords_data = keywords_data[modifier_key]
+        selections = {
+            str(name): Selection.from_value(str(name), value)
+            for name, value in data.items()
+            if name not in ("condition", "timeframe")
+        }
 
         return cls(
-            keywords=keywords_data,
-            condition=condition,
-            modifiers=modifiers,
+            selections=selections,
+            condition=str(condition),
         )
+
+    def to_dict(self) -> Dict[str, Any]:
+        detection_dict = {name: selection.to_value() for name, selection in self.selections.items()}
+        detection_dict["condition"] = self.condition
+        return detection_dict
         
     def validate(self) -> List[str]:
         """Validate the detection configuration"""
         errors = []
 
-        # Validate keywords
-        if not self.keywords:
-            errors.append("At least one keyword is required")
-
-        # Validate modifiers
-        valid_modifiers = {'all', 're'}
-        for modifier in self.modifiers:
-            if modifier not in valid_modifiers:
-                errors.append(f"Invalid modifier: {modifier}")
+        if not self.selections:
+            errors.append("At least one selection is required")
+        for name, selection in self.selections.items():
+            errors.extend(selection.validate(name))
 
         return errors
 
@@ -89,6 +96,10 @@ class HighLevelEventDefinition:
     type: str
     description: str
     keys: List[KeyDefinition]
+    description_template: DescriptionTemplate = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.description_template = DescriptionTemplate.compile(self.description)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "HighLevelEventDefinition":
@@ -103,6 +114,10 @@ class HighLevelEventDefinition:
 class ReasoningDefinition:
     """Defines the reasoning section in the rule"""
     description: str
+    description_template: DescriptionTemplate = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.description_template = DescriptionTemplate.compile(self.description)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "ReasoningDefinition":
@@ -129,6 +144,7 @@ class Rule:
     modified: Optional[datetime] = None
     references: List[str] = field(default_factory=list)
     tags: List[str] = field(default_factory=list)
+    logsource: Optional[LogSourceDefinition] = None
     is_sigma_rule: bool = field(default=False)
 
     @classmethod
@@ -166,6 +182,11 @@ class Rule:
                         pass
                         
 
+        # Parse logsource, used to route only matching parsers' rows to the rule
+        logsource = None
+        if isinstance(yaml_data.get("logsource"), dict):
+            logsource = LogSourceDefinition.from_dict(yaml_data["logsource"])
+
         # Parse detection configuration
         detection_data = yaml_data.get("detection", {})
         detection = DetectionDefinition.from_dict(detection_data)
@@ -201,27 +222,41 @@ class Rule:
             modified=modified_obj,
             references=yaml_data.get("references", []),
             tags=yaml_data.get("tags", []),
+            logsource=logsource,
             is_sigma_rule=is_sigma_rule
         )
         
         return rule
 
+    def validate(self) -> List[str]:
+        """Validate the rule, including the fields its templates reference"""
+        # High-level descriptions render against HighLevelEvent, reasoning against LowLevelEvent
+        from sigmadft.events.HighLevelEvent import HighLevelEvent
+        from sigmadft.events.LowLevelEvent import LowLevelEvent
+
+        errors = self.detection.validate()
+
+        if self.high_level_event:
+            key_names = [k.name for k in self.high_level_event.keys]
+            errors.extend(
+                f"high_level_event.description: {error}"
+                for error in self.high_level_event.description_template.validate(
+                    vars(HighLevelEvent()), key_names
+                )
+            )
+        if self.reasoning:
+            errors.extend(
+                f"reasoning.description: {error}"
+                for error in self.reasoning.description_template.validate(
+                    vars(LowLevelEvent())
+                )
+            )
+
+        return errors
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert the rule to a dictionary"""
-        detection_dict = {
-            "keywords": self.detection.keywords,
-            "condition": self.detection.condition
-        }
-        
-        # Add modifiers if present
-        if self.detection.modifiers:
-            modifier_key = '|' + '|'.join(self.detection.modifiers)
-            detection_dict = {
-                "keywords": {
-                    modifier_key: self.detection.keywords
-                },
-                "condition": self.detection.condition
-            }
+        detection_dict = self.detection.to_dict()
         
         result = {
             "title": self.title,
@@ -234,6 +269,7 @@ class Rule:
             "modified": self.modified.strftime("%Y/%m/%d") if self.modified else None,
             "references": self.references,
             "tags": self.tags,
+            "logsource": self.logsource.to_dict() if self.logsource else None,
             "detection": detection_dict,
         }
         
@@ -0,0 +1,379 @@
+# src/sigmadft/server/AnalysisServer.py
+
+import argparse
+import json
+import math
+import os
+import queue
+import signal
+import socket
+import socketserver
+import stat
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from sigmadft import __version__
+from sigmadft.server.JobQueue import JobQueue
+from sigmadft.server.ResidentRules import ResidentRules
+
+
+DEFAULT_PORT = 8765
+
+# Requests larger than this are refused; a job is a few paths and a selector
+MAX_BODY_BYTES = 65536
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """JSON API of the analysis server.
+
+    POST /jobs           submit {"input_path", "output_path", "rules", "wait"}
+    GET  /jobs           list the known jobs
+    GET  /jobs/<id>      status and result of a job
+    DELETE /jobs/<id>    cancel a job
+    POST /reload         rescan the rules now
+    GET  /health         server status
+    """
+
+    server_version = f"sigmadft/{__version__}"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server.analysis_server
+        if self.path == "/health":
+            self._send(200, server.health())
+        elif self.path == "/jobs":
+            self._send(200, [job.to_dict() for job in list(server.jobs.jobs.values())])
+        elif self.path.startswith("/jobs/"):
+            job = server.jobs.jobs.get(self.path[len("/jobs/"):])
+            if job is None:
+                self._send(404, {"error": "Unknown job"})
+            else:
+                self._send(200, job.to_dict())
+        else:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        server = self.server.analysis_server
+        try:
+            # Read the body on every path so the next request on the connection starts clean
+            request = self._read_json()
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+
+        if self.path == "/reload":
+            changed = server.resident_rules.reload()
+            self._send(200, {"reloaded": changed, "generation": server.resident_rules.generation})
+            return
+        if self.path != "/jobs":
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        try:
+            input_path = request["input_path"]
+            output_path = request["output_path"]
+            rules = request.get("rules")
+            if not isinstance(input_path, str) or not isinstance(output_path, str):
+                raise ValueError("input_path and output_path must be strings")
+            if rules is not None and not isinstance(rules, str):
+                raise ValueError("rules must be a rule set name or selector string")
+            # A number is the longest time to wait in seconds, true waits until done, false does not wait
+            wait = request.get("wait")
+            if wait is not None and not isinstance(wait, bool) and (
+                not isinstance(wait, (int, float)) or not 0 <= wait < math.inf
+            ):
+                raise ValueError("wait must be true, false or a non-negative number of seconds")
+            # Validate the selector now, so a bad one fails the request rather than the job
+            server.resident_rules.select(rules)
+        except KeyError as e:
+            self._send(400, {"error": f"Missing field {str(e)}"})
+            return
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+
+        try:
+            job = server.jobs.submit(os.path.abspath(input_path), os.path.abspath(output_path), rules)
+        except queue.Full:
+            self._send(503, {"error": "Job queue is full, try again later"})
+            return
+
+        if wait:
+            job.done.wait(None if wait is True else float(wait))
+        self._send(200 if job.done.is_set() else 202, job.to_dict())
+
+    def do_DELETE(self):
+        server = self.server.analysis_server
+        if not self.path.startswith("/jobs/"):
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        job = server.jobs.cancel(self.path[len("/jobs/"):])
+        if job is None:
+            self._send(404, {"error": "Unknown job"})
+        else:
+            self._send(200, job.to_dict())
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError("Request body too large")
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise ValueError("Request body is not valid JSON")
+        if not isinstance(request, dict):
+            raise ValueError("Request body must be a JSON object")
+        return request
+
+    def _send(self, status: int, body: Any) -> None:
+        data = json.dumps(body, indent=2).encode() + b"\n"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.analysis_server.verbose:
+            # Unix socket clients have no address
+            client = self.client_address[0] if self.client_address else "local"
+            print(f"{client} - {format % args}")
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP over a Unix domain socket, e.g. for curl --unix-socket"""
+
+    daemon_threads = True
+
+
+class AnalysisServer:
+    """Long-running analysis service with the rules kept compiled in memory.
+
+    Listens on a localhost TCP port or a Unix socket. Jobs are queued to a
+    bounded pool of worker threads, and the rule directories are rescanned
+    every reload interval so edited rules apply to the next job.
+    """
+
+    def __init__(
+        self,
+        resident_rules: ResidentRules,
+        jobs: JobQueue,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        socket_path: Optional[str] = None,
+        reload_interval: float = 2.0,
+        verbose: bool = False,
+    ):
+        self.resident_rules = resident_rules
+        self.jobs = jobs
+        self.socket_path = socket_path
+        self.reload_interval = reload_interval
+        self.verbose = verbose
+        self._stop = threading.Event()
+
+        if socket_path:
+            _remove_stale_socket(socket_path)
+            self.httpd = UnixHTTPServer(socket_path, AnalysisRequestHandler)
+            os.chmod(socket_path, 0o600)
+            self.address = socket_path
+        else:
+            self.httpd = ThreadingHTTPServer((host, port), AnalysisRequestHandler)
+            self.httpd.daemon_threads = True
+            self.address = f"http://{host}:{self.httpd.server_address[1]}"
+        self.httpd.analysis_server = self
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "version": __version__,
+            "rules": len(self.resident_rules.index.entries),
+            "generation": self.resident_rules.generation,
+            "jobs": self.jobs.stats(),
+        }
+
+    def serve_forever(self) -> None:
+        """Serves requests until shutdown() is called or the process is interrupted"""
+        watcher = None
+        if self.reload_interval > 0:
+            watcher = threading.Thread(
+                target=self.resident_rules.watch,
+                args=(self.reload_interval, self._stop),
+                name="sigmadft-rule-watcher",
+                daemon=True,
+            )
+            watcher.start()
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self._stop.set()
+            self.httpd.server_close()
+            if self.socket_path:
+                try:
+                    os.unlink(self.socket_path)
+                except OSError:
+                    pass
+
+    def shutdown(self) -> None:
+        self.httpd.shutdown()
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Removes a socket file left by a server that is no longer running"""
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+            return
+    raise OSError(f"Another server is listening on {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Long-running sigmadft analysis server with a local HTTP API."
+    )
+    parser.add_argument(
+        "--host",
+        action="store",
+        type=str,
+        default="127.0.0.1",
+        help="Address to listen on (default 127.0.0.1). The API reads and writes any path the server can, so keep it local.",
+    )
+    parser.add_argument(
+        "--port",
+        action="store",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"TCP port to listen on (default {DEFAULT_PORT}, 0 picks a free port).",
+    )
+    parser.add_argument(
+        "--socket",
+        action="store",
+        type=str,
+        help="Listen on this Unix socket instead of a TCP port.",
+    )
+    parser.add_argument(
+        "--workers",
+        action="store",
+        type=int,
+        default=2,
+        help="Jobs analyzed at the same time (default 2).",
+    )
+    parser.add_argument(
+        "--max-queue",
+        action="store",
+        type=int,
+        default=64,
+        help="Jobs that may wait for a worker before new ones are refused (default 64).",
+    )
+    parser.add_argument(
+        "--keep-timelines",
+        action="store",
+        type=int,
+        default=0,
+        help="Ingested timelines kept in memory for repeated jobs on the same unchanged input (default 0).",
+    )
+    parser.add_argument(
+        "--reload-interval",
+        action="store",
+        type=float,
+        default=2.0,
+        help="Seconds between checks for changed rule files (default 2, 0 only reloads on POST /reload).",
+    )
+    parser.add_argument(
+        "--rules-dir",
+        action="append",
+        type=str,
+        help="Additional directory of YAML rules to index (can be repeated).",
+    )
+    parser.add_argument(
+        "--logsource-map",
+        action="store",
+        type=str,
+        help="YAML file mapping rule logsource values to plaso parsers (default: config/logsource_mapping.yml).",
+    )
+    parser.add_argument(
+        "--no-logsource-routing",
+        action="store_true",
+        help="Scan every event with every rule instead of routing rules by logsource.",
+    )
+    parser.add_argument(
+        "--match-cache-size",
+        action="store",
+        type=int,
+        default=100000,
+        help="Maximum number of distinct messages whose rule-match results are cached per timeline (0 disables the cache).",
+    )
+    parser.add_argument(
+        "--rule-cache-dir",
+        action="store",
+        type=str,
+        help="Directory of the compiled rule-pack cache (default: the user cache directory).",
+    )
+    parser.add_argument(
+        "--no-rule-cache",
+        action="store_true",
+        help="Parse every YAML rule instead of using the compiled rule-pack cache.",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Log every request.",
+    )
+    args = parser.parse_args()
+
+    if args.host not in ("127.0.0.1", "localhost", "::1") and not args.socket:
+        print(f"Warning: Listening on {args.host}; anyone who can reach it can read and write files as this user")
+
+    resident_rules = ResidentRules(
+        args.rules_dir,
+        cache_dir=args.rule_cache_dir,
+        persist=not args.no_rule_cache,
+        logsource_map=args.logsource_map,
+        logsource_routing=not args.no_logsource_routing,
+    )
+    # Compile the default rule set up front so the first job is warm
+    default_rules = resident_rules.select(None)
+    print(f"Loaded {len(default_rules)} default rules ({len(resident_rules.index.entries)} indexed)")
+
+    jobs = JobQueue(
+        resident_rules,
+        workers=max(1, args.workers),
+        max_queue=max(1, args.max_queue),
+        match_cache_size=args.match_cache_size,
+        keep_timelines=args.keep_timelines,
+    )
+    try:
+        server = AnalysisServer(
+            resident_rules,
+            jobs,
+            host=args.host,
+            port=args.port,
+            socket_path=args.socket,
+            reload_interval=args.reload_interval,
+            verbose=args.verbose,
+        )
+    except OSError as e:
+        print(f"Error: {str(e)}")
+        jobs.shutdown()
+        return
+
+    # SIGTERM stops the server like Ctrl+C, so service managers shut it down cleanly
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    print(f"Listening on {server.address} with {args.workers} workers (press Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("Stopping, waiting for running jobs to stop ...")
+        jobs.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# src/sigmadft/server/JobQueue.py
+
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import sigmadft.analyzers.ReadFromYamlAnalyzer as ReadFromYamlAnalyzer
+from sigmadft.output.JSONWriter import JSONWriter
+from sigmadft.reader.ColumnMapping import ColumnMapping, rule_attributes
+from sigmadft.reader.CSVReader import reader_for
+from sigmadft.server.ResidentRules import ResidentRules
+from sigmadft.timelines.LowLevelTimeline import LowLevelTimeline
+from sigmadft.timelines.RowFilter import RowFilter
+
+
+# Job states; a job ends in one of the last three
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Finished jobs kept for status requests
+MAX_FINISHED_JOBS = 1000
+
+# Rows read between checks for cancellation while a timeline is ingested
+CANCEL_CHECK_ROWS = 10000
+
+
+@dataclass
+class Job:
+    """One analysis request and its outcome"""
+
+    id: str
+    input_path: str
+    output_path: str
+    rules: Optional[str] = None
+    status: str = QUEUED
+    error: Optional[str] = None
+    submitted: str = ""
+    started: Optional[str] = None
+    finished: Optional[str] = None
+    rule_count: int = 0
+    rows: int = 0
+    events: int = 0
+    timeline_cached: bool = False
+    timeline_seconds: float = 0.0
+    rules_seconds: float = 0.0
+    write_seconds: float = 0.0
+    total_seconds: float = 0.0
+    rule_errors: List[str] = field(default_factory=list)
+    cancel_requested: threading.Event = field(default_factory=threading.Event, repr=False)
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            name: value
+            for name, value in vars(self).items()
+            if not isinstance(value, threading.Event)
+        }
+
+
+class TimelineCache:
+    """Low-level timelines kept in memory between jobs, least recently used first out.
+
+    A timeline is reused while its file's size and modification time and the
+    rules generation are unchanged. Timelines are kept per rule selection,
+    since the rows they defer and the columns they read depend on the rules.
+    Jobs on the same timeline take turns, since its match cache is not safe to
+    share between threads.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], Tuple[Tuple, LowLevelTimeline, threading.Lock]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, path: str, generation: int, rules: Optional[str] = None
+    ) -> Optional[Tuple[LowLevelTimeline, threading.Lock]]:
+        if self.max_entries <= 0:
+            return None
+        key = self._key(path, generation)
+        with self._lock:
+            entry = self._entries.get((path, rules))
+            if entry is None or entry[0] != key:
+                return None
+            self._entries.move_to_end((path, rules))
+            return entry[1], entry[2]
+
+    def put(
+        self, path: str, generation: int, timeline: LowLevelTimeline, rules: Optional[str] = None
+    ) -> threading.Lock:
+        lock = threading.Lock()
+        if self.max_entries <= 0:
+            return lock
+        with self._lock:
+            self._entries[(path, rules)] = (self._key(path, generation), timeline, lock)
+            self._entries.move_to_end((path, rules))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return lock
+
+    @staticmethod
+    def _key(path: str, generation: int) -> Tuple:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns, generation
+
+
+class JobQueue:
+    """Bounded queue of analysis jobs run by a fixed number of worker threads.
+
+    Queued jobs can be cancelled outright; a running job stops before its next
+    rule and writes no output.
+    """
+
+    def __init__(
+        self,
+        resident_rules: ResidentRules,
+        workers: int = 2,
+        max_queue: int = 64,
+        match_cache_size: int = 0,
+        keep_timelines: int = 0,
+    ):
+        self.resident_rules = resident_rules
+        self.match_cache_size = match_cache_size
+        self.timelines = TimelineCache(keep_timelines)
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(max_queue)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._threads = [
+            threading.Thread(target=self._work, name=f"sigmadft-worker-{n}", daemon=True)
+            for n in range(1, workers + 1)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, input_path: str, output_path: str, rules: Optional[str] = None) -> Job:
+        """Queues a job; raises queue.Full when the queue is at its limit"""
+        with self._lock:
+            job = Job(f"{next(self._ids)}", input_path, output_path, rules, submitted=_now())
+            self._queue.put_nowait(job)
+            self.jobs[job.id] = job
+            self._forget_finished()
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancels a queued or running job; returns None for unknown jobs"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == QUEUED:
+                # The worker that takes it off the queue skips it
+                self._finish(job, CANCELLED)
+            elif job.status == RUNNING:
+                job.cancel_requested.set()
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {state: 0 for state in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)}
+            for job in self.jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def shutdown(self) -> None:
+        """Cancels the queued jobs and stops the workers after their current job"""
+        with self._lock:
+            for job in self.jobs.values():
+                if job.status == QUEUED:
+                    self._finish(job, CANCELLED)
+                elif job.status == RUNNING:
+                    job.cancel_requested.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _forget_finished(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.done.is_set()]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    @staticmethod
+    def _finish(job: Job, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished = _now()
+        job.done.set()
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                if job.status != QUEUED:
+                    continue
+                job.status = RUNNING
+                job.started = _now()
+            try:
+                status = self._run(job)
+                error = None
+            except Exception as e:
+                status, error = FAILED, f"{type(e).__name__}: {str(e)}"
+            with self._lock:
+                self._finish(job, status, error)
+
+    def _run(self, job: Job) -> str:
+        total_start = time.perf_counter()
+        rules = self.resident_rules.select(job.rules)
+        job.rule_count = len(rules)
+        generation = self.resident_rules.generation
+
+        timeline_start = time.perf_counter()
+        cached = self.timelines.get(job.input_path, generation, job.rules)
+        if cached is not None:
+            low_timeline, lock = cached
+            job.timeline_cached = True
+        else:
+            low_timeline = LowLevelTimeline(
+                match_cache_size=self.match_cache_size,
+                logsource_mapping=self.resident_rules.logsource_mapping,
+                row_filter=RowFilter.from_rules(rules),
+            )
+            # The same inputs as the CLI: CSV or JSON Lines, compressed or not
+            reader = reader_for(job.input_path, column_mapping=ColumnMapping(attributes_needed=rule_attributes(rules)))
+            for index, row in reader.read_csv():
+                if index % CANCEL_CHECK_ROWS == 0 and job.cancel_requested.is_set():
+                    return self._cancelled(job, total_start)
+                if index > 0:   # Skip the first row, it is the CSV header
+                    low_timeline.ingest_row(index, row)
+            lock = self.timelines.put(job.input_path, generation, low_timeline, job.rules)
+        job.rows = len(low_timeline.events)
+        job.timeline_seconds = time.perf_counter() - timeline_start
+
+        rules_start = time.perf_counter()
+        with lock:
+            merged, job.rule_errors = ReadFromYamlAnalyzer.RunAll(
+                low_timeline, rules, should_stop=job.cancel_requested.is_set
+            )
+        job.rules_seconds = time.perf_counter() - rules_start
+        if job.cancel_requested.is_set():
+            return self._cancelled(job, total_start)
+        job.events = len(merged.events)
+
+        write_start = time.perf_counter()
+        JSONWriter(merged, job.output_path).write()
+        job.write_seconds = time.perf_counter() - write_start
+        job.total_seconds = time.perf_counter() - total_start
+        return DONE
+
+    @staticmethod
+    def _cancelled(job: Job, total_start: float) -> str:
+        job.total_seconds = time.perf_counter() - total_start
+        return CANCELLED
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="milliseconds")
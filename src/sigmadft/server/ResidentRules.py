@@ -0,0 +1,123 @@
+# src/sigmadft/server/ResidentRules.py
+
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from sigmadft.reader.RuleIndex import BUNDLED_RULES_DIR, LOGSOURCE_MAPPING_PATH, RULE_SETS_PATH, RuleIndex, RuleIndexEntry
+from sigmadft.reader.RulePackCache import RulePackCache
+from sigmadft.rules.CorrelationRule import CorrelationRule
+from sigmadft.rules.LogSource import LogSourceMapping
+from sigmadft.rules.Rule import Rule
+
+
+class ResidentRules:
+    """Compiled rules kept in memory by the analysis server.
+
+    Selections are compiled once and reused by later jobs. reload() rescans the
+    rule directories and the rule set and logsource configuration, and drops
+    the compiled selections when anything changed; the generation counter tells
+    holders of per-rule state (such as resident timelines) to rebuild it.
+    """
+
+    def __init__(
+        self,
+        rules_dirs: Optional[List[str]] = None,
+        cache_dir: Optional[str] = None,
+        persist: bool = True,
+        logsource_map: Optional[str] = None,
+        logsource_routing: bool = True,
+    ):
+        self.index = RuleIndex([BUNDLED_RULES_DIR] + (rules_dirs or []), cache_dir=cache_dir, persist=persist)
+        self.cache = RulePackCache(cache_dir) if persist else None
+        self.logsource_map = logsource_map or LOGSOURCE_MAPPING_PATH
+        self.logsource_routing = logsource_routing
+        self.logsource_mapping: Optional[LogSourceMapping] = None
+        self.generation = 0
+        self._selections: Dict[Optional[str], List[Rule]] = {}
+        self._lock = threading.Lock()
+        self._signature = self._current_signature()
+        self._load_logsource_mapping()
+        self.index.save()
+
+    def _current_signature(self) -> Tuple:
+        configs = []
+        for path in (RULE_SETS_PATH, self.logsource_map):
+            try:
+                stat = os.stat(path)
+                configs.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                configs.append((path, None, None))
+        rules = [(entry.path, entry.content_hash) for entry in self.index.entries]
+        return tuple(configs), tuple(rules)
+
+    def _load_logsource_mapping(self) -> None:
+        if self.logsource_routing:
+            self.logsource_mapping = LogSourceMapping(self.index.load_config(self.logsource_map))
+
+    def select(self, selector: Optional[str]) -> List[Rule]:
+        """Returns the compiled rules for a rule set name or selector.
+
+        Raises ValueError for an invalid selector, like RuleIndex.select.
+        """
+        with self._lock:
+            rules = self._selections.get(selector)
+            if rules is not None:
+                return rules
+
+            rules = []
+            for entry in self.index.select(selector):
+                try:
+                    rules.append(self._load(entry))
+                except Exception as e:
+                    print(f"  ✗ Error loading rule {entry.relative_path}: {str(e)}")
+            for rule in rules:
+                if isinstance(rule, CorrelationRule):
+                    for reference in rule.resolve(rules, self._load_reference):
+                        print(f"  ! {rule.title}: referenced rule '{reference}' not found")
+            if self.cache is not None:
+                self.cache.save()
+            self.index.save()
+            self._selections[selector] = rules
+            return rules
+
+    def _load_reference(self, reference: str) -> Optional[Rule]:
+        entry = self.index.find(reference)
+        if entry is None:
+            return None
+        try:
+            rule = self._load(entry)
+        except Exception as e:
+            print(f"  ✗ Error loading rule {entry.relative_path}: {str(e)}")
+            return None
+        return None if isinstance(rule, CorrelationRule) else rule
+
+    def _load(self, entry: RuleIndexEntry) -> Rule:
+        if self.cache is not None:
+            return self.cache.load_rule(entry.path, entry.content_hash)
+        from sigmadft.reader.YAMLReader import YAMLReader
+
+        return YAMLReader(entry.path).read()
+
+    def reload(self) -> bool:
+        """Rescans the rules and configuration and returns whether anything changed"""
+        with self._lock:
+            self.index.refresh()
+            signature = self._current_signature()
+            if signature == self._signature:
+                return False
+
+            self._signature = signature
+            self._selections.clear()
+            self._load_logsource_mapping()
+            self.index.save()
+            self.generation += 1
+        print(f"Rules changed, reloaded the rule index ({len(self.index.entries)} rules)")
+        return True
+
+    def watch(self, interval: float, stop: threading.Event) -> None:
+        """Calls reload every interval seconds until stop is set"""
+        while not stop.wait(interval):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Warning: Could not reload rules: {str(e)}")
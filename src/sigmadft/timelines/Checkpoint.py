@@ -0,0 +1,111 @@
+# src/sigmadft/timelines/Checkpoint.py
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+
+CHECKPOINT_FORMAT = 1
+
+# Bytes hashed at the start of the input and just before the checkpoint offset
+FINGERPRINT_BYTES = 65536
+
+
+def input_fingerprint(path: str, offset: int) -> str:
+    """Hashes the head of the input and the bytes before the offset.
+
+    A file that only grew keeps both, while a replaced, rewritten or truncated
+    export almost always changes one of them.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        digest.update(file.read(min(offset, FINGERPRINT_BYTES)))
+        tail_start = max(0, offset - FINGERPRINT_BYTES)
+        file.seek(tail_start)
+        digest.update(file.read(offset - tail_start))
+    return digest.hexdigest()
+
+
+def rules_fingerprint(rule_entries) -> str:
+    """Hashes the selected rules, in order, and the code that compiles them"""
+    from sigmadft.reader.RulePackCache import compiler_fingerprint
+
+    digest = hashlib.sha256(compiler_fingerprint().encode())
+    for entry in rule_entries:
+        digest.update(f"{entry.relative_path}\0{entry.content_hash}\0".encode())
+    return digest.hexdigest()
+
+
+def output_stat(path: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+@dataclass
+class Checkpoint:
+    """State saved after a run so a grown input can be analyzed incrementally.
+
+    Records how far the input was read (byte offset and last row id), the rule
+    pack the output was produced with, the output it was written to and the
+    trailing low-level events that later rows need as supporting events.
+    """
+
+    input_path: str
+    byte_offset: int
+    last_row_id: int
+    input_fingerprint: str
+    rules_hash: str
+    output_path: str
+    output_stat: Optional[List[int]] = None
+    window: List[dict] = field(default_factory=list)
+    format: int = CHECKPOINT_FORMAT
+
+    @classmethod
+    def load(cls, path: str) -> Optional["Checkpoint"]:
+        """Loads a checkpoint, or returns None if there is none or it cannot be used"""
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable state file {path}: {str(e)}")
+            return None
+        if not isinstance(data, dict) or data.get("format") != CHECKPOINT_FORMAT:
+            print(f"Warning: Ignoring state file {path} from another sigmadft version")
+            return None
+        try:
+            return cls(**data)
+        except TypeError as e:
+            print(f"Warning: Ignoring invalid state file {path}: {str(e)}")
+            return None
+
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(asdict(self), file)
+        os.replace(tmp_path, path)
+
+    def resume_problem(self, input_path: str, output_path: str, rules_hash: str) -> Optional[str]:
+        """Returns why the checkpoint cannot be resumed from, or None if it can"""
+        if os.path.abspath(input_path) != self.input_path:
+            return "it was saved for another input file"
+        if os.path.abspath(output_path) != self.output_path:
+            return "it was saved for another output file"
+        if rules_hash != self.rules_hash:
+            return "the selected rules changed"
+        if output_stat(output_path) != self.output_stat:
+            return "the output file changed"
+        try:
+            if os.path.getsize(input_path) < self.byte_offset:
+                return "the input file was truncated"
+            if input_fingerprint(input_path, self.byte_offset) != self.input_fingerprint:
+                return "the input file was rewritten"
+        except OSError as e:
+            return str(e)
+        return None
@@ -1,23 +1,58 @@
 # src/sigmadft/timelines/HighLevelTimeline.py
 
+import heapq
 import re
+from array import array
+from bisect import bisect_left
 from datetime import datetime
-from typing import List
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from sigmadft.events.DeferredEvent import DeferredEvent
 from sigmadft.events.LowLevelEvent import LowLevelEvent
 from sigmadft.reader.CSVReader import CSVReader
+from sigmadft.rules.LogSource import LogSourceMapping
 from sigmadft.rules.Rule import Rule
+from sigmadft.timelines.MatchCache import DEFAULT_MAX_ENTRIES, MatchCache
+from sigmadft.timelines.RowFilter import RowFilter
+from sigmadft.timelines.SelectivityTuner import SelectivityTuner
+from sigmadft.utils.RuleProfiler import RuleProfiler
 
 
 num_supporting_events = 5
 
 class LowLevelTimeline:
-    def __init__(self):
+    def __init__(
+        self,
+        match_cache_size: int = DEFAULT_MAX_ENTRIES,
+        logsource_mapping: Optional[LogSourceMapping] = None,
+        adaptive_order: bool = True,
+        row_filter: Optional[RowFilter] = None,
+    ):
         """Initializes the LowLevelTimeline object"""
-        self.events: List[LowLevelEvent] = []  # List to store all low-level events
+        self.events: List[Union[LowLevelEvent, DeferredEvent]] = []  # List to store all low-level events
+        # Rule-match results for repeated messages, disabled when the size is 0
+        self.match_cache = MatchCache(match_cache_size) if match_cache_size > 0 else None
+        # Positions in self.events grouped by plaso parser, built at ingest
+        self.partitions: Dict[str, array] = {}
+        # Routes each rule to the partitions of its logsource; None scans every event
+        self.logsource_mapping = logsource_mapping
+        self._rule_parsers: Dict[int, Tuple[Rule, Optional[List[str]]]] = {}
+        # Records per-keyword evaluation costs when set; matching is unchanged otherwise
+        self.profiler: Optional[RuleProfiler] = None
+        # Reorders each rule's predicates by their hit rates on this timeline
+        self.tuner = SelectivityTuner() if adaptive_order else None
+        # Id of the event before self.events[0], non-zero when resuming from a checkpoint
+        self.id_offset = 0
+        # Rows the filter rejects are kept as DeferredEvents, in no partition
+        self.row_filter = row_filter
+        self.deferred = 0
+        # Ids in order of self.events, kept when a time range leaves gaps between them
+        self.ids: Optional[array] = array("q") if row_filter is not None and row_filter.time_range else None
     
     def create_timeline(self, reader: CSVReader) -> list:
         """Creates a timeline of low-level events from a CSV file"""
-        # map from plaso CSV columns to LowLevelEvent attributes
+        # map from plaso CSV columns to LowLevelEvent attributes; the reader
+        # maps the input's columns to these by header name
         # plaso CSV columns: 
         # [0] datetime,
         # [1] timestamp_desc,
@@ -30,31 +65,118 @@ class LowLevelTimeline:
 
         for index, row in reader.read_csv():
             if index > 0:   # Skip the first row, it is the CSV header
-                event = LowLevelEvent()
-                event.id = index
-                event.date_time_min = row[0]                    # [0] datetime
-                event.date_time_max = None
-                event.type = f"{row[1]}-{row[2]}"               # [1] timestamp_desc, [3] source_long
-                event.path = row[6]                             # [6] display_name
-                event.evidence = row[4]                         # [4] message
-                event.plugin = f"{row[2]}-{row[3]}-{row[5]}"    # [2] source, [3] source_long, [5] parser
-                event.provenance = {
-                    'line_number': index,
-                    'raw_entry': row
-                }
-                event.keys = None
-                self.add_event(event)
+                self.ingest_row(index, row)
         
         return self.events
+
+    def ingest_row(
+        self, index: int, row: list, line_number: Optional[int] = None
+    ) -> Union[LowLevelEvent, DeferredEvent]:
+        """Adds a plaso CSV row, as a full event only if the row filter lets it through"""
+        if self.row_filter is not None and not self.row_filter.relevant(row):
+            event = DeferredEvent(index, row, line_number)
+            self.add_deferred(event)
+            return event
+        event = self.add_row(index, row)
+        if line_number is not None:
+            event.provenance['line_number'] = line_number
+        return event
+
+    def add_row(self, index: int, row: list) -> LowLevelEvent:
+        """Creates a low-level event from a plaso CSV row and adds it to the timeline"""
+        event = LowLevelEvent.from_row(index, row)
+        self.add_event(event, row[5])               # [5] parser
+        return event
+
+    def resume(self, window: List[dict], last_row_id: int) -> None:
+        """Starts the timeline from the trailing events of a previous run.
+
+        The window events only serve as supporting events; callers run rules from
+        position len(window) so they are not matched again.
+        """
+        self.id_offset = last_row_id - len(window)
+        for event_dict in window:
+            event = LowLevelEvent.from_dict(event_dict)
+            self.add_event(event, event.provenance['raw_entry'][5])
+
+    def append_records(self, reader: CSVReader, offset: int, next_index: int) -> Tuple[int, int]:
+        """Adds the CSV records after a byte offset and returns the new (offset, last row id)"""
+        last_index = next_index - 1
+        for index, row, offset in reader.read_records(offset, next_index):
+            if index > 0:   # Skip the first row, it is the CSV header
+                self.ingest_row(index, row)
+            last_index = index
+        return offset, last_index
     
-    def add_event(self, event: LowLevelEvent):
-        """Adds a low-level event to the timeline"""
+    def add_event(self, event: LowLevelEvent, parser: Optional[str] = None):
+        """Adds a low-level event to the timeline, in the partition of its parser"""
+        # Events added without a parser go to the "" partition, which every rule scans
+        positions = self.partitions.get(parser or "")
+        if positions is None:
+            positions = self.partitions[parser or ""] = array("q")
+            self._rule_parsers.clear()
+        positions.append(len(self.events))
+        self.events.append(event)
+        if self.ids is not None:
+            self.ids.append(event.id)
+
+    def add_deferred(self, event: DeferredEvent):
+        """Adds a row that only serves as a supporting event; rules never scan it"""
         self.events.append(event)
+        self.deferred += 1
+        if self.ids is not None:
+            self.ids.append(event.id)
+
+    def parsers_for_rule(self, rule: Rule) -> Optional[List[str]]:
+        """Returns the parser partitions relevant to the rule's logsource, or None for all events"""
+        entry = self._rule_parsers.get(id(rule))
+        if entry is None:
+            parsers = None
+            if self.logsource_mapping is not None:
+                parsers = self.logsource_mapping.select_parsers(
+                    rule.logsource, [p for p in self.partitions if p]
+                )
+                if parsers is not None:
+                    parsers.extend(p for p in self.partitions if not p)
+                    if len(parsers) == len(self.partitions):
+                        parsers = None
+            # Keep a reference to the rule so its id() cannot be reused by another object
+            entry = self._rule_parsers[id(rule)] = (rule, parsers)
+        return entry[1]
+
+    def events_for_rule(self, rule: Rule, start_id: int = 0, end_id: Optional[int] = None) -> Iterable[LowLevelEvent]:
+        """Returns the events in a range of positions that the rule needs to see, in order"""
+        parsers = self.parsers_for_rule(rule)
+        if parsers is None:
+            if not self.deferred:
+                return self.events[start_id:end_id]
+            # The partitions hold every full event, and only those
+            parsers = list(self.partitions)
+        if not parsers:
+            return []
+        if end_id is None:
+            end_id = len(self.events)
+
+        ranges = []
+        for parser in parsers:
+            positions = self.partitions[parser]
+            ranges.append(positions[bisect_left(positions, start_id):bisect_left(positions, end_id)])
+        positions = ranges[0] if len(ranges) == 1 else heapq.merge(*ranges)
+
+        events = self.events
+        return (events[position] for position in positions)
+
+    def count_events_for_rule(self, rule: Rule) -> int:
+        """Returns how many events the rule scans over the whole timeline"""
+        parsers = self.parsers_for_rule(rule)
+        if parsers is None:
+            return len(self.events) - self.deferred
+        return sum(len(self.partitions[parser]) for parser in parsers)
 
     def find_matching_events_in_id_range(self, start_id: int, end_id: int, test_event: LowLevelEvent) -> list:
         """Finds matching events in a given range of IDs"""
         matching_events = []
-        for event in self.events[start_id:end_id]:
+        for event in self._materialized(self.events[start_id:end_id]):
             if self.match(event, test_event):
                 matching_events.append(event)
         
@@ -63,31 +185,67 @@ class LowLevelTimeline:
     def find_matching_events_in_id_range_with_rule(
         self, start_id: int, end_id: int, rule: Rule
     ) -> List[LowLevelEvent]:
-        """Find all events that match the rule's keywords"""
+        """Find all events that satisfy the rule's detection condition"""
         matching_events = []
 
-        # Determine matching behavior based on modifiers
-        use_regex = "re" in rule.detection.modifiers
-        require_all = "all" in rule.detection.modifiers
+        if self.profiler is not None:
+            return self._find_matching_events_profiled(start_id, end_id, rule)
 
-        for event in self.events[start_id:end_id]:
-            event_text = f"{event.type} {event.evidence} {event.plugin}"
+        events = self.events_for_rule(rule, start_id, end_id)
+        if self.tuner is not None:
+            segments = self.tuner.segments(rule, events)
+        else:
+            segments = [(rule.detection.tree.matcher(), events)]
 
-            matches = []
+        cache = self.match_cache
+        if cache is None:
+            for matches, segment in segments:
+                for event in segment:
+                    if matches(event.type, event.evidence, event.plugin):
+                        matching_events.append(event)
+            return matching_events
 
-            # Check each keyword against the event text
-            for keyword in rule.detection.keywords:
-                match = self._check_keyword_match(event_text, keyword, use_regex)
-                matches.append(match)
+        bit = cache.rule_bit(rule)
+        for matches, segment in segments:
+            for event in segment:
+                # Repeated messages are answered from the cache without re-evaluating the condition
+                key = (event.type, event.evidence, event.plugin)
+                should_include = cache.lookup(key, bit)
+                if should_include is None:
+                    should_include = matches(event.type, event.evidence, event.plugin)
+                    cache.store(key, bit, should_include)
 
-            should_include = False
-            if require_all:
-                should_include = all(matches)
+                if should_include:
+                    matching_events.append(event)
+
+        return matching_events
+
+    def _find_matching_events_profiled(self, start_id: int, end_id: int, rule: Rule) -> List[LowLevelEvent]:
+        """find_matching_events_in_id_range_with_rule, timing every keyword evaluation"""
+        matching_events = []
+        profile = self.profiler.rule_profile(rule)
+        matches = rule.detection.tree.profiled_matcher(
+            profile.keyword_evaluations, profile.keyword_hits, profile.keyword_seconds
+        )
+        cache = self.match_cache
+        bit = cache.rule_bit(rule) if cache is not None else None
+
+        rule_start = perf_counter()
+        for event in self.events_for_rule(rule, start_id, end_id):
+            profile.events += 1
+            key = (event.type, event.evidence, event.plugin)
+            should_include = cache.lookup(key, bit) if cache is not None else None
+            if should_include is not None:
+                profile.cache_hits += 1
             else:
-                should_include = any(matches)
+                should_include = matches(event.type, event.evidence, event.plugin)
+                if cache is not None:
+                    cache.store(key, bit, should_include)
 
             if should_include:
+                profile.matches += 1
                 matching_events.append(event)
+        profile.seconds += perf_counter() - rule_start
 
         return matching_events
 
@@ -125,11 +283,16 @@ class LowLevelTimeline:
         # Get the events before and after the event
         if event_id == 0:
             num_before = 0
+        if self.ids is not None:
+            return self._supporting_events_by_id(event_id, num_before, num_after)
+
+        # Ids count from 1, so the event itself sits at position - 1
+        position = event_id - self.id_offset
 
-        for event in self.events[event_id-num_before-1:event_id-1]:
+        for event in self.events[position-num_before-1:position-1]:
             before_events.append(event.to_dict())
 
-        for event in self.events[event_id:event_id+num_after]:
+        for event in self.events[position:position+num_after]:
             after_events.append(event.to_dict())
         
         # Add the events to the dictionary
@@ -138,10 +301,30 @@ class LowLevelTimeline:
         
         return supporting_events
     
+    def _supporting_events_by_id(self, event_id: int, num_before: int, num_after: int) -> dict:
+        """get_supporting_events for a timeline with gaps in its ids.
+
+        The reader keeps the rows next to every row in the time range, so the
+        neighbours by id are present and are the same as in a full run.
+        """
+        ids = self.ids
+        position = bisect_left(ids, event_id)
+        # As the slice in get_supporting_events, which finds nothing before the first rows
+        first = position - num_before if event_id - num_before - 1 >= 0 else position
+        before_events = [
+            self.events[i].to_dict() for i in range(max(first, 0), position) if ids[i] >= event_id - num_before
+        ]
+        after_events = [
+            self.events[i].to_dict()
+            for i in range(position + 1, min(position + 1 + num_after, len(ids)))
+            if ids[i] <= event_id + num_after
+        ]
+        return {'before': before_events, 'after': after_events}
+
     def get_list_of_matches_in_sub_timeline(self, test_event: LowLevelEvent, start_time: datetime, end_time: datetime) -> list:
         """Returns a list of events that match the test events in a given time frame"""
         results = []
-        for event in self.events:  
+        for event in self._materialized(self.events):
             if datetime.fromisoformat(event.date_time_min) >= start_time and datetime.fromisoformat(event.date_time_min) <= end_time:
                 if self.match(event, test_event):
                     results.append(event)
@@ -149,15 +332,28 @@ class LowLevelTimeline:
         return results
 
     def find_matching_events_with_test_event_dict(self, test_event_dict: dict, start_id: int, end_id: int) -> list:
-        """Finds matching events with a test event dictionary"""
-        matching_events = []
-        for test_event in test_event_dict.values():
-            matching_event = self.find_matching_events_in_id_range(start_id, end_id, test_event)
+        """Finds matching events with a test event dictionary.
 
-            if matching_event:
-                matching_events.extend(matching_event)
-            else:
-                return None
-        
-        return matching_events
+        The events are scanned once for all test events. The matches are
+        returned grouped by test event, in dictionary order, or None when a
+        test event matches nothing.
+        """
+        patterns = [
+            (re.compile(test_event.type).search, re.compile(test_event.evidence).search)
+            for test_event in test_event_dict.values()
+        ]
+        matches_per_test: List[List[LowLevelEvent]] = [[] for _ in patterns]
+        for event in self._materialized(self.events[start_id:end_id]):
+            for (type_search, evidence_search), matches in zip(patterns, matches_per_test):
+                if type_search(event.type) and evidence_search(event.evidence):
+                    matches.append(event)
+
+        if not all(matches_per_test):
+            return None
+        return [event for matches in matches_per_test for event in matches]
 
+    @staticmethod
+    def _materialized(events: Iterable[Union[LowLevelEvent, DeferredEvent]]) -> Iterable[LowLevelEvent]:
+        """Yields the events with deferred rows built into full events"""
+        for event in events:
+            yield event.materialize() if isinstance(event, DeferredEvent) else event
@@ -0,0 +1,82 @@
+# src/sigmadft/timelines/MatchCache.py
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+DEFAULT_MAX_ENTRIES = 100000
+
+
+class MatchCache:
+    """Bounded LRU cache of rule-match results for repeated messages.
+
+    Entries are keyed by the matched message, the (type, evidence, plugin)
+    tuple of a low-level event, and hold two bitsets: the rules that have been
+    evaluated against the message and the rules that matched it. Each rule is
+    given one bit, so a repeated message costs a single dictionary lookup per rule.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, list]" = OrderedDict()  # key -> [evaluated, matched]
+        self._rule_bits: Dict[int, Tuple[Any, int]] = {}  # id(rule) -> (rule, bit)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def rule_bit(self, rule: Any) -> int:
+        """Returns the bit assigned to the rule, assigning a new one on first use"""
+        entry = self._rule_bits.get(id(rule))
+        if entry is None:
+            # Keep a reference to the rule so its id() cannot be reused by another object
+            entry = self._rule_bits[id(rule)] = (rule, 1 << len(self._rule_bits))
+        return entry[1]
+
+    def lookup(self, key: Hashable, bit: int) -> Optional[bool]:
+        """Returns the cached result for the rule bit, or None if it was not evaluated yet"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] & bit:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return bool(entry[1] & bit)
+        self.misses += 1
+        return None
+
+    def store(self, key: Hashable, bit: int, matched: bool) -> None:
+        """Records the result of evaluating the rule bit against the message"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [0, 0]
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._entries.move_to_end(key)
+        entry[0] |= bit
+        if matched:
+            entry[1] |= bit
+
+    def clear(self) -> None:
+        """Drops all cached results and statistics"""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the cache statistics"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
@@ -0,0 +1,117 @@
+# src/sigmadft/timelines/RowFilter.py
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from sigmadft.reader.TimeRange import TimeRange
+from sigmadft.rules.CorrelationRule import CorrelationRule
+
+
+class RowFilter:
+    """Necessary conditions of a rule set, checked on raw CSV rows at ingest.
+
+    Each rule's condition requires at least one of a set of literals in the
+    event text: one of its keywords, or a literal every match of one of its
+    regexes contains. A row whose text holds none of the literals of any
+    selected rule cannot match, so the timeline keeps it only as a supporting
+    event instead of building a full event for it. So does a row outside the
+    time range, which the reader only passes on as a neighbour of rows inside.
+    """
+
+    def __init__(self, literals: Optional[List[Tuple[str, bool]]], time_range: Optional[TimeRange] = None):
+        """literals are (literal, cased) pairs; None checks only the time range"""
+        self.time_range = time_range
+        self.literals: Optional[List[str]] = None
+        self.uncased_literals: Optional[List[str]] = None
+        self._search = None
+        if literals is not None:
+            cased = {literal for literal, is_cased in literals if is_cased}
+            uncased = {literal.lower() for literal, is_cased in literals if not is_cased}
+            # A literal containing another is implied by it
+            self.uncased_literals = _shortest(uncased)
+            self.literals = [
+                literal
+                for literal in _shortest(cased)
+                if not any(other in literal.lower() for other in self.uncased_literals)
+            ]
+            patterns = []
+            if self.literals:
+                patterns.append(_trie_pattern(self.literals))
+            if self.uncased_literals:
+                patterns.append(f"(?i:{_trie_pattern(self.uncased_literals)})")
+            if patterns:
+                self._search = re.compile("|".join(patterns)).search
+            else:
+                self._search = lambda text: None
+        self.kept = 0
+        self.deferred = 0
+
+    @classmethod
+    def from_rules(
+        cls, rules: List[Any], time_range: Optional[TimeRange] = None, pushdown: bool = True
+    ) -> Optional["RowFilter"]:
+        """Returns the filter of the rules and time range, or None when any row may match.
+
+        Correlation rules contribute the rules they reference. Without pushdown
+        only the time range is checked.
+        """
+        literals = cls._rule_literals(rules) if pushdown else None
+        if literals is None and time_range is None:
+            return None
+        return cls(literals, time_range)
+
+    @staticmethod
+    def _rule_literals(rules: List[Any]) -> Optional[List[Tuple[str, bool]]]:
+        literals = []
+        seen = set()
+        for rule in rules:
+            for base_rule in rule.base_rules if isinstance(rule, CorrelationRule) else [rule]:
+                if id(base_rule) in seen:
+                    continue
+                seen.add(id(base_rule))
+                required = base_rule.detection.tree.required_literals()
+                if required is None:
+                    return None
+                literals.extend(required)
+        return literals
+
+    def relevant(self, row: list) -> bool:
+        """Returns whether some rule may match the row"""
+        if self.time_range is not None and self.time_range.position(row[0]):
+            self.deferred += 1
+            return False
+        if self._search is not None:
+            # The text rules match against: f"{event.type} {event.evidence} {event.plugin}"
+            if self._search(f"{row[1]}-{row[2]} {row[4]} {row[2]}-{row[3]}-{row[5]}") is None:
+                self.deferred += 1
+                return False
+        self.kept += 1
+        return True
+
+
+def _shortest(literals: set) -> List[str]:
+    """Drops the literals that contain another"""
+    return sorted(literal for literal in literals if not any(other != literal and other in literal for other in literals))
+
+
+def _trie_pattern(literals: List[str]) -> str:
+    """Builds a regex matching any of the literals, with common prefixes factored out.
+
+    The regex engine tries each branch of an alternation in turn, so sharing
+    prefixes makes a miss much cheaper than a flat list of literals.
+    """
+    trie: Dict[str, Any] = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def pattern(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")" + ("?" if "" in node else "")
+
+    return pattern(trie)
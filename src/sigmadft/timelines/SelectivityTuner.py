@@ -0,0 +1,139 @@
+# src/sigmadft/timelines/SelectivityTuner.py
+
+import json
+import os
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sigmadft.rules.Rule import Rule
+
+
+DEFAULT_SAMPLE_SIZE = 1000
+DEFAULT_RETUNE_INTERVAL = 100000
+STATS_FORMAT = 1
+
+
+class _RuleState:
+    def __init__(self, rule: Rule):
+        self.rule = rule  # Keeps the rule alive so its id() is not reused
+        self.counts: Dict[str, List[int]] = {}  # node signature -> [evaluations, hits]
+        self.matcher: Optional[Callable[[str, str, str], bool]] = None
+        self.sampler: Optional[Callable[[str, str, str], Tuple[bool, ...]]] = None
+        self.samples: List[Tuple[bool, ...]] = []  # sampler() results of the current sample
+        self.until_sample = 0
+
+
+class SelectivityTuner:
+    """Orders the predicates of each rule by the hit rates seen on the timeline.
+
+    The first rows a rule scans are sampled: every predicate is evaluated, so
+    the hit rates are not skewed by short-circuiting. The rest are matched by a
+    condition reordered from the sample, and a new sample is taken every
+    retune_interval rows with the older counts halved, so the order follows a
+    timeline whose mix of parsers changes. Statistics saved by an earlier run
+    order the rule from its first row.
+    """
+
+    def __init__(
+        self,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        retune_interval: int = DEFAULT_RETUNE_INTERVAL,
+        stats: Optional[Dict[str, Dict[str, List[int]]]] = None,
+    ):
+        self.sample_size = sample_size
+        self.retune_interval = retune_interval
+        # Counts from earlier runs, by rule key and node signature
+        self.stats = stats or {}
+        self.samples = 0
+        self.retunes = 0
+        self._states: Dict[int, _RuleState] = {}
+
+    @staticmethod
+    def rule_key(rule: Rule) -> str:
+        return f"{rule.id} {rule.title}"
+
+    def _state(self, rule: Rule) -> _RuleState:
+        state = self._states.get(id(rule))
+        if state is None:
+            state = self._states[id(rule)] = _RuleState(rule)
+            saved = self.stats.get(self.rule_key(rule))
+            if saved:
+                state.counts = {signature: list(count) for signature, count in saved.items()}
+                self._retune(state)
+        return state
+
+    def _retune(self, state: _RuleState):
+        rates = {signature: hits / evaluations for signature, (evaluations, hits) in state.counts.items() if evaluations}
+        state.matcher = state.rule.detection.tree.ordered_matcher(rates)
+        state.until_sample = self.retune_interval
+        self.retunes += 1
+
+    @staticmethod
+    def _sampling_matcher(state: _RuleState) -> Callable[[str, str, str], bool]:
+        condition = state.rule.detection.tree
+        if state.sampler is None:
+            state.sampler = condition.sampler()
+        sampler, samples, matches = state.sampler, state.samples, state.matcher or condition.matcher()
+
+        def matches_sampled(type: str, evidence: str, plugin: str) -> bool:
+            samples.append(sampler(type, evidence, plugin))
+            return matches(type, evidence, plugin)
+
+        return matches_sampled
+
+    def segments(
+        self, rule: Rule, events: Iterable[Any]
+    ) -> Iterator[Tuple[Callable[[str, str, str], bool], List[Any]]]:
+        """Splits the events a rule scans into runs, each with the matcher to use on it"""
+        condition = rule.detection.tree
+        state = self._state(rule)
+        events = iter(events)
+        while True:
+            if state.matcher is None or state.until_sample <= 0:
+                sample = list(islice(events, self.sample_size))
+                if not sample:
+                    return
+                # Older counts weigh half as much as each new sample
+                for count in state.counts.values():
+                    count[0] //= 2
+                    count[1] //= 2
+                yield self._sampling_matcher(state), sample
+                self.samples += len(sample)
+                condition.count_hits(state.samples, state.counts)
+                state.samples = []
+                self._retune(state)
+                continue
+
+            segment = list(islice(events, state.until_sample))
+            if not segment:
+                return
+            state.until_sample -= len(segment)
+            yield state.matcher, segment
+
+    def to_dict(self) -> Dict[str, Dict[str, List[int]]]:
+        """Returns the saved statistics updated with the counts of this run"""
+        stats = dict(self.stats)
+        for state in self._states.values():
+            if state.counts:
+                stats[self.rule_key(state.rule)] = state.counts
+        return stats
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "SelectivityTuner":
+        """Creates a tuner from a statistics file, ignoring one that is missing or unreadable"""
+        stats = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as file:
+                    data = json.load(file)
+                if data.get("format") == STATS_FORMAT:
+                    stats = data["rules"]
+            except (OSError, ValueError, KeyError, AttributeError) as e:
+                print(f"Warning: Ignoring selectivity statistics {path}: {str(e)}")
+        return cls(stats=stats, **kwargs)
+
+    def save(self, path: str) -> None:
+        """Writes the statistics atomically, so a failed run does not leave a partial file"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump({"format": STATS_FORMAT, "rules": self.to_dict()}, file, indent=4)
+        os.replace(temp_path, path)
@@ -0,0 +1,148 @@
+# src/sigmadft/utils/MemoryReport.py
+
+import json
+import linecache
+import os
+import sys
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Stages whose allocation sites are listed; per-rule snapshots only record totals
+SITE_STAGES = ("create_timeline", "merge", "write_output")
+
+# Frames that belong to the instrumentation or the import system, not to sigmadft
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", "<unknown>")
+
+
+def current_rss() -> Optional[int]:
+    """Current resident set size in bytes, where /proc is available"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident set size of the process in bytes"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class MemorySnapshot:
+    """Memory use at the end of one stage or rule"""
+
+    stage: str
+    rule: str = ""
+    traced_bytes: int = 0       # live Python allocations
+    stage_peak_bytes: int = 0   # highest live allocations during the stage
+    rss_bytes: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+    events: int = 0
+    top_sites: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class MemoryReport:
+    """Tracks peak RSS and tracemalloc allocations per pipeline stage.
+
+    ``snapshot()`` is called when a stage ends; it records live and peak traced
+    memory and RSS, lists the top allocation sites for the main stages and
+    resets the traced peak so the next stage is measured on its own.
+    """
+
+    def __init__(self, top: int = 10, frames: int = 1):
+        self.top = top
+        self.frames = frames
+        self.baseline_bytes = 0
+        self.snapshots: List[MemorySnapshot] = []
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.baseline_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+
+    def snapshot(self, stage: str, rule: str = "", events: int = 0) -> MemorySnapshot:
+        traced, peak = tracemalloc.get_traced_memory()
+        snapshot = MemorySnapshot(stage, rule, traced, peak, current_rss(), peak_rss(), events)
+        if stage in SITE_STAGES:
+            snapshot.top_sites = self._top_sites()
+        self.snapshots.append(snapshot)
+        tracemalloc.reset_peak()
+        return snapshot
+
+    def _top_sites(self) -> List[Dict[str, Any]]:
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+        )
+        sites = []
+        for stat in snapshot.statistics("lineno")[: self.top]:
+            frame = stat.traceback[0]
+            sites.append({
+                "site": f"{frame.filename}:{frame.lineno}",
+                "code": linecache.getline(frame.filename, frame.lineno).strip(),
+                "bytes": stat.size,
+                "count": stat.count,
+            })
+        return sites
+
+    def bytes_per_event(self) -> Optional[float]:
+        """Live allocations of the low-level timeline divided by its events"""
+        for snapshot in self.snapshots:
+            if snapshot.stage == "create_timeline" and snapshot.events:
+                return (snapshot.traced_bytes - self.baseline_bytes) / snapshot.events
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "baseline_bytes": self.baseline_bytes,
+            "bytes_per_event": self.bytes_per_event(),
+            "peak_rss_bytes": peak_rss(),
+            "stages": [asdict(snapshot) for snapshot in self.snapshots],
+        }
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=4)
+
+    def report(self) -> str:
+        """Returns a text report of memory use per stage and the top allocation sites"""
+        mb = 1024 * 1024
+
+        def format_mb(value: Optional[int]) -> str:
+            return f"{value / mb:10.1f}" if value is not None else f"{'n/a':>10}"
+
+        lines = ["Memory report (MB):", f"  {'traced':>10} {'stage peak':>10} {'RSS':>10} {'peak RSS':>10}  stage"]
+        for s in self.snapshots:
+            label = f"{s.stage} {s.rule}".strip()
+            lines.append(
+                f"  {format_mb(s.traced_bytes)} {format_mb(s.stage_peak_bytes)} "
+                f"{format_mb(s.rss_bytes)} {format_mb(s.peak_rss_bytes)}  {label}"
+            )
+
+        bytes_per_event = self.bytes_per_event()
+        if bytes_per_event is not None:
+            lines.append(f"Bytes per low-level event: {bytes_per_event:,.0f}")
+
+        for s in self.snapshots:
+            if s.top_sites:
+                lines.append(f"Top allocation sites after {s.stage}:")
+                for site in s.top_sites:
+                    lines.append(f"  {site['bytes'] / mb:10.1f} MB {site['count']:>10,} blocks  {site['site']}")
+                    if site["code"]:
+                        lines.append(f"  {'':>35}{site['code']}")
+        return "\n".join(lines)
@@ -0,0 +1,111 @@
+# src/sigmadft/utils/Metrics.py
+
+import json
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from sigmadft.utils.MemoryReport import MemoryReport
+
+
+@dataclass
+class StageMetrics:
+    """Timings and counters of one pipeline stage or rule"""
+
+    stage: str
+    rule: str = ""
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    events_scanned: int = 0
+    matches: int = 0
+    keys_extracted: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events_scanned / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["events_per_second"] = self.events_per_second
+        return data
+
+
+class Metrics:
+    """Collects per-stage and per-rule metrics of a run.
+
+    ``start()`` takes a wall and CPU clock reading and ``record()`` turns it into
+    a StageMetrics. Records are always returned so callers can print durations,
+    but they are only kept when the collector is enabled. When a MemoryReport
+    is attached, every recorded stage also takes a memory snapshot.
+    """
+
+    def __init__(self, enabled: bool = True, memory_report: Optional["MemoryReport"] = None):
+        self.enabled = enabled
+        self.memory_report = memory_report
+        self.stages: List[StageMetrics] = []
+
+    @staticmethod
+    def start() -> Tuple[float, float]:
+        """Returns the current (wall, CPU) clock readings"""
+        return time.perf_counter(), time.process_time()
+
+    def record(self, stage: str, started: Tuple[float, float], rule: str = "", **counters: int) -> StageMetrics:
+        """Records a stage that began at ``started`` and ends now"""
+        wall_start, cpu_start = started
+        metrics = StageMetrics(
+            stage,
+            rule,
+            time.perf_counter() - wall_start,
+            time.process_time() - cpu_start,
+            **counters,
+        )
+        if self.enabled:
+            self.stages.append(metrics)
+        if self.memory_report is not None:
+            self.memory_report.snapshot(stage, rule, metrics.events_scanned)
+        return metrics
+
+    def get(self, stage: str, rule: str = "") -> Optional[StageMetrics]:
+        for metrics in self.stages:
+            if metrics.stage == stage and metrics.rule == rule:
+                return metrics
+        return None
+
+    def to_dict(self) -> dict:
+        return {"stages": [metrics.to_dict() for metrics in self.stages]}
+
+    def to_prometheus(self) -> str:
+        """Formats the metrics for the node_exporter textfile collector"""
+        families = [
+            ("wall_seconds", "gauge", "Wall-clock time of the stage in seconds."),
+            ("cpu_seconds", "gauge", "CPU time of the stage in seconds."),
+            ("events_scanned", "gauge", "Low-level events scanned by the stage."),
+            ("matches", "gauge", "Events matched by the stage."),
+            ("keys_extracted", "gauge", "Keys extracted into high-level events."),
+            ("bytes_read", "gauge", "Bytes read by the stage."),
+            ("bytes_written", "gauge", "Bytes written by the stage."),
+            ("events_per_second", "gauge", "Low-level events scanned per second of wall time."),
+        ]
+        lines = []
+        for name, kind, help_text in families:
+            lines.append(f"# HELP sigmadft_stage_{name} {help_text}")
+            lines.append(f"# TYPE sigmadft_stage_{name} {kind}")
+            for metrics in self.stages:
+                labels = f'stage="{_escape_label(metrics.stage)}",rule="{_escape_label(metrics.rule)}"'
+                lines.append(f"sigmadft_stage_{name}{{{labels}}} {getattr(metrics, name)!r}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Writes the metrics as a Prometheus textfile (.prom) or as JSON"""
+        with open(path, "w") as file:
+            if path.endswith(".prom"):
+                file.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), file, indent=4)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
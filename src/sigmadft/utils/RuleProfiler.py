@@ -0,0 +1,130 @@
+# src/sigmadft/utils/RuleProfiler.py
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+
+@dataclass
+class RuleProfile:
+    """Evaluation counts and times of one rule and each of its keywords"""
+
+    name: str
+    keywords: List[str]      # "selection: keyword" labels, in condition order
+    regex: List[bool] = field(default_factory=list)
+    events: int = 0          # events routed to the rule
+    cache_hits: int = 0      # events answered by the match cache
+    matches: int = 0
+    seconds: float = 0.0     # total matching time, including the cache
+    keyword_evaluations: List[int] = field(default_factory=list)
+    keyword_hits: List[int] = field(default_factory=list)
+    keyword_seconds: List[float] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.keyword_evaluations = [0] * len(self.keywords)
+        self.keyword_hits = [0] * len(self.keywords)
+        self.keyword_seconds = [0.0] * len(self.keywords)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rule": self.name,
+            "events": self.events,
+            "cache_hits": self.cache_hits,
+            "matches": self.matches,
+            "seconds": self.seconds,
+            "keywords": [
+                {
+                    "keyword": keyword,
+                    "regex": self.regex[i],
+                    "evaluations": self.keyword_evaluations[i],
+                    "hits": self.keyword_hits[i],
+                    "seconds": self.keyword_seconds[i],
+                }
+                for i, keyword in enumerate(self.keywords)
+            ],
+        }
+
+
+@dataclass
+class ExtractorProfile:
+    """Call counts and time of one Utils extractor"""
+
+    name: str
+    calls: int = 0
+    results: int = 0         # calls that returned a value other than None
+    seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"extractor": self.name, "calls": self.calls, "results": self.results, "seconds": self.seconds}
+
+
+class RuleProfiler:
+    """Opt-in cost profile of rule keywords and key extractors.
+
+    LowLevelTimeline and KeyProcessor report into the profiler when one is
+    attached to them; otherwise their fast paths run unchanged. ``report()``
+    ranks the costliest rules, keywords and extractors so rule authors can see
+    which keyword or Utils function makes a rule slow.
+    """
+
+    def __init__(self):
+        self.rules: Dict[int, RuleProfile] = {}
+        self.extractors: Dict[str, ExtractorProfile] = {}
+
+    def rule_profile(self, rule) -> RuleProfile:
+        profile = self.rules.get(id(rule))
+        if profile is None:
+            predicates = rule.detection.tree.predicates
+            profile = self.rules[id(rule)] = RuleProfile(
+                rule.title, [p.label for p in predicates], [not p.literal for p in predicates]
+            )
+        return profile
+
+    def record_extractor(self, name: str, value: Any, seconds: float) -> None:
+        profile = self.extractors.get(name)
+        if profile is None:
+            profile = self.extractors[name] = ExtractorProfile(name)
+        profile.calls += 1
+        profile.seconds += seconds
+        if value is not None:
+            profile.results += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rules": [p.to_dict() for p in sorted(self.rules.values(), key=lambda p: p.seconds, reverse=True)],
+            "extractors": [p.to_dict() for p in sorted(self.extractors.values(), key=lambda p: p.seconds, reverse=True)],
+        }
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=4)
+
+    def report(self, top: int = 10) -> str:
+        """Returns a ranked text report of the costliest rules, keywords and extractors"""
+        lines = ["Costliest rules (matching time):"]
+        for p in sorted(self.rules.values(), key=lambda p: p.seconds, reverse=True)[:top]:
+            evaluated = p.events - p.cache_hits
+            per_event = p.seconds / p.events * 1e6 if p.events else 0.0
+            lines.append(
+                f"  {p.seconds * 1000:9.2f} ms  {p.events:>10,} events  {evaluated:>10,} evaluated  "
+                f"{p.matches:>8,} matches  {per_event:7.2f} us/event  {p.name}"
+            )
+
+        keywords = [
+            (p.keyword_seconds[i], p.keyword_evaluations[i], p.keyword_hits[i], keyword, p.regex[i], p)
+            for p in self.rules.values()
+            for i, keyword in enumerate(p.keywords)
+        ]
+        lines.append("Costliest keywords:")
+        for seconds, evaluations, hits, keyword, regex, p in sorted(keywords, key=lambda k: k[0], reverse=True)[:top]:
+            hit_rate = hits / evaluations if evaluations else 0.0
+            kind = "regex" if regex else "literal"
+            lines.append(
+                f"  {seconds * 1000:9.2f} ms  {evaluations:>10,} evals  {hit_rate:7.2%} hits  "
+                f"{kind:<7}  {keyword!r}  ({p.name})"
+            )
+
+        lines.append("Costliest extractors:")
+        for p in sorted(self.extractors.values(), key=lambda p: p.seconds, reverse=True)[:top]:
+            lines.append(f"  {p.seconds * 1000:9.2f} ms  {p.calls:>10,} calls  {p.results:>10,} results  {p.name}")
+        return "\n".join(lines)
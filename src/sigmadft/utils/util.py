@@ -1,10 +1,50 @@
 # src/sigmadft/utils/util.py
 
 import re
+from functools import wraps
 from urllib.parse import urlparse
 from sigmadft.events.LowLevelEvent import LowLevelEvent
 
 
+def memoized_extractor(func):
+    """Cache an extractor's result on the low-level event it was called with.
+
+    The cache lives in ``LowLevelEvent.extracted`` so a value computed for one
+    key is reused by every other key and rule evaluated on the same event,
+    including extractors that build on each other (e.g. the domain from the URL).
+    """
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(low_level_event: LowLevelEvent):
+        extracted = low_level_event.extracted
+        if extracted is None:
+            extracted = low_level_event.extracted = {}
+        elif name in extracted:
+            return extracted[name]
+        value = func(low_level_event)
+        extracted[name] = value
+        return value
+
+    return wrapper
+
+
+# Structured attributes each extractor reads, also through the extractors it
+# calls, so readers keep only the attribute columns the selected rules use
+EXTRACTOR_ATTRIBUTES = {
+    "get_hostname": ("hostname",),
+    "get_username": ("username",),
+    "extract_url": ("url",),
+    "extract_domain_from_url": ("url",),
+    "extract_youtube_video_title": ("title",),
+    "extract_google_search_term": ("url",),
+    "extract_bing_search_term": ("url",),
+    "extract_auth_target_user": ("username",),
+    "extract_auth_source_ip": ("address",),
+    "extract_auth_source_port": ("port",),
+}
+
+
 class Utils:
     """Utility functions for extracting information from events - standardized to use LowLevelEvent"""
         
@@ -34,6 +74,17 @@ class Utils:
         return low_level_event.evidence
 
     @staticmethod
+    def get_hostname(low_level_event: LowLevelEvent) -> str:
+        """Extract the hostname plaso resolved for the event (JSON Lines input only)"""
+        return low_level_event.attribute("hostname") or ""
+
+    @staticmethod
+    def get_username(low_level_event: LowLevelEvent) -> str:
+        """Extract the username plaso resolved for the event (JSON Lines input only)"""
+        return low_level_event.attribute("username") or ""
+
+    @staticmethod
+    @memoized_extractor
     def get_browser(low_level_event: LowLevelEvent) -> str:
         """Extract browser information from plugin string"""
         browsers = {
@@ -55,8 +106,14 @@ class Utils:
         return "Unknown Browser"
 
     @staticmethod
+    @memoized_extractor
     def extract_url(low_level_event: LowLevelEvent) -> str:
         """Extract URL from evidence string"""
+        # JSON Lines events of browser history carry the URL as an attribute
+        url = low_level_event.attribute("url")
+        if url:
+            return url
+
         evidence = low_level_event.evidence
             
         # First try to get URL before any parentheses
@@ -73,6 +130,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_domain_from_url(low_level_event: LowLevelEvent) -> str:
         """Extract URL from evidence string"""
         url = Utils.extract_url(low_level_event)
@@ -90,8 +148,13 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_youtube_video_title(low_level_event: LowLevelEvent) -> str:
         """Extract YouTube video title from evidence string"""
+        title = low_level_event.attribute("title")
+        if title:
+            return title
+
         evidence = low_level_event.evidence 
         
         # Look for title in parentheses after the URL
@@ -106,9 +169,10 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_google_search_term(low_level_event: LowLevelEvent) -> str:
         """Extract search term from Google search URL"""
-        evidence = getattr(low_level_event, 'evidence', '')
+        evidence = low_level_event.attribute("url") or getattr(low_level_event, 'evidence', '')
         if not evidence:
             return ""
         
@@ -124,9 +188,10 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_bing_search_term(low_level_event: LowLevelEvent) -> str:
         """Extract search term from Bing search URL"""
-        evidence = getattr(low_level_event, 'evidence', '')
+        evidence = low_level_event.attribute("url") or getattr(low_level_event, 'evidence', '')
         if not evidence:
             return ""
         
@@ -143,6 +208,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_useradd_activity_type(low_level_event: LowLevelEvent) -> str:
         """Extract the type of useradd activity (new user, new group, failed)"""
         evidence = low_level_event.evidence
@@ -157,6 +223,7 @@ class Utils:
         return "Unknown Activity"
     
     @staticmethod
+    @memoized_extractor
     def extract_useradd_username(low_level_event: LowLevelEvent) -> str:
         """Extract username from useradd log entry"""
         evidence = low_level_event.evidence
@@ -174,6 +241,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_useradd_creator(low_level_event: LowLevelEvent) -> str:
         """Extract the user who created the new user (from sudo logs)"""
         evidence = low_level_event.evidence
@@ -186,6 +254,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_useradd_uid(low_level_event: LowLevelEvent) -> str:
         """Extract UID from useradd log entry"""
         evidence = low_level_event.evidence
@@ -197,6 +266,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_useradd_gid(low_level_event: LowLevelEvent) -> str:
         """Extract GID from useradd log entry"""
         evidence = low_level_event.evidence
@@ -208,6 +278,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_useradd_home(low_level_event: LowLevelEvent) -> str:
         """Extract home directory from useradd log entry"""
         evidence = low_level_event.evidence
@@ -219,6 +290,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_useradd_shell(low_level_event: LowLevelEvent) -> str:
         """Extract shell from useradd log entry"""
         evidence = low_level_event.evidence
@@ -230,6 +302,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_useradd_exit_code(low_level_event: LowLevelEvent) -> str:
         """Extract exit code from failed useradd attempts"""
         evidence = low_level_event.evidence
@@ -241,6 +314,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_usermod_activity_type(low_level_event: LowLevelEvent) -> str:
         """Extract the type of usermod activity"""
         evidence = low_level_event.evidence
@@ -258,6 +332,7 @@ class Utils:
         return "Unknown Modification"
     
     @staticmethod
+    @memoized_extractor
     def extract_usermod_target_user(low_level_event: LowLevelEvent) -> str:
         """Extract the target username being modified"""
         evidence = getattr(low_level_event, 'evidence', '')
@@ -277,6 +352,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_usermod_creator(low_level_event: LowLevelEvent) -> str:
         """Extract the user who executed the usermod command"""
         evidence = low_level_event.evidence
@@ -289,6 +365,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_usermod_group(low_level_event: LowLevelEvent) -> str:
         """Extract the group name from usermod activity"""
         evidence = low_level_event.evidence
@@ -306,6 +383,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_usermod_group_type(low_level_event: LowLevelEvent) -> str:
         """Extract whether it's a regular or shadow group"""
         evidence = low_level_event.evidence
@@ -318,6 +396,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_usermod_command_args(low_level_event: LowLevelEvent) -> str:
         """Extract the full command arguments from usermod command"""
         evidence = low_level_event.evidence
@@ -330,6 +409,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_auth_failure_type(low_level_event: LowLevelEvent) -> str:
         """Extract the type of authentication failure"""
         evidence = low_level_event.evidence
@@ -348,8 +428,14 @@ class Utils:
         return "Unknown Auth Failure"
     
     @staticmethod
+    @memoized_extractor
     def extract_auth_target_user(low_level_event: LowLevelEvent) -> str:
         """Extract the target username from authentication attempt"""
+        # Set on JSON Lines events of plaso's SSH login parser
+        username = low_level_event.attribute("username")
+        if username:
+            return username
+
         evidence = low_level_event.evidence
         
         # Pattern for: Failed password for [invalid user] username
@@ -370,8 +456,13 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_auth_source_ip(low_level_event: LowLevelEvent) -> str:
         """Extract source IP address from authentication attempt"""
+        address = low_level_event.attribute("address")
+        if address:
+            return address
+
         evidence = low_level_event.evidence
         
         # Pattern for: from IP_ADDRESS port
@@ -387,8 +478,13 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_auth_source_port(low_level_event: LowLevelEvent) -> str:
         """Extract source port from authentication attempt"""
+        port = low_level_event.attribute("port")
+        if port:
+            return port
+
         evidence = low_level_event.evidence
         
         # Pattern for: from IP port PORT_NUMBER
@@ -399,6 +495,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_auth_service(low_level_event: LowLevelEvent) -> str:
         """Extract the service/daemon that handled the authentication"""
         evidence = low_level_event.evidence
@@ -411,6 +508,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_auth_user_validity(low_level_event: LowLevelEvent) -> str:
         """Extract whether the user is valid or invalid"""
         evidence = low_level_event.evidence
@@ -423,6 +521,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_auth_tty(low_level_event: LowLevelEvent) -> str:
         """Extract TTY information from authentication attempt"""
         evidence = low_level_event.evidence
@@ -435,6 +534,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_auth_remote_host(low_level_event: LowLevelEvent) -> str:
         """Extract remote host information"""
         evidence = low_level_event.evidence
@@ -447,6 +547,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_session_target_user(low_level_event: LowLevelEvent) -> str:
         """Extract the target user for whom the session is opened"""
         evidence = low_level_event.evidence
@@ -460,6 +561,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_session_executor_user(low_level_event: LowLevelEvent) -> str:
         """Extract the user who initiated the session"""
         evidence = low_level_event.evidence
@@ -481,6 +583,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_session_service_name(low_level_event: LowLevelEvent) -> str:
         """Extract the service that opened the session"""
         evidence = low_level_event.evidence
@@ -493,6 +596,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_session_executor_uid(low_level_event: LowLevelEvent) -> str:
         """Extract the UID of the user who initiated the session"""
         evidence = low_level_event.evidence
@@ -506,6 +610,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_session_type(low_level_event: LowLevelEvent) -> str:
         """Extract the type of session based on the service"""
         
@@ -525,6 +630,7 @@ class Utils:
             return "Other Session"
         
     @staticmethod
+    @memoized_extractor
     def extract_webshell_command(low_level_event: LowLevelEvent) -> str:
         """Extract the command executed in web shell request"""
         evidence = getattr(low_level_event, 'evidence', '')
@@ -549,6 +655,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_webshell_php_file(low_level_event: LowLevelEvent) -> str:
         """Extract the PHP file name from the request"""
         evidence = getattr(low_level_event, 'evidence', '')
@@ -563,6 +670,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_webshell_source_ip(low_level_event: LowLevelEvent) -> str:
         """Extract source IP address from HTTP request"""
         evidence = getattr(low_level_event, 'evidence', '')
@@ -577,6 +685,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_webshell_http_method(low_level_event: LowLevelEvent) -> str:
         """Extract HTTP method from the request"""
         evidence = getattr(low_level_event, 'evidence', '')
@@ -591,6 +700,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_webshell_response_code(low_level_event: LowLevelEvent) -> str:
         """Extract HTTP response code"""
         evidence = getattr(low_level_event, 'evidence', '')
@@ -605,6 +715,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_webshell_user_agent(low_level_event: LowLevelEvent) -> str:
         """Extract User-Agent from the request"""
         evidence = getattr(low_level_event, 'evidence', '')
@@ -619,6 +730,7 @@ class Utils:
         return ""
     
     @staticmethod
+    @memoized_extractor
     def extract_webshell_attack_type(low_level_event: LowLevelEvent) -> str:
         """Classify the type of web shell attack"""
         evidence = getattr(low_level_event, 'evidence', '')